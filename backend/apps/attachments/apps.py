@@ -8,3 +8,6 @@ class AttachmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.attachments'
     verbose_name = 'Archivos Adjuntos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
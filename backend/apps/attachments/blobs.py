@@ -0,0 +1,185 @@
+"""
+Content-addressed attachment storage.
+
+Every distinct file content is stored once, as an AttachmentBlob keyed by
+its SHA-256 under `uploads/blobs/<ab>/<cd>/<sha256><ext>`; attachments
+reference the blob and their `file` points to the blob's storage name,
+so URLs and downloads work unchanged. Uploading content that is already
+stored only adds a reference: nothing is written to storage.
+
+The digest is computed while the request is parsed (the upload handlers
+below hash each chunk as it arrives), so deduplication costs no extra
+pass over the file. Resumable uploads pass the checksum they already
+verified.
+
+Blobs count their references. Deleting an attachment (including by
+cascade from its ticket) releases its blob, and the stored file is
+removed once no attachment uses it. Attachments uploaded before blobs
+existed have no blob until the dedupe_attachments command adopts them.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AttachmentBlob
+
+
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+class HashingUploadHandlerMixin:
+    """Compute the SHA-256 of each uploaded file while it is received."""
+
+    def new_file(self, *args, **kwargs):
+        # Before super(): the memory handler raises StopFutureHandlers
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def blob_path(sha256, filename):
+    """Storage name of the blob with digest `sha256` (keeps the extension)."""
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join('uploads', 'blobs', sha256[:2], sha256[2:4], f'{sha256}{extension}')
+
+
+def content_sha256(content):
+    """
+    Hex SHA-256 of a File: the digest computed by the upload handlers
+    when present, otherwise read from the file in blocks.
+    """
+    digest = getattr(content, 'sha256', None) or getattr(getattr(content, 'file', None), 'sha256', None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for block in content.chunks(HASH_BLOCK_SIZE):
+        sha256.update(block)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+def stored_sha256(storage, name):
+    """(hex SHA-256, size) of a file already in storage, read in blocks."""
+    sha256 = hashlib.sha256()
+    size = 0
+    with storage.open(name, 'rb') as stored:
+        for block in stored.chunks(HASH_BLOCK_SIZE):
+            sha256.update(block)
+            size += len(block)
+    return sha256.hexdigest(), size
+
+
+def acquire_blob(content, filename, sha256=None, storage=None):
+    """
+    Return the blob holding `content`, with one more reference. The file
+    is written to storage only when no blob has that digest yet.
+    """
+    storage = storage or default_storage
+    sha256 = sha256 or content_sha256(content)
+
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is not None:
+            _add_reference(blob)
+            return blob
+
+        name = blob_path(sha256, filename)
+        # A file left by a rolled back upload already holds this content
+        wrote = not storage.exists(name)
+        if wrote:
+            name = storage.save(name, content)
+
+        try:
+            with transaction.atomic():
+                return AttachmentBlob.objects.create(
+                    sha256=sha256,
+                    file=name,
+                    size=content.size,
+                    ref_count=1,
+                )
+        except IntegrityError:
+            # Created by a concurrent upload of the same content
+            blob = AttachmentBlob.objects.select_for_update().get(sha256=sha256)
+            _add_reference(blob)
+            # Both uploads may have written the content; keep only the
+            # winner's file (storage.save() renames on collision)
+            if wrote and name != blob.file.name:
+                delete_stored_file(storage, name)
+            return blob
+
+
+def adopt_file(name, sha256, size):
+    """
+    Return the blob with digest `sha256`, with one more reference, or make
+    the already stored file `name` a new blob.
+
+    Returns:
+        tuple: (blob, created)
+    """
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is not None:
+            _add_reference(blob)
+            return blob, False
+
+        return AttachmentBlob.objects.create(
+            sha256=sha256,
+            file=name,
+            size=size,
+            ref_count=1,
+        ), True
+
+
+def _add_reference(blob):
+    AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+    blob.ref_count += 1
+
+
+def release_blob(blob_id):
+    """
+    Drop one reference to a blob; the last one deletes the blob and, once
+    the transaction commits, its stored file.
+    """
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(pk=blob_id).first()
+        if blob is None:
+            return
+
+        if blob.ref_count > 1:
+            AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+
+        storage, name = blob.file.storage, blob.file.name
+        blob.delete()
+        transaction.on_commit(lambda: delete_stored_file(storage, name))
+
+
+def delete_stored_file(storage, name):
+    """Delete a file from storage, ignoring files that are already gone."""
+    try:
+        storage.delete(name)
+    except Exception:
+        pass  # The row is gone; a leftover file is harmless
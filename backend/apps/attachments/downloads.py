@@ -0,0 +1,185 @@
+"""
+Authenticated attachment downloads.
+
+The view checks permissions, then either hands the transfer to the web
+server (ATTACHMENT_DOWNLOAD_OFFLOAD) or streams the file from storage in
+DOWNLOAD_CHUNK_SIZE blocks, honouring single `Range: bytes=` requests so
+interrupted mobile downloads can resume.
+
+Offload modes (only for storages with local paths, e.g. FileSystemStorage;
+other storages are always streamed):
+- 'x-accel-redirect': nginx serves ATTACHMENT_DOWNLOAD_ACCEL_PREFIX +
+  the storage name from an `internal` location
+- 'x-sendfile': Apache mod_xsendfile / lighttpd serve the absolute path
+Both servers handle Range themselves.
+
+The body of an attachment never changes (a new upload is a new
+attachment), so responses carry a strong ETag and may be cached
+privately for ATTACHMENT_DOWNLOAD_MAX_AGE seconds.
+"""
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+
+from apps.common.conditional import conditional_response, make_etag, set_validators
+
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested range lies outside the file."""
+
+
+def attachment_etag(attachment):
+    """Strong ETag of an attachment's content."""
+    return make_etag('attachment', attachment.pk, attachment.file.name, attachment.file_size)
+
+
+def parse_range(header, size):
+    """
+    Parse a `Range` header into an inclusive (start, end) byte range.
+
+    Returns None when the whole file should be sent (no header, another
+    unit, several ranges or a malformed value: RFC 9110 lets servers
+    ignore those).
+
+    Raises:
+        RangeNotSatisfiable: The range starts beyond the end of the file
+    """
+    if not header:
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if end < start:
+        return None
+    return start, end
+
+
+def _if_range_matches(request, etag):
+    """Whether Range applies: no If-Range, or it names the current ETag."""
+    header = request.META.get('HTTP_IF_RANGE')
+    if not header:
+        return True
+    # Dates are weak validators for If-Range; only the strong ETag counts
+    return etag in parse_etags(header)
+
+
+def _read_range(file, start, length):
+    """Yield `length` bytes of `file` from `start`, then close it."""
+    try:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = file.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def _offload_response(storage, name, content_type):
+    """Empty response telling the web server to send the file, or None."""
+    offload = settings.ATTACHMENT_DOWNLOAD_OFFLOAD
+    if offload not in OFFLOAD_MODES:
+        return None
+    path = _local_path(storage, name)
+    if path is None:
+        return None
+
+    response = HttpResponse(content_type=content_type)
+    if offload == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(settings.ATTACHMENT_DOWNLOAD_ACCEL_PREFIX + name)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def download_response(request, attachment, inline=False):
+    """
+    Build the download response for `attachment` (permissions already
+    checked): 304, 416, an offload response, 206 or a streamed 200.
+    """
+    etag = attachment_etag(attachment)
+    not_modified = conditional_response(request, etag)
+    if not_modified is not None:
+        return _cacheable(not_modified)
+
+    size = attachment.file_size
+    storage = attachment.file.storage
+    name = attachment.file.name
+    disposition = content_disposition_header(not inline, attachment.original_filename)
+
+    response = _offload_response(storage, name, attachment.mime_type)
+    if response is not None:
+        response['Content-Disposition'] = disposition
+        return _cacheable(set_validators(response, etag))
+
+    byte_range = None
+    if _if_range_matches(request, etag):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(
+            storage.open(name, 'rb'),
+            content_type=attachment.mime_type
+        )
+        response.block_size = DOWNLOAD_CHUNK_SIZE
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(storage.open(name, 'rb'), start, end - start + 1),
+            status=206,
+            content_type=attachment.mime_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return _cacheable(set_validators(response, etag))
+
+
+def _cacheable(response):
+    """Allow the client (not shared caches) to reuse the download."""
+    response['Cache-Control'] = f'private, max-age={settings.ATTACHMENT_DOWNLOAD_MAX_AGE}'
+    return response
@@ -0,0 +1,91 @@
+"""
+Move attachments uploaded before deduplication to content-addressed blobs.
+
+Every attachment without a blob is hashed from storage. The first file
+with a given content becomes its blob where it already is (nothing is
+copied); later attachments with the same content are pointed at that
+blob and their own copy is deleted.
+
+Usage:
+    python manage.py dedupe_attachments
+    python manage.py dedupe_attachments --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.attachments.blobs import adopt_file, delete_stored_file, stored_sha256
+from apps.attachments.models import Attachment, AttachmentBlob
+
+
+class Command(BaseCommand):
+    help = (
+        'Asigna un contenido único (SHA-256) a los archivos adjuntos '
+        'anteriores a la deduplicación y elimina las copias repetidas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo calcular cuántos archivos y bytes se liberarían.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Adjuntos leídos por consulta.'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        pending = Attachment.objects.filter(blob__isnull=True).exclude(file='').order_by('pk')
+
+        processed = duplicates = missing = 0
+        saved = 0
+        seen = set()
+
+        for attachment in pending.only('id', 'file').iterator(chunk_size=options['batch_size']):
+            storage, name = attachment.file.storage, attachment.file.name
+            try:
+                sha256, size = stored_sha256(storage, name)
+            except (FileNotFoundError, OSError):
+                missing += 1
+                self.stderr.write(f'Adjunto #{attachment.pk}: no se encuentra {name}')
+                continue
+
+            processed += 1
+            if dry_run:
+                if sha256 in seen or AttachmentBlob.objects.filter(sha256=sha256).exists():
+                    duplicates += 1
+                    saved += size
+                seen.add(sha256)
+                continue
+
+            if self._link(attachment, storage, name, sha256, size):
+                duplicates += 1
+                saved += size
+
+        prefix = '[simulación] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Adjuntos procesados: {processed}; copias eliminadas: {duplicates} '
+            f'({saved / 1024 / 1024:.1f} MB liberados); archivos no encontrados: {missing}'
+        ))
+
+    def _link(self, attachment, storage, name, sha256, size):
+        """Point an attachment at its blob; True when its copy was a duplicate."""
+        with transaction.atomic():
+            blob, created = adopt_file(name, sha256, size)
+            if blob.file.name == name:
+                Attachment.objects.filter(pk=attachment.pk).update(blob=blob)
+                return False
+
+            # The URL changes: bump updated_at so delta sync delivers it
+            Attachment.objects.filter(pk=attachment.pk).update(
+                blob=blob,
+                file=blob.file.name,
+                updated_at=timezone.now()
+            )
+            if not Attachment.objects.filter(file=name).exists():
+                transaction.on_commit(lambda: delete_stored_file(storage, name))
+            return True
@@ -0,0 +1,22 @@
+"""
+Delete expired resumable upload sessions and their partial files.
+
+Usage:
+    python manage.py purge_upload_sessions
+"""
+from django.core.management.base import BaseCommand
+
+from apps.attachments.uploads import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        'Elimina las subidas por fragmentos expiradas y los archivos parciales '
+        'sin subida asociada.'
+    )
+
+    def handle(self, *args, **options):
+        removed = purge_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(
+            f'Subidas y archivos parciales eliminados: {removed}'
+        ))
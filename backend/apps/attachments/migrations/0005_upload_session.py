@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('attachments', '0004_attachment_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('checksum', models.CharField(help_text='SHA-256 (hex) del archivo completo', max_length=64)),
+                ('is_private', models.BooleanField(default=False)),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='tickets.ticket')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Subida en Curso',
+                'verbose_name_plural': 'Subidas en Curso',
+                'db_table': 'attachment_upload_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -2,11 +2,13 @@
 Attachment models for the helpdesk application.
 """
 import os
-from django.db import models
+import uuid
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.text import get_valid_filename
+from apps.common.models import FieldTrackerMixin
 from apps.users.models import User
-from apps.tickets.models import Ticket
+from apps.tickets.models import Ticket, ticket_visibility
 
 
 def upload_attachment_to(instance, filename):
@@ -17,7 +19,45 @@ def upload_attachment_to(instance, filename):
     return os.path.join('uploads', 'attachments', f"{instance.ticket.id}", filename)
 
 
-class Attachment(models.Model):
+class AttachmentBlob(models.Model):
+    """
+    Stored file content, shared by every attachment with the same SHA-256
+    (see apps/attachments/blobs.py).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'attachment_blobs'
+        verbose_name = 'Contenido de Archivo'
+        verbose_name_plural = 'Contenidos de Archivos'
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} referencias)"
+
+
+class AttachmentQuerySet(models.QuerySet):
+    """
+    Custom queryset for attachments.
+    """
+    def visible_to(self, user):
+        """
+        Attachments on tickets `user` can see (Ticket.objects.visible_to);
+        private ones only for support and admins.
+        """
+        queryset = self
+        scope = ticket_visibility(user, 'ticket__')
+        if scope is not None:
+            queryset = queryset.filter(scope)
+        if user.role not in ['support', 'sysAdmin']:
+            queryset = queryset.filter(is_private=False)
+        return queryset
+
+
+class Attachment(FieldTrackerMixin, models.Model):
     """
     Attachment model for ticket files.
     """
@@ -32,17 +72,35 @@ class Attachment(models.Model):
         related_name='uploaded_attachments'
     )
     file = models.FileField(upload_to=upload_attachment_to)
+    # Null for files uploaded before deduplication until dedupe_attachments runs
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='attachments'
+    )
     original_filename = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField()
     mime_type = models.CharField(max_length=100)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     is_private = models.BooleanField(default=False)
     
+    objects = AttachmentQuerySet.as_manager()
+    
     class Meta:
         db_table = 'attachments'
         verbose_name = 'Archivo Adjunto'
         verbose_name_plural = 'Archivos Adjuntos'
         ordering = ['-created_at']
+        indexes = [
+            # Delta sync scans (see apps/tickets/sync.py)
+            models.Index(
+                fields=['updated_at'],
+                name='attachments_updated_at_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.original_filename} (Ticket #{self.ticket.id})"
@@ -52,11 +110,73 @@ class Attachment(models.Model):
         return os.path.basename(self.file.name)
     
     def save(self, *args, **kwargs):
-        if self.file:
+        # Only inspect the file (a storage call) when it was replaced
+        if self.file and (self._state.adding or self.has_changed('file')):
             self.file_size = self.file.size
             self.original_filename = self.file.name
             # Try to determine MIME type from file extension
             import mimetypes
             mime_type, _ = mimetypes.guess_type(self.file.name)
             self.mime_type = mime_type or 'application/octet-stream'
+            
+            if not self.file._committed:
+                # The blob reference and the row are written together
+                with transaction.atomic():
+                    previous_blob_id = self._store_in_blob()
+                    super().save(*args, **kwargs)
+                    if previous_blob_id is not None:
+                        from .blobs import release_blob
+                        release_blob(previous_blob_id)
+                return
         super().save(*args, **kwargs)
+    
+    def _store_in_blob(self):
+        """
+        Point `file` at the blob holding the new content instead of writing
+        a copy. Returns the id of the blob it replaces, if any.
+        """
+        from .blobs import acquire_blob
+        
+        previous_blob_id = None if self._state.adding else self.get_loaded_value('blob')
+        blob = acquire_blob(self.file.file, self.original_filename, storage=self.file.storage)
+        self.blob = blob
+        self.file.name = blob.file.name
+        self.file._committed = True
+        return previous_blob_id
+
+
+class UploadSession(models.Model):
+    """
+    Resumable upload in progress (see apps/attachments/uploads.py).
+    
+    Chunks are appended to a partial file until `offset` reaches `size`;
+    the Attachment is created on finalize, once the SHA-256 of the
+    assembled file matches `checksum`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    checksum = models.CharField(max_length=64, help_text='SHA-256 (hex) del archivo completo')
+    is_private = models.BooleanField(default=False)
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'attachment_upload_sessions'
+        verbose_name = 'Subida en Curso'
+        verbose_name_plural = 'Subidas en Curso'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
@@ -1,11 +1,33 @@
 """
 Serializers for attachments app.
 """
+import os
+import re
+
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Attachment
+from .models import Attachment, UploadSession
 from apps.users.serializers import UserSerializer
 
 
+ALLOWED_EXTENSIONS = [
+    '.pdf', '.doc', '.docx', '.txt', '.xlsx', '.xls',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp',
+    '.zip', '.rar', '.7z'
+]
+
+
+def validate_extension(filename):
+    """Reject file names whose extension is not in ALLOWED_EXTENSIONS."""
+    file_extension = os.path.splitext(filename)[1].lower()
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise serializers.ValidationError(
+            f"Tipo de archivo no permitido. Extensiones permitidas: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
+
 class AttachmentSerializer(serializers.ModelSerializer):
     """
     Serializer for Attachment model.
@@ -18,6 +40,7 @@ class AttachmentSerializer(serializers.ModelSerializer):
     fileSize = serializers.IntegerField(source='file_size', read_only=True)
     mimeType = serializers.CharField(source='mime_type', read_only=True)
     fileUrl = serializers.SerializerMethodField()
+    downloadUrl = serializers.SerializerMethodField()
 
     class Meta:
         model = Attachment
@@ -25,6 +48,7 @@ class AttachmentSerializer(serializers.ModelSerializer):
             'id',
             'originalFilename',
             'fileUrl',
+            'downloadUrl',
             'fileSize',
             'mimeType',
             'uploadedBy',
@@ -34,7 +58,9 @@ class AttachmentSerializer(serializers.ModelSerializer):
         ]
 
     def get_fileUrl(self, obj):
-        """Get file URL."""
+        """Get file URL (private files only through the download endpoint)."""
+        if obj.is_private:
+            return self.get_downloadUrl(obj)
         if obj.file and hasattr(obj.file, 'url'):
             # Si la URL ya es absoluta (Cloudinary), devolverla directamente
             if obj.file.url.startswith('http'):
@@ -47,6 +73,16 @@ class AttachmentSerializer(serializers.ModelSerializer):
             return obj.file.url
         return None
 
+    def get_downloadUrl(self, obj):
+        """Get the authenticated download URL."""
+        if not obj.file:
+            return None
+        url = reverse('attachment-download', args=[obj.ticket_id, obj.id])
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(url)
+        return url
+
 
 class AttachmentUploadSerializer(serializers.ModelSerializer):
     """
@@ -72,20 +108,7 @@ class AttachmentUploadSerializer(serializers.ModelSerializer):
                 f"El archivo no puede exceder 10MB. Tamaño actual: {value.size / 1024 / 1024:.2f}MB"
             )
         
-        # Check file extension
-        allowed_extensions = [
-            '.pdf', '.doc', '.docx', '.txt', '.xlsx', '.xls',
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp',
-            '.zip', '.rar', '.7z'
-        ]
-        
-        import os
-        file_extension = os.path.splitext(value.name)[1].lower()
-        
-        if file_extension not in allowed_extensions:
-            raise serializers.ValidationError(
-                f"Tipo de archivo no permitido. Extensiones permitidas: {', '.join(allowed_extensions)}"
-            )
+        validate_extension(value.name)
         
         return value
 
@@ -110,3 +133,63 @@ class AttachmentUploadSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for resumable upload sessions.
+    """
+    uploadId = serializers.UUIDField(source='id', read_only=True)
+    expiresAt = serializers.DateTimeField(source='expires_at', read_only=True)
+    chunkSize = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['uploadId', 'filename', 'size', 'offset', 'chunkSize', 'expiresAt']
+
+    def get_chunkSize(self, obj):
+        """Largest chunk accepted per request."""
+        return settings.ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """
+    Serializer for starting a resumable upload.
+    """
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    checksum = serializers.CharField(help_text='SHA-256 (hex) del archivo completo')
+    isPrivate = serializers.BooleanField(default=False, required=False)
+
+    def validate_filename(self, value):
+        """Validate file extension."""
+        validate_extension(value)
+        return value
+
+    def validate_size(self, value):
+        """Validate file size."""
+        max_size = settings.ATTACHMENT_UPLOAD_MAX_SIZE
+        if value > max_size:
+            raise serializers.ValidationError(
+                f"El archivo no puede exceder {max_size / 1024 / 1024:.0f}MB."
+            )
+        return value
+
+    def validate_checksum(self, value):
+        """Validate SHA-256 hex digest."""
+        if not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError(
+                "La suma de verificación debe ser un SHA-256 en hexadecimal."
+            )
+        return value.lower()
+
+    def validate_isPrivate(self, value):
+        """Validate private attachment permission."""
+        request = self.context.get('request')
+        if value and request:
+            user = request.user
+            if user.role not in ['support', 'sysAdmin']:
+                raise serializers.ValidationError(
+                    "Solo el personal de soporte puede subir archivos privados."
+                )
+        return value
@@ -0,0 +1,18 @@
+"""
+Signal handlers for the attachments app.
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .blobs import release_blob
+from .models import Attachment
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    """
+    Drop the deleted attachment's reference to its blob (also on cascades
+    from the ticket); the stored file goes with the last reference.
+    """
+    if instance.blob_id is not None:
+        release_blob(instance.blob_id)
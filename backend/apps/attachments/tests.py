@@ -0,0 +1,48 @@
+"""
+Tests for the attachments app.
+"""
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase
+
+from apps.attachments.blobs import acquire_blob, content_sha256
+from apps.attachments.models import AttachmentBlob
+
+
+class AcquireBlobRaceTests(TestCase):
+    """The loser of a concurrent first upload leaves no file behind."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = FileSystemStorage(location=self.location)
+
+    def stored_files(self):
+        return sorted(
+            path.relative_to(self.location).as_posix()
+            for path in Path(self.location).rglob('*')
+            if path.is_file()
+        )
+
+    def test_concurrent_first_upload_deletes_losing_file(self):
+        content = ContentFile(b'contenido duplicado', name='log.txt')
+        sha256 = content_sha256(content)
+        save = self.storage.save
+
+        def save_during_race(name, content):
+            stored = save(name, content)
+            # The other upload writes its file and claims the row meanwhile
+            winner = save(name, ContentFile(b'contenido duplicado'))
+            AttachmentBlob.objects.create(sha256=sha256, file=winner, size=content.size, ref_count=1)
+            return stored
+
+        with mock.patch.object(self.storage, 'save', side_effect=save_during_race):
+            blob = acquire_blob(content, 'log.txt', sha256, storage=self.storage)
+
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(self.stored_files(), [blob.file.name])
@@ -0,0 +1,245 @@
+"""
+Resumable attachment uploads.
+
+Protocol (modelled on tus):
+1. POST .../uploads/ declares the file name, size and SHA-256 and returns
+   an UploadSession id.
+2. PATCH .../uploads/{id}/ sends the next chunk as the raw request body
+   with an `Upload-Offset` header equal to the bytes already received
+   (GET returns that offset after a dropped connection). An optional
+   `Upload-Checksum: sha256 <base64>` header verifies the chunk itself.
+3. POST .../uploads/{id}/finalize/ checks the size and the SHA-256 of the
+   assembled file and only then creates the Attachment.
+
+Chunks are copied from the request stream to a partial file under
+ATTACHMENT_UPLOAD_TEMP_DIR in 64 KB blocks, so worker memory
+does not depend on the chunk or file size. On finalize the partial file
+is handed to the default storage as a File object (streamed, not read
+into memory), or only referenced when its content is already stored
+(see apps/attachments/blobs.py). All workers must share
+ATTACHMENT_UPLOAD_TEMP_DIR.
+
+Sessions expire ATTACHMENT_UPLOAD_SESSION_TTL_HOURS after their last
+chunk; the purge_upload_sessions command removes them and their files.
+"""
+import base64
+import binascii
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attachment, UploadSession
+
+
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(ValueError):
+    """A chunk or finalize request that cannot be applied."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def session_expiry():
+    return timezone.now() + timedelta(hours=settings.ATTACHMENT_UPLOAD_SESSION_TTL_HOURS)
+
+
+def partial_path(session_id):
+    """Path of the partial file of an upload session."""
+    return os.path.join(settings.ATTACHMENT_UPLOAD_TEMP_DIR, f'{session_id}.part')
+
+
+def start_session(ticket, user, filename, size, checksum, is_private=False):
+    """Create an upload session and its empty partial file."""
+    os.makedirs(settings.ATTACHMENT_UPLOAD_TEMP_DIR, exist_ok=True)
+    session = UploadSession.objects.create(
+        ticket=ticket,
+        uploaded_by=user,
+        filename=filename,
+        size=size,
+        checksum=checksum.lower(),
+        is_private=is_private,
+        expires_at=session_expiry(),
+    )
+    open(partial_path(session.id), 'wb').close()
+    return session
+
+
+def _parse_chunk_checksum(header):
+    """Expected digest from `Upload-Checksum: sha256 <base64>`, or None."""
+    if not header:
+        return None
+    try:
+        algorithm, encoded = header.split(' ', 1)
+        if algorithm.lower() != 'sha256':
+            raise ValueError(algorithm)
+        return base64.b64decode(encoded.strip(), validate=True)
+    except (ValueError, binascii.Error):
+        raise UploadError('Cabecera Upload-Checksum inválida (se espera "sha256 <base64>")')
+
+
+def append_chunk(sessions, offset, stream, length, checksum_header=None):
+    """
+    Append `length` bytes read from `stream` at `offset` of the partial
+    file of the session in `sessions` (a queryset narrowed to the
+    requested session and its owner). The session row is locked so concurrent chunks for the
+    same upload are applied one at a time.
+
+    Returns:
+        UploadSession: The session with its new offset
+
+    Raises:
+        UploadSession.DoesNotExist: Unknown or expired session
+        UploadError: Offset conflict, oversized chunk or chunk checksum mismatch
+    """
+    expected_digest = _parse_chunk_checksum(checksum_header)
+
+    if length > settings.ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(
+            f'El fragmento excede {settings.ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE} bytes',
+            status_code=413
+        )
+
+    with transaction.atomic():
+        session = sessions.select_for_update().get(expires_at__gt=timezone.now())
+
+        if offset != session.offset:
+            raise UploadError(
+                f'Upload-Offset no coincide: el servidor tiene {session.offset} bytes',
+                status_code=409
+            )
+        if session.offset + length > session.size:
+            raise UploadError('El fragmento excede el tamaño declarado del archivo', status_code=413)
+
+        with open(partial_path(session.id), 'r+b') as partial:
+            # Drop bytes left by an interrupted request that never committed
+            partial.seek(session.offset)
+            partial.truncate()
+            written, digest = _copy(stream, partial, length)
+
+            if expected_digest is not None and (written < length or digest != expected_digest):
+                # A chunk that fails its checksum is discarded entirely
+                partial.seek(session.offset)
+                partial.truncate()
+                raise UploadError('La suma de verificación del fragmento no coincide')
+
+        # Without a chunk checksum, whatever arrived of an interrupted
+        # chunk is kept and the client resumes from the new offset
+        session.offset += written
+        session.expires_at = session_expiry()
+        session.save(update_fields=['offset', 'expires_at'])
+
+    return session
+
+
+def _copy(stream, partial, length):
+    """Copy up to `length` bytes from `stream`; returns (bytes written, SHA-256 digest)."""
+    digest = hashlib.sha256()
+    written = 0
+    while written < length:
+        try:
+            block = stream.read(min(COPY_BLOCK_SIZE, length - written))
+        except OSError:
+            # Client went away mid-chunk
+            break
+        if not block:
+            break
+        partial.write(block)
+        digest.update(block)
+        written += len(block)
+    return written, digest.digest()
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(COPY_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_session(sessions):
+    """
+    Verify the assembled file of the session in `sessions` and turn it
+    into an Attachment.
+
+    Raises:
+        UploadSession.DoesNotExist: Unknown or expired session
+        UploadError: Incomplete upload or checksum mismatch (the session
+            is discarded on mismatch)
+    """
+    with transaction.atomic():
+        session = sessions.select_for_update(of=('self',)).select_related('ticket').get(
+            expires_at__gt=timezone.now()
+        )
+
+        if session.offset != session.size:
+            raise UploadError(
+                f'Subida incompleta: {session.offset} de {session.size} bytes',
+                status_code=409
+            )
+
+        path = partial_path(session.id)
+        if file_sha256(path) == session.checksum:
+            with open(path, 'rb') as partial:
+                content = File(partial, name=session.filename)
+                # Already verified: the blob lookup needs no second pass
+                content.sha256 = session.checksum
+                attachment = Attachment(
+                    ticket=session.ticket,
+                    uploaded_by_id=session.uploaded_by_id,
+                    is_private=session.is_private,
+                    file=content,
+                )
+                attachment.save()
+
+            discard_session(session)
+            return attachment
+
+    # Corrupt upload: the client has to start over
+    discard_session(session)
+    raise UploadError('La suma de verificación del archivo no coincide')
+
+
+def discard_session(session):
+    """Delete an upload session and its partial file."""
+    try:
+        os.remove(partial_path(session.id))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def purge_expired_sessions():
+    """
+    Delete expired sessions and partial files left without a session.
+
+    Returns:
+        int: Number of sessions and orphan files removed
+    """
+    removed = 0
+    for session in UploadSession.objects.filter(expires_at__lte=timezone.now()):
+        discard_session(session)
+        removed += 1
+
+    directory = settings.ATTACHMENT_UPLOAD_TEMP_DIR
+    if not os.path.isdir(directory):
+        return removed
+
+    live = {str(session_id) for session_id in UploadSession.objects.values_list('id', flat=True)}
+    cutoff = (timezone.now() - timedelta(hours=settings.ATTACHMENT_UPLOAD_SESSION_TTL_HOURS)).timestamp()
+    for entry in os.scandir(directory):
+        session_id = entry.name[:-len('.part')]
+        if entry.name.endswith('.part') and session_id not in live and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
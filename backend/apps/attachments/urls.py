@@ -8,7 +8,14 @@ urlpatterns = [
     # Attachments for a ticket
     path('tickets/<int:ticket_id>/attachments/', views.list_ticket_attachments_view, name='ticket-attachments-list'),
     path('tickets/<int:ticket_id>/attachments/upload/', views.upload_attachment_view, name='ticket-attachments-upload'),
+    
+    # Resumable (chunked) uploads
+    path('tickets/<int:ticket_id>/attachments/uploads/', views.create_upload_session_view, name='attachment-uploads-create'),
+    path('tickets/<int:ticket_id>/attachments/uploads/<uuid:upload_id>/', views.upload_session_view, name='attachment-upload'),
+    path('tickets/<int:ticket_id>/attachments/uploads/<uuid:upload_id>/finalize/', views.finalize_upload_session_view, name='attachment-upload-finalize'),
+    
     path('tickets/<int:ticket_id>/attachments/<int:attachment_id>/', views.get_attachment_detail_view, name='attachment-detail'),
+    path('tickets/<int:ticket_id>/attachments/<int:attachment_id>/download/', views.download_attachment_view, name='attachment-download'),
     path('tickets/<int:ticket_id>/attachments/<int:attachment_id>/delete/', views.delete_attachment_view, name='attachment-delete'),
 ]
 
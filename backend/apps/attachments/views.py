@@ -7,10 +7,18 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .models import Attachment
-from .serializers import AttachmentSerializer, AttachmentUploadSerializer
-from apps.tickets.models import Ticket
+from .downloads import download_response
+from .models import Attachment, UploadSession
+from .serializers import (
+    AttachmentSerializer,
+    AttachmentUploadSerializer,
+    UploadSessionCreateSerializer,
+    UploadSessionSerializer
+)
+from .uploads import UploadError, append_chunk, discard_session, finalize_session, start_session
+from apps.tickets.models import Ticket, ticket_visibility
 
 
 @api_view(['GET'])
@@ -20,30 +28,16 @@ def list_ticket_attachments_view(request, ticket_id):
     List all attachments for a ticket.
     GET /api/tickets/{ticket_id}/attachments/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
     user = request.user
     
-    # Check if user can view this ticket
-    can_view = False
+    # Tickets the user cannot see are not found
+    ticket = get_object_or_404(Ticket.objects.visible_to(user), id=ticket_id)
     
-    if user.role == 'sysAdmin':
-        can_view = True
-    elif user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
-        can_view = True
-    elif ticket.creator == user:
-        can_view = True
-    
-    if not can_view:
-        return Response({
-            'error': 'No tienes permiso para ver este ticket'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
-    # Get attachments
-    attachments = ticket.attachments.all()
-    
-    # Filter private attachments for regular users
-    if user.role not in ['support', 'sysAdmin']:
-        attachments = attachments.filter(is_private=False)
+    # Attachments with their uploaders in one query (private ones only
+    # for support/admin)
+    attachments = list(
+        Attachment.objects.visible_to(user).filter(ticket=ticket).select_related('uploaded_by')
+    )
     
     serializer = AttachmentSerializer(
         attachments,
@@ -52,7 +46,7 @@ def list_ticket_attachments_view(request, ticket_id):
     )
     
     return Response({
-        'count': attachments.count(),
+        'count': len(attachments),
         'attachments': serializer.data
     }, status=status.HTTP_200_OK)
 
@@ -65,23 +59,10 @@ def upload_attachment_view(request, ticket_id):
     Upload an attachment to a ticket.
     POST /api/tickets/{ticket_id}/attachments/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
     user = request.user
     
-    # Check if user can upload to this ticket
-    can_upload = False
-    
-    if user.role == 'sysAdmin':
-        can_upload = True
-    elif user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
-        can_upload = True
-    elif ticket.creator == user:
-        can_upload = True
-    
-    if not can_upload:
-        return Response({
-            'error': 'No tienes permiso para subir archivos a este ticket'
-        }, status=status.HTTP_403_FORBIDDEN)
+    # Users can upload to the tickets they can see
+    ticket = get_object_or_404(Ticket.objects.visible_to(user), id=ticket_id)
     
     serializer = AttachmentUploadSerializer(
         data=request.data,
@@ -114,6 +95,144 @@ def upload_attachment_view(request, ticket_id):
     }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session_view(request, ticket_id):
+    """
+    Start a resumable (chunked) upload.
+    POST /api/tickets/{ticket_id}/attachments/uploads/
+    """
+    user = request.user
+    
+    # Users can upload to the tickets they can see
+    ticket = get_object_or_404(Ticket.objects.visible_to(user), id=ticket_id)
+    
+    serializer = UploadSessionCreateSerializer(data=request.data, context={'request': request})
+    
+    if not serializer.is_valid():
+        return Response({
+            'error': 'Error al iniciar la subida',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    session = start_session(
+        ticket,
+        user,
+        filename=serializer.validated_data['filename'],
+        size=serializer.validated_data['size'],
+        checksum=serializer.validated_data['checksum'],
+        is_private=serializer.validated_data['isPrivate']
+    )
+    
+    return Response({
+        'msg': 'Subida iniciada',
+        'upload': UploadSessionSerializer(session).data
+    }, status=status.HTTP_201_CREATED)
+
+
+def user_upload_sessions(user, ticket_id, upload_id):
+    """The requested upload session, if `user` started it and still sees the ticket."""
+    sessions = UploadSession.objects.filter(
+        id=upload_id,
+        ticket_id=ticket_id,
+        uploaded_by=user
+    )
+    scope = ticket_visibility(user, 'ticket__')
+    if scope is not None:
+        sessions = sessions.filter(scope)
+    return sessions
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session_view(request, ticket_id, upload_id):
+    """
+    Resumable upload session.
+    GET    /api/tickets/{ticket_id}/attachments/uploads/{upload_id}/ - current offset
+    PATCH  /api/tickets/{ticket_id}/attachments/uploads/{upload_id}/ - append a chunk
+    DELETE /api/tickets/{ticket_id}/attachments/uploads/{upload_id}/ - cancel
+    
+    PATCH sends the raw chunk bytes as the body with headers:
+    - Upload-Offset: bytes already received (must match the server)
+    - Upload-Checksum: optional "sha256 <base64>" of the chunk
+    """
+    sessions = user_upload_sessions(request.user, ticket_id, upload_id)
+    
+    if request.method == 'PATCH':
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'Se requieren las cabeceras Upload-Offset y Content-Length'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            session = append_chunk(
+                sessions,
+                offset,
+                request.stream,
+                length,
+                request.META.get('HTTP_UPLOAD_CHECKSUM')
+            )
+        except UploadSession.DoesNotExist:
+            return Response({
+                'error': 'Subida no encontrada o expirada'
+            }, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return Response({
+                'error': e.message
+            }, status=e.status_code)
+        
+        response = Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+        response['Upload-Offset'] = session.offset
+        return response
+    
+    session = get_object_or_404(sessions, expires_at__gt=timezone.now())
+    
+    if request.method == 'DELETE':
+        discard_session(session)
+        return Response({
+            'msg': 'Subida cancelada'
+        }, status=status.HTTP_200_OK)
+    
+    response = Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+    response['Upload-Offset'] = session.offset
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finalize_upload_session_view(request, ticket_id, upload_id):
+    """
+    Verify a completed resumable upload and create the attachment.
+    POST /api/tickets/{ticket_id}/attachments/uploads/{upload_id}/finalize/
+    """
+    sessions = user_upload_sessions(request.user, ticket_id, upload_id)
+    
+    try:
+        attachment = finalize_session(sessions)
+    except UploadSession.DoesNotExist:
+        return Response({
+            'error': 'Subida no encontrada o expirada'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except UploadError as e:
+        return Response({
+            'error': 'Error al subir archivo',
+            'details': e.message
+        }, status=e.status_code)
+    
+    attachment_data = AttachmentSerializer(
+        attachment,
+        context={'request': request}
+    ).data
+    
+    return Response({
+        'msg': 'Archivo subido exitosamente',
+        'attachment': attachment_data
+    }, status=status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_attachment_detail_view(request, ticket_id, attachment_id):
@@ -121,20 +240,48 @@ def get_attachment_detail_view(request, ticket_id, attachment_id):
     Get attachment details.
     GET /api/tickets/{ticket_id}/attachments/{attachment_id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    attachment = get_object_or_404(Attachment, id=attachment_id, ticket=ticket)
-    user = request.user
-    
-    # Check permissions for private attachments
-    if attachment.is_private and user.role not in ['support', 'sysAdmin']:
-        return Response({
-            'error': 'No tienes permiso para ver este archivo'
-        }, status=status.HTTP_403_FORBIDDEN)
+    # Attachments on tickets the user cannot see, or private ones for
+    # regular users, are not found
+    attachment = get_object_or_404(
+        Attachment.objects.visible_to(request.user).select_related('uploaded_by'),
+        id=attachment_id,
+        ticket_id=ticket_id
+    )
     
     serializer = AttachmentSerializer(attachment, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_attachment_view(request, ticket_id, attachment_id):
+    """
+    Download an attachment's file (supports Range requests).
+    GET /api/tickets/{ticket_id}/attachments/{attachment_id}/download/
+    
+    Query params:
+    - inline: true to display instead of download
+    """
+    # Attachments on tickets the user cannot see, or private ones for
+    # regular users, are not found
+    attachment = get_object_or_404(
+        Attachment.objects.visible_to(request.user),
+        id=attachment_id,
+        ticket_id=ticket_id
+    )
+    
+    if not attachment.file:
+        return Response({
+            'error': 'El archivo no existe'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return download_response(
+        request,
+        attachment,
+        inline=request.query_params.get('inline') == 'true'
+    )
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_attachment_view(request, ticket_id, attachment_id):
@@ -142,22 +289,27 @@ def delete_attachment_view(request, ticket_id, attachment_id):
     Delete an attachment.
     DELETE /api/tickets/{ticket_id}/attachments/{attachment_id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    attachment = get_object_or_404(Attachment, id=attachment_id, ticket=ticket)
     user = request.user
+    attachment = get_object_or_404(
+        Attachment.objects.visible_to(user),
+        id=attachment_id,
+        ticket_id=ticket_id
+    )
     
     # Only uploader or admin can delete
-    if attachment.uploaded_by != user and user.role != 'sysAdmin':
+    if attachment.uploaded_by_id != user.id and user.role != 'sysAdmin':
         return Response({
             'error': 'Solo quien subió el archivo o un administrador puede eliminarlo'
         }, status=status.HTTP_403_FORBIDDEN)
     
     filename = attachment.original_filename
     
-    # Delete the file from storage
-    if attachment.file:
+    # Files predating deduplication belong to this attachment alone;
+    # shared blobs are released by the post_delete signal and removed
+    # with their last reference
+    if attachment.file and attachment.blob_id is None:
         try:
-            attachment.file.delete()
+            attachment.file.delete(save=False)
         except Exception:
             pass  # Continue even if file deletion fails
     
@@ -0,0 +1,129 @@
+"""
+Refresh token blacklist with an in-memory cache of revoked JTIs.
+
+Tokens are stateless by default: issuing them writes nothing, and
+access tokens are never looked up. Only revoking a refresh token
+(logout, or rotation on refresh) stores its JTI, as an OutstandingToken
+plus BlacklistedToken row of rest_framework_simplejwt.token_blacklist.
+
+Checking a refresh token reads a per-process dict of revoked, unexpired
+JTIs instead of querying the blacklist. It is refreshed at most every
+JWT_BLACKLIST_SYNC_SECONDS with the rows blacklisted since the last sync
+(with a margin for transactions that committed late); revocations made
+by this process are added at once.
+
+Rotation does not depend on the cache being current: a refresh token is
+revoked by inserting its JTI, which is unique, so a token that another
+worker already rotated or logged out fails the insert and is rejected.
+
+purge_expired_tokens (also a management command) deletes rows of
+expired tokens, which no longer need to be blacklisted.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+# Rows blacklisted up to this long before the previous sync are read again
+SYNC_OVERLAP = timedelta(seconds=60)
+
+PURGE_BATCH_SIZE = 5000
+
+_revoked = {}  # jti -> expiry (epoch seconds)
+_synced_at = None  # monotonic time of the last sync
+_synced_since = None  # datetime the next sync reads from
+_lock = threading.Lock()
+
+
+def _sync():
+    global _synced_at, _synced_since
+    started = timezone.now()
+    rows = BlacklistedToken.objects.filter(token__expires_at__gt=started)
+    if _synced_since is not None:
+        rows = rows.filter(blacklisted_at__gte=_synced_since)
+
+    now = time.time()
+    for jti, expires_at in rows.values_list('token__jti', 'token__expires_at').iterator():
+        _revoked[jti] = expires_at.timestamp()
+    for jti in [jti for jti, expires in _revoked.items() if expires <= now]:
+        del _revoked[jti]
+
+    _synced_since = started - SYNC_OVERLAP
+    _synced_at = time.monotonic()
+
+
+def is_revoked(jti):
+    """Whether the refresh token `jti` is blacklisted, as of the last sync."""
+    with _lock:
+        if _synced_at is None or time.monotonic() - _synced_at >= settings.JWT_BLACKLIST_SYNC_SECONDS:
+            _sync()
+        return jti in _revoked
+
+
+def revoke(token):
+    """
+    Blacklist a refresh token.
+
+    Returns:
+        bool: False when the token was already blacklisted
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    exp = token['exp']
+
+    try:
+        with transaction.atomic():
+            outstanding = OutstandingToken.objects.create(
+                jti=jti,
+                token=str(token),
+                created_at=datetime_from_epoch(token['iat']) if 'iat' in token else None,
+                expires_at=datetime_from_epoch(exp),
+            )
+            BlacklistedToken.objects.create(token=outstanding)
+        created = True
+    except IntegrityError:
+        # Already revoked (or recorded without being blacklisted)
+        outstanding = OutstandingToken.objects.get(jti=jti)
+        _, created = BlacklistedToken.objects.get_or_create(token=outstanding)
+
+    with _lock:
+        _revoked[jti] = exp
+    return created
+
+
+def clear_cache():
+    """Forget the cached JTIs; the next check reloads them all."""
+    global _synced_at, _synced_since
+    with _lock:
+        _revoked.clear()
+        _synced_at = None
+        _synced_since = None
+
+
+def purge_expired_tokens(batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete outstanding and blacklisted rows of expired tokens, in batches.
+
+    Returns:
+        int: Number of outstanding tokens deleted
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
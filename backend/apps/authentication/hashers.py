@@ -0,0 +1,48 @@
+"""
+Password hashers whose cost comes from settings.
+
+Same algorithms and hash formats as Django's hashers, but iterations /
+time and memory cost / rounds are read from PASSWORD_* settings. Django
+rehashes a password on successful login when it was stored with another
+algorithm than the first of PASSWORD_HASHERS or with another cost
+(check_password() calls must_update()), so changing PASSWORD_HASHER or
+a cost setting migrates users as they log in.
+
+Argon2 needs the argon2-cffi package and bcrypt the bcrypt package;
+they are only loaded when a password with that algorithm is checked.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS iterations."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the PASSWORD_ARGON2_* costs."""
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """bcrypt (on the SHA-256 of the password) with PASSWORD_BCRYPT_ROUNDS."""
+
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
+
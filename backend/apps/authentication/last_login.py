@@ -0,0 +1,99 @@
+"""
+Deferred, coalesced last_login writes.
+
+login_view used to save last_login in the request. record_login() sets
+it on the instance (so the response shows it) and queues the write: a
+background thread writes the queue every LAST_LOGIN_FLUSH_SECONDS, or
+as soon as LAST_LOGIN_FLUSH_BATCH_SIZE users are pending, as one bulk
+UPDATE. Repeated logins of the same user in between become one write.
+
+The queue is per process and flushed at exit; a crash loses at most
+LAST_LOGIN_FLUSH_SECONDS of last_login values, which only feed the
+"last activity" of the metrics. The write is an UPDATE without save(),
+so it neither bumps the user cache version (apps/users/cache.py) nor
+fires signals. LAST_LOGIN_FLUSH_SECONDS = 0 writes in the request.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_pending = {}  # user id -> last login
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+
+
+def record_login(user):
+    """Set `user.last_login` to now and queue its write."""
+    user.last_login = timezone.now()
+
+    if not settings.LAST_LOGIN_FLUSH_SECONDS:
+        _write({user.pk: user.last_login})
+        return
+
+    with _lock:
+        _pending[user.pk] = user.last_login
+        full = len(_pending) >= settings.LAST_LOGIN_FLUSH_BATCH_SIZE
+    _ensure_worker()
+    if full:
+        _wakeup.set()
+
+
+def flush_last_logins():
+    """
+    Write every queued last_login now.
+
+    Returns:
+        int: Number of users updated
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if pending:
+        _write(pending)
+    return len(pending)
+
+
+def _write(pending):
+    User = get_user_model()
+    User.objects.bulk_update(
+        [User(pk=user_id, last_login=last_login) for user_id, last_login in pending.items()],
+        ['last_login'],
+        batch_size=settings.LAST_LOGIN_FLUSH_BATCH_SIZE
+    )
+
+
+def _run():
+    while True:
+        _wakeup.wait(settings.LAST_LOGIN_FLUSH_SECONDS)
+        _wakeup.clear()
+        try:
+            flush_last_logins()
+        except Exception:
+            logger.exception('Error al guardar last_login')
+        finally:
+            # The worker thread holds its own database connection
+            connection.close()
+
+
+def _ensure_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='last-login-writer', daemon=True)
+            _worker.start()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush_last_logins()
+    except Exception:
+        logger.exception('Error al guardar last_login')
@@ -0,0 +1,137 @@
+"""
+Measure login throughput of one worker per password hasher, writing
+last_login in the request or deferring it to a batch.
+
+Logins run sequentially, as in one sync gunicorn worker; the password
+check dominates, so the result scales with the worker count.
+
+Usage:
+    python manage.py benchmark_login
+    python manage.py benchmark_login --hashers pbkdf2 argon2 --logins 200
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.authentication.last_login import flush_last_logins
+from apps.authentication.views import login_view
+from apps.users.models import User
+
+
+PASSWORD = 'Bench-Passw0rd!'
+
+# Mode label -> LAST_LOGIN_FLUSH_SECONDS (the deferred queue is flushed
+# by the command itself, so the writer thread must not wake up)
+MODES = [
+    ('síncrono', 0),
+    ('diferido', 3600),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide los logins por segundo de un worker con cada algoritmo de contraseñas, '
+        'guardando last_login en la petición o en lote. Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers',
+            nargs='+',
+            choices=['pbkdf2', 'argon2', 'bcrypt'],
+            default=['pbkdf2', 'argon2', 'bcrypt'],
+            help='Algoritmos a medir (se omiten los que no tienen su paquete instalado).'
+        )
+        parser.add_argument(
+            '--logins',
+            type=int,
+            default=100,
+            help='Logins por algoritmo y modo.'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Usuarios distintos que inician sesión por turnos.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Base de datos: {connection.vendor}')
+        factory = APIRequestFactory()
+        measured = 0
+
+        for name in options['hashers']:
+            hashers = [settings.PASSWORD_HASHER_CLASSES[name]] + [
+                path for path in settings.PASSWORD_HASHERS
+                if path != settings.PASSWORD_HASHER_CLASSES[name]
+            ]
+            with override_settings(PASSWORD_HASHER=name, PASSWORD_HASHERS=hashers):
+                hasher = get_hasher()
+                try:
+                    if hasher.library:
+                        hasher._load_library()
+                except ValueError as exc:
+                    self.stdout.write(self.style.WARNING(f'{name}: omitido ({exc})'))
+                    continue
+
+                with transaction.atomic():
+                    emails = self._create_users(name, options['users'])
+                    for label, flush_seconds in MODES:
+                        with override_settings(
+                            LAST_LOGIN_FLUSH_SECONDS=flush_seconds,
+                            LAST_LOGIN_FLUSH_BATCH_SIZE=options['logins'] + 1
+                        ):
+                            self._measure(name, label, factory, emails, options['logins'])
+                    measured += 1
+
+                    # Never keep synthetic data
+                    transaction.set_rollback(True)
+
+        if not measured:
+            raise CommandError('Ningún algoritmo disponible para medir')
+
+    def _create_users(self, name, count):
+        emails = []
+        for i in range(count):
+            user = User.objects.create_user(
+                username=f'login-bench-{name}-{i}',
+                email=f'login-bench-{name}-{i}@example.com',
+                password=PASSWORD,
+                first_name='Synthetic',
+                last_name='user'
+            )
+            emails.append(user.email)
+        return emails
+
+    def _measure(self, name, label, factory, emails, logins):
+        failed = 0
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for i in range(logins):
+                request = factory.post(
+                    '/api/auth/login/',
+                    {'email': emails[i % len(emails)], 'password': PASSWORD},
+                    format='json'
+                )
+                if login_view(request).status_code != 200:
+                    failed += 1
+            elapsed = time.perf_counter() - started
+
+        flush_started = time.perf_counter()
+        written = flush_last_logins()
+        flush_elapsed = time.perf_counter() - flush_started
+
+        self.stdout.write(
+            f'{name:<7} {label:<9} {logins / elapsed:7.1f} logins/s  '
+            f'{elapsed / logins * 1000:7.1f} ms/login  '
+            f'{len(queries) / logins:5.2f} consultas/login  {failed} fallidos'
+        )
+        if written:
+            self.stdout.write(
+                f'{"":<17} lote de last_login: {written} usuarios en {flush_elapsed * 1000:.1f} ms'
+            )
@@ -0,0 +1,131 @@
+"""
+Measure refresh endpoint throughput: stock simplejwt blacklist vs. the
+cached blacklist of apps/authentication/blacklist.py.
+
+Each client refreshes in a loop with the token returned by its previous
+refresh, as the mobile app does. The stock TokenRefreshView queries the
+blacklist on every refresh and records every issued token; our view
+checks the in-memory cache and writes only the revocation.
+
+Usage:
+    python manage.py benchmark_token_refresh
+    python manage.py benchmark_token_refresh --requests 2000 --revoked 100000
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as StockRefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from apps.authentication.blacklist import clear_cache
+from apps.authentication.tokens import RefreshToken
+from apps.authentication.views import refresh_token_view
+from apps.tickets.management.synthetic import create_synthetic_users
+
+
+def stock_refresh(factory, view, token):
+    response = view(factory.post('/api/auth/refresh/', {'refresh': token}, format='json'))
+    return response.status_code, response.data.get('refresh')
+
+
+def cached_refresh(factory, view, token):
+    response = view(factory.post('/api/auth/refresh/', {'refreshToken': token}, format='json'))
+    return response.status_code, response.data.get('refreshToken')
+
+
+ENDPOINTS = [
+    ('simplejwt', StockRefreshToken, TokenRefreshView.as_view(), stock_refresh),
+    ('caché', RefreshToken, refresh_token_view, cached_refresh),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el rendimiento (peticiones/s y consultas) del endpoint de renovación '
+        'de tokens con la lista negra de simplejwt y con la caché en memoria. '
+        'Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Renovaciones por endpoint.'
+        )
+        parser.add_argument(
+            '--clients',
+            type=int,
+            default=20,
+            help='Usuarios que renuevan por turnos.'
+        )
+        parser.add_argument(
+            '--revoked',
+            type=int,
+            default=50000,
+            help='Tokens revocados previamente en la lista negra.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Base de datos: {connection.vendor}')
+        factory = APIRequestFactory()
+
+        with transaction.atomic():
+            users = create_synthetic_users('refresh-bench-user', 'user', options['clients'])
+            self.stdout.write(f'Revocando {options["revoked"]} tokens...')
+            self._seed_blacklist(options['revoked'])
+
+            for label, token_class, view, refresh in ENDPOINTS:
+                clear_cache()
+                tokens = [str(token_class.for_user(user)) for user in users]
+                self._measure(label, factory, view, refresh, tokens, options['requests'])
+
+            # Never keep synthetic data
+            transaction.set_rollback(True)
+
+    def _seed_blacklist(self, count):
+        expires_at = timezone.now() + timedelta(days=1)
+        outstanding = OutstandingToken.objects.bulk_create(
+            (
+                OutstandingToken(jti=uuid.uuid4().hex, token='', expires_at=expires_at)
+                for _ in range(count)
+            ),
+            batch_size=1000
+        )
+        if connection.features.can_return_rows_from_bulk_insert:
+            rows = outstanding
+        else:
+            rows = OutstandingToken.objects.filter(token='')
+        BlacklistedToken.objects.bulk_create(
+            (BlacklistedToken(token=token) for token in rows),
+            batch_size=1000
+        )
+
+    def _measure(self, label, factory, view, refresh, tokens, requests):
+        # Warm up: the first check of the cached view loads the blacklist
+        status_code, tokens[0] = refresh(factory, view, tokens[0])
+
+        failed = 0
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for i in range(requests):
+                client = i % len(tokens)
+                status_code, new_token = refresh(factory, view, tokens[client])
+                if status_code != 200:
+                    failed += 1
+                    continue
+                tokens[client] = new_token
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{label:<10} {requests / elapsed:8.0f} peticiones/s  '
+            f'{elapsed / requests * 1000:6.2f} ms/petición  '
+            f'{len(queries) / requests:5.2f} consultas/petición  {failed} fallidas'
+        )
@@ -0,0 +1,34 @@
+"""
+Delete blacklist rows of expired refresh tokens.
+
+Expired tokens are rejected by their signature check anyway, so their
+OutstandingToken and BlacklistedToken rows are no longer needed.
+
+Usage:
+    python manage.py purge_expired_tokens
+    python manage.py purge_expired_tokens --batch-size 1000
+"""
+from django.core.management.base import BaseCommand
+
+from apps.authentication.blacklist import PURGE_BATCH_SIZE, purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Elimina los refresh tokens expirados de las tablas de tokens emitidos '
+        'y revocados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help='Tokens eliminados por transacción.'
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Tokens expirados eliminados: {deleted}'
+        ))
@@ -0,0 +1,182 @@
+"""
+Tests for the authentication app.
+"""
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.authentication.blacklist import clear_cache, is_revoked, purge_expired_tokens
+from apps.authentication.last_login import _pending, flush_last_logins, record_login
+from apps.authentication.tokens import RefreshToken
+from apps.users.models import User
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+
+def create_user(username, role):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Passw0rd!',
+        first_name=username,
+        last_name='Test',
+        role=role
+    )
+
+
+class RefreshTokenTests(TestCase):
+    """Refresh tokens rotate and are rejected once revoked."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user', 'user')
+
+    def setUp(self):
+        clear_cache()
+        self.addCleanup(clear_cache)
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/refresh/', {'refreshToken': token}, format='json')
+
+    def test_rotated_token_cannot_be_replayed(self):
+        token = str(RefreshToken.for_user(self.user))
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.data['refreshToken']
+        self.assertNotEqual(rotated, token)
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(rotated).status_code, 200)
+
+    def test_logged_out_token_is_rejected(self):
+        token = str(RefreshToken.for_user(self.user))
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/auth/logout/', {'refreshToken': token}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_token_revoked_by_another_worker_is_rejected_with_stale_cache(self):
+        token = RefreshToken.for_user(self.user)
+        # This process' cache is loaded before the revocation
+        self.assertFalse(is_revoked(token['jti']))
+
+        # Logged out by another worker: only the rows exist
+        outstanding = OutstandingToken.objects.create(
+            jti=token['jti'],
+            token=str(token),
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(token=outstanding)
+        self.assertFalse(is_revoked(token['jti']))
+
+        self.assertEqual(self.refresh(str(token)).status_code, 401)
+
+
+class PurgeExpiredTokensTests(TestCase):
+    """purge_expired_tokens deletes only the rows of expired tokens."""
+
+    def create_token(self, jti, expires_in, blacklisted):
+        outstanding = OutstandingToken.objects.create(
+            jti=jti,
+            token='',
+            expires_at=timezone.now() + expires_in
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=outstanding)
+
+    def test_deletes_only_expired_rows(self):
+        self.create_token('expired-blacklisted', timedelta(hours=-1), True)
+        self.create_token('expired', timedelta(hours=-1), False)
+        self.create_token('valid-blacklisted', timedelta(hours=1), True)
+        self.create_token('valid', timedelta(hours=1), False)
+
+        self.assertEqual(purge_expired_tokens(batch_size=1), 2)
+        self.assertEqual(
+            sorted(OutstandingToken.objects.values_list('jti', flat=True)),
+            ['valid', 'valid-blacklisted']
+        )
+        self.assertEqual(
+            list(BlacklistedToken.objects.values_list('token__jti', flat=True)),
+            ['valid-blacklisted']
+        )
+
+
+class LastLoginTests(TestCase):
+    """last_login writes are queued, coalesced and written in one UPDATE."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [create_user(f'user-{i}', 'user') for i in range(2)]
+
+    def setUp(self):
+        _pending.clear()
+        self.addCleanup(_pending.clear)
+
+    def test_login_writes_last_login(self):
+        # LAST_LOGIN_FLUSH_SECONDS is 0 under manage.py test
+        response = APIClient().post(
+            '/api/auth/login/',
+            {'email': 'user-0@example.com', 'password': 'Passw0rd!'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(User.objects.get(pk=self.users[0].pk).last_login)
+
+    @override_settings(LAST_LOGIN_FLUSH_SECONDS=60)
+    def test_repeated_logins_are_coalesced(self):
+        first, second = self.users
+        with mock.patch('apps.authentication.last_login._ensure_worker'):
+            record_login(first)
+            record_login(second)
+            record_login(first)
+
+        self.assertIsNone(User.objects.get(pk=first.pk).last_login)
+        with self.assertNumQueries(1):
+            self.assertEqual(flush_last_logins(), 2)
+
+        self.assertEqual(User.objects.get(pk=first.pk).last_login, first.last_login)
+        self.assertEqual(User.objects.get(pk=second.pk).last_login, second.last_login)
+        self.assertEqual(flush_last_logins(), 0)
+
+
+class PasswordRehashTests(TestCase):
+    """Logging in rehashes passwords stored with another algorithm or cost."""
+
+    def login(self):
+        return APIClient().post(
+            '/api/auth/login/',
+            {'email': 'user@example.com', 'password': 'Passw0rd!'},
+            format='json'
+        )
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_cost_change(self):
+        user = create_user('user', 'user')
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+
+    @skipUnless(bcrypt, 'bcrypt no está instalado')
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_BCRYPT_ROUNDS=4)
+    def test_pbkdf2_rehashed_with_bcrypt(self):
+        user = create_user('user', 'user')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+        hashers = [
+            'apps.authentication.hashers.BCryptSHA256PasswordHasher',
+            'apps.authentication.hashers.PBKDF2PasswordHasher',
+        ]
+        with override_settings(PASSWORD_HASHER='bcrypt', PASSWORD_HASHERS=hashers):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('bcrypt_sha256$'))
@@ -0,0 +1,43 @@
+"""
+JWT token classes for the API.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken as BaseRefreshToken
+
+from .blacklist import is_revoked, revoke
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token checked against the cached blacklist
+    (apps/authentication/blacklist.py). Issuing one writes nothing.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin, which records every issued token
+        return super(BlacklistMixin, cls).for_user(user)
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        return revoke(self)
+
+    def rotate(self):
+        """
+        Revoke this token and turn it into its successor (new jti, exp
+        and iat; same user).
+
+        Raises:
+            TokenError: The token was already revoked, e.g. rotated or
+                logged out by a request handled by another worker
+        """
+        if api_settings.BLACKLIST_AFTER_ROTATION and not revoke(self):
+            raise TokenError(_('Token is blacklisted'))
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
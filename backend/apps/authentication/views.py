@@ -5,8 +5,8 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from django.utils import timezone
 from django.contrib.auth import update_session_auth_hash
 
@@ -18,6 +18,8 @@ from .serializers import (
     PasswordResetRequestSerializer,
     TokenRefreshSerializer
 )
+from .last_login import record_login
+from .tokens import RefreshToken
 
 
 def get_tokens_for_user(user):
@@ -81,9 +83,8 @@ def login_view(request):
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
-        # Update last login
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
+        # Written in batches after the response (apps/authentication/last_login.py)
+        record_login(user)
         
         # Generate tokens
         tokens = get_tokens_for_user(user)
@@ -109,6 +110,9 @@ def refresh_token_view(request):
     """
     Refresh access token using refresh token.
     POST /api/auth/refresh/
+    
+    With ROTATE_REFRESH_TOKENS the refresh token is exchanged for a new
+    one too; reusing the old one fails.
     """
     serializer = TokenRefreshSerializer(data=request.data)
     
@@ -120,10 +124,16 @@ def refresh_token_view(request):
     
     try:
         refresh_token = RefreshToken(serializer.validated_data['refreshToken'])
-        
-        return Response({
+        data = {
             'accessToken': str(refresh_token.access_token)
-        }, status=status.HTTP_200_OK)
+        }
+        
+        # The client must keep the new refresh token: the old one is revoked
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh_token.rotate()
+            data['refreshToken'] = str(refresh_token)
+        
+        return Response(data, status=status.HTTP_200_OK)
     
     except TokenError as e:
         return Response({
@@ -4,7 +4,25 @@ Comment models for the helpdesk application.
 from django.db import models
 from django.utils import timezone
 from apps.users.models import User
-from apps.tickets.models import Ticket
+from apps.tickets.models import Ticket, ticket_visibility
+
+
+class CommentQuerySet(models.QuerySet):
+    """
+    Custom queryset for comments.
+    """
+    def visible_to(self, user):
+        """
+        Comments on tickets `user` can see (Ticket.objects.visible_to);
+        private ones only for support and admins.
+        """
+        queryset = self
+        scope = ticket_visibility(user, 'ticket__')
+        if scope is not None:
+            queryset = queryset.filter(scope)
+        if user.role not in ['support', 'sysAdmin']:
+            queryset = queryset.filter(is_private=False)
+        return queryset
 
 
 class Comment(models.Model):
@@ -23,13 +41,28 @@ class Comment(models.Model):
         related_name='comments'
     )
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     is_private = models.BooleanField(default=False)
     
+    objects = CommentQuerySet.as_manager()
+    
     class Meta:
         db_table = 'comments'
         verbose_name = 'Comentario'
         verbose_name_plural = 'Comentarios'
         ordering = ['created_at']
+        indexes = [
+            # Thread pages (see CommentCursorPagination)
+            models.Index(
+                fields=['ticket', 'created_at', 'id'],
+                name='comments_ticket_created_idx'
+            ),
+            # Delta sync scans (see apps/tickets/sync.py)
+            models.Index(
+                fields=['updated_at'],
+                name='comments_updated_at_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.full_name} on #{self.ticket.id}"
@@ -0,0 +1,98 @@
+"""
+Tests for the comments app.
+"""
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.comments.models import Comment
+from apps.tickets.models import Ticket
+from apps.users.models import User
+
+
+def create_user(username, role):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Passw0rd!',
+        first_name=username,
+        last_name='Test',
+        role=role
+    )
+
+
+class CommentCursorPaginationTests(TestCase):
+    """Chat-style keyset pagination of a ticket's comments."""
+
+    # Ticket lookup and the page (with the thread count as a subquery)
+    PAGE_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+        cls.ticket = Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=cls.creator
+        )
+        cls.comments = [
+            Comment.objects.create(ticket=cls.ticket, author=cls.creator, text=f'Comentario {i}')
+            for i in range(7)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def get_page(self, cursor=''):
+        response = self.client.get(
+            f'/api/tickets/{self.ticket.id}/comments/',
+            {'cursor': cursor, 'page_size': 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, page):
+        return [comment['id'] for comment in page['results']]
+
+    def all_ids(self):
+        return [comment.id for comment in self.comments]
+
+    def follow_previous(self, page):
+        """Ids of `page` and every older page, oldest first."""
+        ids = self.ids(page)
+        while page['previousCursor']:
+            page = self.get_page(page['previousCursor'])
+            ids = self.ids(page) + ids
+        return ids
+
+    def test_first_request_returns_latest_page(self):
+        page = self.get_page()
+        self.assertEqual(page['count'], 7)
+        self.assertEqual(self.ids(page), self.all_ids()[-3:])
+        self.assertIsNotNone(page['previousCursor'])
+
+    def test_previous_cursor_reaches_the_start(self):
+        self.assertEqual(self.follow_previous(self.get_page()), self.all_ids())
+
+    def test_next_cursor_polls_for_new_comments(self):
+        cursor = self.get_page()['nextCursor']
+        page = self.get_page(cursor)
+        self.assertEqual(self.ids(page), [])
+        self.assertEqual(page['nextCursor'], cursor)
+
+        comment = Comment.objects.create(ticket=self.ticket, author=self.creator, text='Nuevo')
+        page = self.get_page(cursor)
+        self.assertEqual(self.ids(page), [comment.id])
+        self.assertIsNotNone(page['nextCursor'])
+
+    def test_page_boundary_inside_equal_created_at(self):
+        Comment.objects.filter(ticket=self.ticket).update(created_at=timezone.now())
+        self.assertEqual(self.follow_previous(self.get_page()), self.all_ids())
+
+    def test_count_and_page_in_one_query(self):
+        cursor = self.get_page()['previousCursor']
+        with self.assertNumQueries(self.PAGE_QUERIES):
+            page = self.get_page(cursor)
+        self.assertEqual(page['count'], 7)
+        self.assertEqual(self.ids(page), self.all_ids()[1:4])
@@ -5,6 +5,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db.models import Count, Subquery
 from django.shortcuts import get_object_or_404
 
 from .models import Comment
@@ -13,45 +14,76 @@ from .serializers import (
     CommentCreateSerializer,
     CommentUpdateSerializer
 )
+from apps.common.pagination import KeysetPagination
 from apps.tickets.models import Ticket
 
 
+class CommentCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for comment threads (chat-style loading): oldest
+    first, opening on the latest page; `previous` loads older comments
+    and `next` newer ones, including comments posted after the last load.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ascending = True
+    start_at_end = True
+    follow_tail = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # The thread total rides along in the page query as an
+        # uncorrelated subquery, so count and rows take one statement
+        total = queryset.order_by().values('ticket').annotate(total=Count('pk')).values('total')
+        page = super().paginate_queryset(
+            queryset.annotate(thread_count=Subquery(total)),
+            request,
+            view
+        )
+        if page:
+            self.count = page[0].thread_count
+        else:
+            self.count = queryset.count() if self.position is not None else 0
+        return page
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data = {'count': self.count, **response.data}
+        return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_ticket_comments_view(request, ticket_id):
     """
     List all comments for a ticket.
     GET /api/tickets/{ticket_id}/comments/
+    
+    Query params:
+    - cursor: keyset pagination cursor (empty for the latest page)
+    - page_size: comments per page (cursor mode)
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
     user = request.user
     
-    # Check if user can view this ticket
-    can_view = False
-    
-    if user.role == 'sysAdmin':
-        can_view = True
-    elif user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
-        can_view = True
-    elif ticket.creator == user:
-        can_view = True
-    
-    if not can_view:
-        return Response({
-            'error': 'No tienes permiso para ver este ticket'
-        }, status=status.HTTP_403_FORBIDDEN)
+    # Tickets the user cannot see are not found
+    ticket = get_object_or_404(Ticket.objects.visible_to(user), id=ticket_id)
     
-    # Get comments
-    comments = ticket.comments.all()
+    # Comments with their authors in the same query (private ones
+    # only for support/admin)
+    comments = Comment.objects.visible_to(user).filter(ticket=ticket).select_related('author')
     
-    # Filter private comments for regular users
-    if user.role not in ['support', 'sysAdmin']:
-        comments = comments.filter(is_private=False)
+    if CommentCursorPagination.cursor_query_param in request.query_params:
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request)
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
+    # Whole thread (older clients): count the rows already fetched
+    comments = list(comments.order_by('created_at', 'pk'))
     serializer = CommentSerializer(comments, many=True)
     
     return Response({
-        'count': comments.count(),
+        'count': len(comments),
         'comments': serializer.data
     }, status=status.HTTP_200_OK)
 
@@ -63,23 +95,8 @@ def create_comment_view(request, ticket_id):
     Create a comment on a ticket.
     POST /api/tickets/{ticket_id}/comments/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    user = request.user
-    
-    # Check if user can comment on this ticket
-    can_comment = False
-    
-    if user.role == 'sysAdmin':
-        can_comment = True
-    elif user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
-        can_comment = True
-    elif ticket.creator == user:
-        can_comment = True
-    
-    if not can_comment:
-        return Response({
-            'error': 'No tienes permiso para comentar en este ticket'
-        }, status=status.HTTP_403_FORBIDDEN)
+    # Users can comment on the tickets they can see
+    ticket = get_object_or_404(Ticket.objects.visible_to(request.user), id=ticket_id)
     
     serializer = CommentCreateSerializer(
         data=request.data,
@@ -109,15 +126,13 @@ def get_comment_detail_view(request, ticket_id, comment_id):
     Get comment details.
     GET /api/tickets/{ticket_id}/comments/{comment_id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    comment = get_object_or_404(Comment, id=comment_id, ticket=ticket)
-    user = request.user
-    
-    # Check permissions
-    if comment.is_private and user.role not in ['support', 'sysAdmin']:
-        return Response({
-            'error': 'No tienes permiso para ver este comentario'
-        }, status=status.HTTP_403_FORBIDDEN)
+    # Comments on tickets the user cannot see, or private ones for
+    # regular users, are not found
+    comment = get_object_or_404(
+        Comment.objects.visible_to(request.user).select_related('author'),
+        id=comment_id,
+        ticket_id=ticket_id
+    )
     
     serializer = CommentSerializer(comment)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -130,12 +145,15 @@ def update_comment_view(request, ticket_id, comment_id):
     Update a comment.
     PUT/PATCH /api/tickets/{ticket_id}/comments/{comment_id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    comment = get_object_or_404(Comment, id=comment_id, ticket=ticket)
     user = request.user
+    comment = get_object_or_404(
+        Comment.objects.visible_to(user).select_related('author'),
+        id=comment_id,
+        ticket_id=ticket_id
+    )
     
     # Only author or admin can update
-    if comment.author != user and user.role != 'sysAdmin':
+    if comment.author_id != user.id and user.role != 'sysAdmin':
         return Response({
             'error': 'Solo el autor o un administrador puede editar este comentario'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -169,12 +187,15 @@ def delete_comment_view(request, ticket_id, comment_id):
     Delete a comment.
     DELETE /api/tickets/{ticket_id}/comments/{comment_id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    comment = get_object_or_404(Comment, id=comment_id, ticket=ticket)
     user = request.user
+    comment = get_object_or_404(
+        Comment.objects.visible_to(user),
+        id=comment_id,
+        ticket_id=ticket_id
+    )
     
     # Only author or admin can delete
-    if comment.author != user and user.role != 'sysAdmin':
+    if comment.author_id != user.id and user.role != 'sysAdmin':
         return Response({
             'error': 'Solo el autor o un administrador puede eliminar este comentario'
         }, status=status.HTTP_403_FORBIDDEN)
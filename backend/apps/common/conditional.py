@@ -0,0 +1,58 @@
+"""
+Conditional request helpers (ETag / Last-Modified).
+
+Views compute cheap validators before doing the expensive work, answer
+304 Not Modified when the client copy is current, and attach the
+validators to full responses. Responses are per user, so they are marked
+`private, no-cache`: clients may store them but must revalidate.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+
+
+def make_etag(*parts):
+    """Strong ETag from the given parts."""
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    Return 304 Not Modified when If-None-Match / If-Modified-Since show
+    the client already has this representation (or 412 when a GET's
+    If-Match fails), otherwise None.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag, Last-Modified and Cache-Control to `response`."""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def if_match_failed(request, etag):
+    """
+    Whether the request carries an If-Match header that does not match
+    `etag` (optimistic concurrency check for writes).
+    """
+    header = request.META.get('HTTP_IF_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' not in etags and etag not in etags
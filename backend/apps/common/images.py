@@ -0,0 +1,163 @@
+"""
+Image renditions for ticket images and profile pictures.
+
+When a model using ImageRenditionsMixin saves a new image, its rendition
+fields (`<field>_thumb`, `<field>_medium`) are cleared and, once the
+transaction commits, a worker thread decodes the original with Pillow
+and writes one WebP per entry of RENDITIONS. The request never waits for
+the decoding. Renditions are re-encoded from pixels only: EXIF (GPS
+position, camera, ...) is dropped after applying its orientation.
+
+The worker stores the rendition names only if the row still has the
+same original, so a replaced image never gets stale renditions. Until
+then serializers return null and clients use the original URL.
+
+IMAGE_RENDITIONS_ASYNC = False renders inline (management commands,
+single-process deployments); generate_image_renditions backfills
+existing images.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Rendition name -> longest side in pixels
+RENDITIONS = {
+    'thumb': 256,
+    'medium': 1024,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def rendition_field(field_name, rendition):
+    """Name of the model field holding a rendition of `field_name`."""
+    return f'{field_name}_{rendition}'
+
+
+def rendition_path(source_name, rendition):
+    """Storage name for a rendition: `<dir>/renditions/<name>_<rendition>.webp`."""
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'renditions', f'{stem}_{rendition}.webp')
+
+
+def render_webp(image, max_side):
+    """Encode a copy of `image` fitting in max_side x max_side as WebP bytes."""
+    rendition = image.copy()
+    rendition.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    buffer = BytesIO()
+    # No exif= argument: the metadata of the original is not copied
+    rendition.save(buffer, 'WEBP', quality=settings.IMAGE_RENDITION_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _open_upright(file):
+    """Decode an image, rotated as its EXIF orientation says, in RGB(A)."""
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def generate_renditions(model, pk, field_name, source_name):
+    """
+    Render every rendition of `source_name` and attach them to the row.
+
+    Returns:
+        bool: Whether the row was updated (False when the image changed
+        or the row was deleted meanwhile, or the file is not an image)
+    """
+    field = model._meta.get_field(field_name)
+    storage = field.storage
+
+    try:
+        with storage.open(source_name, 'rb') as source:
+            image = _open_upright(source)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('No se pudo leer la imagen %s: %s', source_name, exc)
+        return False
+
+    names = {}
+    for rendition, max_side in RENDITIONS.items():
+        content = ContentFile(render_webp(image, max_side))
+        names[rendition_field(field_name, rendition)] = storage.save(
+            rendition_path(source_name, rendition),
+            content
+        )
+
+    values = dict(names)
+    if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+        # Delta sync clients pick up the new URLs
+        values['updated_at'] = timezone.now()
+
+    updated = model._default_manager.filter(pk=pk, **{field_name: source_name}).update(**values)
+    if not updated:
+        delete_files(storage, names.values())
+    return bool(updated)
+
+
+def delete_files(storage, names):
+    """Delete stored files, ignoring the ones already gone."""
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            pass  # A leftover rendition is harmless
+
+
+def _run(model, pk, field_name, source_name):
+    try:
+        generate_renditions(model, pk, field_name, source_name)
+    except Exception:
+        logger.exception('Error al generar las versiones reducidas de %s', source_name)
+    finally:
+        # Worker threads hold their own database connection
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_RENDITION_WORKERS,
+                thread_name_prefix='image-renditions'
+            )
+    return _executor
+
+
+def rendition_url(instance, field_name, rendition, request=None):
+    """Absolute URL of a rendition, or None while it is being generated."""
+    file = getattr(instance, rendition_field(field_name, rendition))
+    if not file:
+        return None
+    url = file.url
+    # Cloudinary URLs are already absolute
+    if request is not None and not url.startswith('http'):
+        return request.build_absolute_uri(url)
+    return url
+
+
+def schedule_renditions(instance, field_name):
+    """Generate the renditions of `instance.<field_name>` after commit."""
+    model, pk, source_name = type(instance), instance.pk, getattr(instance, field_name).name
+
+    def submit():
+        if settings.IMAGE_RENDITIONS_ASYNC:
+            _get_executor().submit(_run, model, pk, field_name, source_name)
+        else:
+            generate_renditions(model, pk, field_name, source_name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,40 @@
+"""
+Generate the WebP renditions of ticket images and profile pictures that
+do not have them yet (images uploaded before renditions existed, or whose
+background job was lost on a restart).
+
+Usage:
+    python manage.py generate_image_renditions
+"""
+from django.core.management.base import BaseCommand
+
+from apps.common.images import generate_renditions, rendition_field
+from apps.tickets.models import Ticket
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera las miniaturas WebP de las imágenes de tickets y fotos de '
+        'perfil que aún no las tienen.'
+    )
+
+    def handle(self, *args, **options):
+        for model in (Ticket, User):
+            for field_name in model.rendition_fields:
+                queryset = model._default_manager.exclude(**{field_name: ''}).filter(**{
+                    f'{field_name}__isnull': False,
+                    f'{rendition_field(field_name, "thumb")}__isnull': True,
+                })
+
+                generated = failed = 0
+                for pk, source_name in queryset.values_list('pk', field_name).iterator():
+                    if generate_renditions(model, pk, field_name, source_name):
+                        generated += 1
+                    else:
+                        failed += 1
+
+                self.stdout.write(self.style.SUCCESS(
+                    f'{model._meta.verbose_name_plural}.{field_name}: '
+                    f'{generated} generadas, {failed} sin imagen válida'
+                ))
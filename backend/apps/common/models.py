@@ -1,7 +1,7 @@
 """
 Common models and utilities for the helpdesk application.
 """
-from django.db import models
+from django.db import models, transaction
 
 
 class TimestampedModel(models.Model):
@@ -14,3 +14,190 @@ class TimestampedModel(models.Model):
     
     class Meta:
         abstract = True
+
+
+# Marker for fields that were deferred when the instance was loaded
+_DEFERRED = object()
+
+
+class FieldTrackerMixin:
+    """
+    Model mixin that remembers the values an instance was loaded with.
+    
+    save() uses the snapshot to write only the columns that changed
+    (plus auto_now fields), and models can detect transitions with
+    has_changed()/get_loaded_value() instead of re-reading the row.
+    The snapshot is one tuple per instance, indexed by a per-class tuple
+    of attnames, so loading long lists stays cheap.
+    """
+
+    @classmethod
+    def _tracker_attnames(cls):
+        """Concrete non-pk attnames, computed once per model class."""
+        attnames = cls.__dict__.get('_tracker_attnames_cache')
+        if attnames is None:
+            attnames = tuple(
+                field.attname for field in cls._meta.concrete_fields
+                if not field.primary_key
+            )
+            cls._tracker_attnames_cache = attnames
+            cls._tracker_index_cache = {
+                name: index for index, name in enumerate(attnames)
+            }
+        return attnames
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_loaded_values(fields)
+
+    def save(self, *args, **kwargs):
+        """Save only changed columns when the loaded values are known."""
+        if (not args and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert') and not self._state.adding):
+            changed = self.get_changed_fields()
+            if changed is not None:
+                auto_now = [
+                    field.attname for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False)
+                ]
+                kwargs['update_fields'] = set(changed) | set(auto_now)
+        
+        super().save(*args, **kwargs)
+        # Only the written columns are now the stored ones
+        update_fields = kwargs.get('update_fields', args[3] if len(args) > 3 else None)
+        self._snapshot_loaded_values(update_fields)
+
+    def get_changed_fields(self):
+        """
+        Attnames whose value differs from the loaded one,
+        or None when the instance was not loaded from the database.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        
+        return [
+            name
+            for name, old in zip(self._tracker_attnames(), loaded)
+            if self._value_changed(name, old)
+        ]
+
+    def has_changed(self, field_name):
+        """Whether `field_name` differs from its loaded value."""
+        attname = self._meta.get_field(field_name).attname
+        return self._value_changed(attname, self.get_loaded_value(field_name))
+
+    def get_loaded_value(self, field_name):
+        """
+        Value `field_name` had when loaded. Instances built in memory with
+        a pk (no snapshot) fall back to reading the column.
+        """
+        attname = self._meta.get_field(field_name).attname
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            if self.pk is None:
+                return None
+            return type(self)._base_manager.using(self._state.db).filter(
+                pk=self.pk
+            ).values_list(attname, flat=True).first()
+        
+        self._tracker_attnames()
+        return loaded[self._tracker_index_cache[attname]]
+
+    def was_loaded(self, field_name):
+        """Whether the snapshot holds a value for `field_name` (not deferred)."""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return False
+        
+        attname = self._meta.get_field(field_name).attname
+        self._tracker_attnames()
+        return loaded[self._tracker_index_cache[attname]] is not _DEFERRED
+
+    def _value_changed(self, attname, old):
+        if attname not in self.__dict__:
+            # Still deferred: cannot have been modified
+            return False
+        if old is _DEFERRED:
+            # Deferred when loaded and assigned without being read
+            return True
+        
+        current = self.__dict__[attname]
+        if getattr(current, '_committed', True) is False:
+            # Newly assigned file not yet written to storage
+            return True
+        return _comparable(current) != _comparable(old)
+
+    def _snapshot_loaded_values(self, fields=None):
+        attnames = self._tracker_attnames()
+        loaded = getattr(self, '_loaded_values', None)
+        
+        if fields is None:
+            self._loaded_values = tuple(
+                self.__dict__.get(name, _DEFERRED) for name in attnames
+            )
+            return
+        
+        # Without a snapshot the other columns are unknown, as if deferred
+        values = list(loaded) if loaded is not None else [_DEFERRED] * len(attnames)
+        for field_name in fields:
+            attname = self._meta.get_field(field_name).attname
+            values[self._tracker_index_cache[attname]] = self.__dict__.get(attname, _DEFERRED)
+        self._loaded_values = tuple(values)
+
+
+class ImageRenditionsMixin:
+    """
+    Model mixin that keeps WebP renditions of image fields (see
+    apps/common/images.py). Goes before FieldTrackerMixin, which it uses
+    to detect a new image.
+    
+    Each field in `rendition_fields` needs one nullable field per
+    rendition, named `<field>_thumb` and `<field>_medium`.
+    """
+    rendition_fields = ()
+
+    def save(self, *args, **kwargs):
+        from .images import RENDITIONS, delete_files, rendition_field, schedule_renditions
+        
+        replaced = [
+            field_name for field_name in self.rendition_fields
+            if field_name in self.__dict__
+            and (self._state.adding or self.has_changed(field_name))
+        ]
+        stale = []
+        for field_name in replaced:
+            for rendition in RENDITIONS:
+                name = rendition_field(field_name, rendition)
+                current = getattr(self, name)
+                if current:
+                    stale.append((current.storage, current.name))
+                setattr(self, name, None)
+        
+        update_fields = kwargs.get('update_fields')
+        if replaced and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *(
+                rendition_field(field_name, rendition)
+                for field_name in replaced for rendition in RENDITIONS
+            )}
+        
+        super().save(*args, **kwargs)
+        
+        for field_name in replaced:
+            if getattr(self, field_name):
+                schedule_renditions(self, field_name)
+        for storage, name in stale:
+            transaction.on_commit(lambda storage=storage, name=name: delete_files(storage, [name]))
+
+
+def _comparable(value):
+    """File fields compare by stored name; everything else by value."""
+    if hasattr(value, 'field') and hasattr(value, 'storage'):
+        return value.name or None
+    return value
@@ -0,0 +1,182 @@
+"""
+Shared pagination classes.
+"""
+import base64
+import binascii
+import json
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over (created_at, id), newest first by
+    default (`ascending = True` for oldest first).
+    
+    Each page is a single range query on the ordering keys: no OFFSET and
+    no COUNT(*). Rows inserted while a client is scrolling sort outside
+    the cursor's range, so they never shift or duplicate other pages.
+    
+    Clients opt in with ?cursor= (empty for the first page) and follow
+    `next`/`nextCursor` forwards or `previous`/`previousCursor` back
+    towards the start of the ordering. The first page starts at the end
+    of the ordering when `start_at_end` is set (chat threads show the
+    latest messages first), and with `follow_tail` the last page still
+    returns a `nextCursor` so clients can poll for rows added later.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor inválido'
+    ascending = False
+    start_at_end = False
+    follow_tail = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of rows next to the request cursor, in ordering order."""
+        rows = list(self.get_page_queryset(queryset, request))
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, self.position is not None
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        
+        self.page = rows
+        return self.page
+
+    def get_page_queryset(self, queryset, request):
+        """
+        The unevaluated page query: rows beyond the request cursor in its
+        direction, plus one extra row to know whether there are more.
+        Backward pages come out in reverse order.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        
+        cursor = self.decode_cursor(request, queryset)
+        if cursor is None:
+            self.position, self.reverse = None, self.start_at_end
+        else:
+            created_at, pk, self.reverse = cursor
+            self.position = created_at, pk
+        
+        # Direction the query scans created_at in
+        increasing = self.ascending != self.reverse
+        if self.position is not None:
+            created_at, pk = self.position
+            if increasing:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) |
+                    Q(created_at=created_at, pk__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) |
+                    Q(created_at=created_at, pk__lt=pk)
+                )
+        
+        ordering = ('created_at', 'pk') if increasing else ('-created_at', '-pk')
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def get_paginated_response(self, data):
+        """Build the paginated response (no total count)."""
+        next_cursor = self.get_next_cursor()
+        previous_cursor = self.get_previous_cursor()
+        return Response({
+            'next': self.get_link(next_cursor),
+            'nextCursor': next_cursor,
+            'previous': self.get_link(previous_cursor),
+            'previousCursor': previous_cursor,
+            'results': data
+        })
+
+    def get_page_size(self, request):
+        """Read page_size from the query string, bounded by max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_cursor(self):
+        """Cursor pointing after the last row of the current page."""
+        if self.page and (self.has_next or self.follow_tail):
+            last = self.page[-1]
+            return self.encode_cursor(last.created_at, last.pk)
+        if self.follow_tail and self.position is not None and not self.reverse:
+            # Nothing new yet: poll again from the same place
+            return self.request.query_params[self.cursor_query_param]
+        return None
+
+    def get_previous_cursor(self):
+        """Cursor pointing before the first row of the current page."""
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        return self.encode_cursor(first.created_at, first.pk, reverse=True)
+
+    def get_link(self, cursor):
+        """Absolute URL of the page at `cursor`."""
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, created_at, pk, reverse=False):
+        """Encode an ordering position and direction as an opaque URL-safe token."""
+        position = [created_at.isoformat(), pk]
+        if reverse:
+            position.append('prev')
+        payload = json.dumps(position).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset):
+        """
+        Decode the request cursor into (created_at, pk, reverse);
+        None means first page. The pk must fit the id column of
+        `queryset`'s model.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            created_at, pk, *direction = json.loads(base64.urlsafe_b64decode(padded))
+            created_at = parse_datetime(created_at)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        
+        if (
+            created_at is None or timezone.is_naive(created_at)
+            or type(pk) is not int or direction not in ([], ['prev'])
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        
+        # An id the column cannot hold overflows in the database driver
+        min_pk, max_pk = self.get_pk_range(queryset)
+        if not min_pk <= pk <= max_pk:
+            raise NotFound(self.invalid_cursor_message)
+        
+        return created_at, pk, bool(direction)
+
+    def get_pk_range(self, queryset):
+        """Smallest and largest value of the id column of `queryset`'s model."""
+        ops = connections[queryset.db].ops
+        min_pk, max_pk = ops.integer_field_range(queryset.model._meta.pk.get_internal_type())
+        # Backends without column ranges (SQLite) store 64-bit integers
+        if min_pk is None:
+            min_pk = -2 ** 63
+        if max_pk is None:
+            max_pk = 2 ** 63 - 1
+        return min_pk, max_pk
@@ -0,0 +1,221 @@
+"""
+Aggregation helpers for metrics endpoints.
+"""
+import math
+
+from django.db import connections
+from django.db.models import (
+    Aggregate, Avg, Count, DateTimeField, DurationField, ExpressionWrapper,
+    F, IntegerField, Max, OuterRef, Q, Subquery
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.users.models import User
+from apps.tickets.models import Ticket
+from apps.comments.models import Comment
+
+
+# Percentiles reported alongside the average duration (name -> fraction)
+DURATION_PERCENTILES = {
+    'median': 0.5,
+    'p90': 0.9,
+    'p99': 0.99,
+}
+
+
+class PercentileCont(Aggregate):
+    """
+    PostgreSQL ordered-set aggregate PERCENTILE_CONT(fraction).
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def ticket_counts(queryset=None):
+    """
+    Count tickets by status, by priority and unassigned in a single query.
+    
+    Args:
+        queryset (QuerySet): Optional ticket queryset to aggregate over
+    
+    Returns:
+        dict: {'total': int, 'status': {...}, 'priority': {...}, 'unassigned': int}
+    """
+    if queryset is None:
+        queryset = Ticket.objects.all()
+    
+    aggregates = {
+        'total': Count('id'),
+        'unassigned': Count('id', filter=Q(assignee__isnull=True)),
+    }
+    for value, _ in Ticket.STATUS_CHOICES:
+        aggregates[f'status_{value}'] = Count('id', filter=Q(status=value))
+    for value, _ in Ticket.PRIORITY_CHOICES:
+        aggregates[f'priority_{value}'] = Count('id', filter=Q(priority=value))
+    
+    result = queryset.order_by().aggregate(**aggregates)
+    
+    return {
+        'total': result['total'],
+        'unassigned': result['unassigned'],
+        'status': {
+            value: result[f'status_{value}'] for value, _ in Ticket.STATUS_CHOICES
+        },
+        'priority': {
+            value: result[f'priority_{value}'] for value, _ in Ticket.PRIORITY_CHOICES
+        },
+    }
+
+
+def user_counts():
+    """
+    Count total and active users in a single query.
+    
+    Returns:
+        dict: {'total': int, 'active': int}
+    """
+    return User.objects.order_by().aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+
+
+def user_activity_queryset(queryset=None):
+    """
+    Annotate users with their activity metrics in a single query.
+    
+    Every per-user figure is a correlated subquery, so joins never fan out
+    and the result can be ordered and sliced in SQL.
+    
+    Annotations:
+        tickets_created, tickets_assigned, tickets_resolved,
+        comments_posted, last_activity
+    
+    Args:
+        queryset (QuerySet): Optional user queryset to annotate
+    
+    Returns:
+        QuerySet: Annotated users ordered by most recent activity
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    
+    tickets = Ticket.objects.order_by()
+    comments = Comment.objects.order_by()
+    base_activity = Coalesce('last_login', 'created_at')
+    
+    return queryset.annotate(
+        tickets_created=_count_subquery(tickets.filter(creator=OuterRef('pk')), 'creator'),
+        tickets_assigned=_count_subquery(tickets.filter(assignee=OuterRef('pk')), 'assignee'),
+        tickets_resolved=_count_subquery(
+            tickets.filter(assignee=OuterRef('pk'), status='resolved'), 'assignee'
+        ),
+        comments_posted=_count_subquery(comments.filter(author=OuterRef('pk')), 'author'),
+        last_ticket_at=_max_subquery(tickets.filter(creator=OuterRef('pk')), 'creator'),
+        last_comment_at=_max_subquery(comments.filter(author=OuterRef('pk')), 'author'),
+    ).annotate(
+        last_activity=Greatest(
+            base_activity,
+            Coalesce('last_ticket_at', base_activity),
+            Coalesce('last_comment_at', base_activity),
+        )
+    ).order_by('-last_activity', '-id')
+
+
+def _count_subquery(queryset, group_field):
+    """COUNT(*) of a correlated queryset, 0 when there are no rows."""
+    counts = queryset.values(group_field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _max_subquery(queryset, group_field):
+    """MAX(created_at) of a correlated queryset, NULL when there are no rows."""
+    latest = queryset.values(group_field).annotate(latest=Max('created_at')).values('latest')
+    return Subquery(latest, output_field=DateTimeField())
+
+
+def duration_stats(queryset, start_field, end_field, percentiles=True):
+    """
+    Compute duration statistics (end_field - start_field) in the database.
+    
+    On PostgreSQL the average and percentiles come from a single aggregate
+    query. Other backends (SQLite in development) get the average from one
+    aggregate and each percentile from one ordered OFFSET lookup, so model
+    instances are never loaded.
+    
+    Args:
+        queryset (QuerySet): Rows to aggregate over
+        start_field (str): Name of the start datetime field
+        end_field (str): Name of the end datetime field
+        percentiles (bool): Whether to compute DURATION_PERCENTILES
+    
+    Returns:
+        dict: {'count': int, 'average': float, 'median': float, ...} in hours
+    """
+    duration = ExpressionWrapper(
+        F(end_field) - F(start_field),
+        output_field=DurationField()
+    )
+    queryset = queryset.order_by()
+    use_percentile_cont = connections[queryset.db].vendor == 'postgresql'
+    
+    aggregates = {
+        'count': Count('pk'),
+        'average': Avg(duration, output_field=DurationField()),
+    }
+    if percentiles and use_percentile_cont:
+        for name, fraction in DURATION_PERCENTILES.items():
+            aggregates[name] = PercentileCont(
+                duration, fraction, output_field=DurationField()
+            )
+    
+    result = queryset.aggregate(**aggregates)
+    
+    stats = {
+        'count': result['count'],
+        'average': _to_hours(result['average']),
+    }
+    if percentiles:
+        for name, fraction in DURATION_PERCENTILES.items():
+            if use_percentile_cont:
+                stats[name] = _to_hours(result[name])
+            else:
+                stats[name] = _percentile_fallback(
+                    queryset, duration, result['count'], fraction
+                )
+    
+    return stats
+
+
+def _percentile_fallback(queryset, duration, count, fraction):
+    """
+    Linear-interpolated percentile (same definition as PERCENTILE_CONT)
+    reading at most two ordered durations from the database.
+    """
+    if not count:
+        return 0.0
+    
+    position = fraction * (count - 1)
+    lower = math.floor(position)
+    values = list(
+        queryset.annotate(duration=duration)
+        .order_by('duration')
+        .values_list('duration', flat=True)[lower:lower + 2]
+    )
+    if not values:
+        return 0.0
+    
+    low = _to_hours(values[0])
+    high = _to_hours(values[-1])
+    return low + (high - low) * (position - lower)
+
+
+def _to_hours(value):
+    """Convert a timedelta (or None) into hours."""
+    if value is None:
+        return 0.0
+    return value.total_seconds() / 3600
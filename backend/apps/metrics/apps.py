@@ -8,3 +8,6 @@ class MetricsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.metrics'
     verbose_name = 'Métricas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
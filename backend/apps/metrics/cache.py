@@ -0,0 +1,143 @@
+"""
+Cache for dashboard metrics.
+
+Metric payloads are stored in the Django cache under a key that embeds a
+generation number for every model group they depend on ('tickets',
+'comments', 'users'). The signal handlers in apps/metrics/signals.py bump
+a group's generation on post_save/post_delete, which orphans every entry
+built from the old data in O(1); orphans simply expire. Writes made with
+QuerySet.update() send no signals and bump the generation themselves
+(apps/tickets/signals.py).
+
+METRICS_CACHE_MAX_STALENESS bounds how old an entry may get (time-based
+figures such as "created today" change without any write); 0 disables
+the cache. Hits and misses are counted per metric.
+"""
+import functools
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CACHE_PREFIX = 'metrics'
+GROUPS = ('tickets', 'comments', 'users')
+
+
+def _generation_key(group):
+    return f'{CACHE_PREFIX}:generation:{group}'
+
+
+def _stats_key(name, outcome):
+    return f'{CACHE_PREFIX}:stats:{name}:{outcome}'
+
+
+def _names_key():
+    return f'{CACHE_PREFIX}:stats:names'
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def bump_generation(group):
+    """Invalidate every cached metric that depends on `group`."""
+    try:
+        cache.incr(_generation_key(group))
+    except ValueError:
+        # Evicted: restart from a value no previous generation used
+        cache.set(_generation_key(group), time.time_ns(), None)
+
+
+def _generations(groups):
+    keys = [_generation_key(group) for group in groups]
+    values = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in values}
+    if missing:
+        cache.set_many(missing, None)
+        values.update(missing)
+    return [values[key] for key in keys]
+
+
+def _record(name, outcome):
+    names = cache.get(_names_key()) or ()
+    if name not in names:
+        cache.set(_names_key(), tuple(names) + (name,), None)
+    _incr(_stats_key(name, outcome))
+
+
+def get_or_compute(name, depends_on, compute, params=()):
+    """
+    Return the cached value of metric `name` for `params`, computing and
+    storing it on a miss.
+
+    Args:
+        name (str): Metric name
+        depends_on (tuple): Model groups whose changes invalidate it
+        compute (callable): Builds the value (must be picklable)
+        params (tuple): Extra key parts (e.g. filters or page)
+    """
+    timeout = settings.METRICS_CACHE_MAX_STALENESS
+    if not timeout:
+        return compute()
+
+    generations = '.'.join(str(generation) for generation in _generations(depends_on))
+    key = ':'.join([CACHE_PREFIX, name, generations] + [str(part) for part in params])
+
+    value = cache.get(key)
+    if value is not None:
+        _record(name, 'hits')
+        return value
+
+    _record(name, 'misses')
+    value = compute()
+    cache.set(key, value, timeout)
+    return value
+
+
+def cached_metric(name, depends_on):
+    """
+    Decorator form of get_or_compute; positional arguments of the wrapped
+    function become part of the cache key.
+    """
+    def decorator(compute):
+        @functools.wraps(compute)
+        def wrapper(*args):
+            return get_or_compute(name, depends_on, lambda: compute(*args), args)
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Hit/miss counters per metric."""
+    names = cache.get(_names_key()) or ()
+    keys = [_stats_key(name, outcome) for name in names for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+
+    stats = []
+    for name in names:
+        hits = values.get(_stats_key(name, 'hits'), 0)
+        misses = values.get(_stats_key(name, 'misses'), 0)
+        total = hits + misses
+        stats.append({
+            'name': name,
+            'hits': hits,
+            'misses': misses,
+            'hitRate': round(hits / total * 100, 2) if total else 0.0,
+        })
+    return stats
+
+
+def clear_metrics_cache():
+    """Invalidate every metric and reset the counters."""
+    names = cache.get(_names_key()) or ()
+    cache.delete_many(
+        [_stats_key(name, outcome) for name in names for outcome in ('hits', 'misses')]
+        + [_names_key()]
+    )
+    for group in GROUPS:
+        bump_generation(group)
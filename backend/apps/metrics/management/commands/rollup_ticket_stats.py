@@ -0,0 +1,56 @@
+"""
+Rebuild the daily ticket rollups (TicketDailyStat).
+
+Usage:
+    python manage.py rollup_ticket_stats
+    python manage.py rollup_ticket_stats --days 7
+    python manage.py rollup_ticket_stats --start 2024-01-01 --end 2024-01-31
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.metrics.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula las estadísticas diarias de tickets a partir de la tabla tickets. '
+        'Sin argumentos recalcula todo el historial.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Recalcular solo los últimos N días (incluido hoy).'
+        )
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='Primer día a recalcular (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Último día a recalcular (YYYY-MM-DD).'
+        )
+
+    def handle(self, *args, **options):
+        start = options['start']
+        end = options['end']
+
+        if options['days'] is not None:
+            if options['days'] < 1:
+                raise CommandError('--days debe ser al menos 1')
+            start = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        if start and end and start > end:
+            raise CommandError('--start debe ser anterior a --end')
+
+        summary = rebuild_daily_stats(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Estadísticas diarias recalculadas: {summary['rows']} filas "
+            f"en {summary['seconds']}s"
+        ))
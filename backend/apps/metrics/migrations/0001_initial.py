@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:06
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_name', models.CharField(max_length=100)),
+                ('metric_value', models.JSONField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Métrica del Sistema',
+                'verbose_name_plural': 'Métricas del Sistema',
+                'db_table': 'system_metrics',
+                'ordering': ['-recorded_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('priority', models.CharField(max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('created_count', models.IntegerField(default=0)),
+                ('resolved_count', models.IntegerField(default=0)),
+                ('resolution_time_total', models.DurationField(default=datetime.timedelta)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Estadística Diaria de Tickets',
+                'verbose_name_plural': 'Estadísticas Diarias de Tickets',
+                'db_table': 'ticket_daily_stats',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date'], name='ticket_daily_stats_date_idx'), models.Index(fields=['assignee', 'date'], name='ticket_daily_stats_agent_idx')],
+            },
+        ),
+    ]
@@ -1,9 +1,13 @@
 """
 Metrics models for the helpdesk application.
 """
+from datetime import timedelta
+
 from django.db import models
 from django.utils import timezone
 
+from apps.users.models import User
+
 
 class SystemMetric(models.Model):
     """
@@ -21,3 +25,41 @@ class SystemMetric(models.Model):
     
     def __str__(self):
         return f"{self.metric_name} - {self.recorded_at}"
+
+
+class TicketDailyStat(models.Model):
+    """
+    Daily ticket rollup per priority, current status and assignee.
+    
+    `created_count` counts tickets created on `date`; `resolved_count` and
+    `resolution_time_total` cover tickets resolved on `date`. Rows are
+    written by the rollup_ticket_stats command and kept current by the
+    ticket signals (apps/metrics/rollups.py). A combination may appear in
+    more than one row, so readers always aggregate with Sum.
+    """
+    date = models.DateField()
+    priority = models.CharField(max_length=10)
+    status = models.CharField(max_length=20)
+    assignee = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_count = models.IntegerField(default=0)
+    resolved_count = models.IntegerField(default=0)
+    resolution_time_total = models.DurationField(default=timedelta)
+    
+    class Meta:
+        db_table = 'ticket_daily_stats'
+        verbose_name = 'Estadística Diaria de Tickets'
+        verbose_name_plural = 'Estadísticas Diarias de Tickets'
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date'], name='ticket_daily_stats_date_idx'),
+            models.Index(fields=['assignee', 'date'], name='ticket_daily_stats_agent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.priority}/{self.status} - {self.created_count}"
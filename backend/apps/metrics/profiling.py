@@ -0,0 +1,174 @@
+"""
+Request profiling.
+
+RequestProfilingMiddleware records, per resolved URL name, the wall time,
+number of database queries and time spent in the database for every
+request. Samples are kept in a bounded in-process window per endpoint
+(REQUEST_PROFILING_WINDOW) and summarised as p50/p95/p99 by
+GET /api/metrics/system/endpoints/.
+
+Streaming responses (the ticket export) run their queries while the body
+is sent, so they are recorded when the stream is closed; they get no
+Server-Timing header, which is sent before the body.
+
+Enabled with REQUEST_PROFILING_ENABLED. When disabled the middleware
+raises MiddlewareNotUsed, so Django drops it from the chain entirely.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+PROFILE_PERCENTILES = {'p50': .5, 'p95': .95, 'p99': .99}
+
+
+class EndpointProfiles:
+    """
+    Thread-safe rolling window of (wall_ms, queries, db_ms) samples per
+    endpoint name. Statistics are per process.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, wall_ms, queries, db_ms):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append((wall_ms, queries, db_ms))
+            self._totals[name] = self._totals.get(name, 0) + 1
+
+    def summary(self):
+        """
+        Return one dict per endpoint, slowest p95 wall time first.
+        """
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            totals = dict(self._totals)
+
+        endpoints = []
+        for name, samples in snapshot.items():
+            wall, queries, db = zip(*samples)
+            endpoints.append({
+                'name': name,
+                'requests': totals[name],
+                'samples': len(samples),
+                'wallTime': _distribution(wall),
+                'queries': _distribution(queries),
+                'dbTime': _distribution(db),
+            })
+
+        endpoints.sort(key=lambda endpoint: endpoint['wallTime']['p95'], reverse=True)
+        return endpoints
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+
+profiles = EndpointProfiles(getattr(settings, 'REQUEST_PROFILING_WINDOW', 1000))
+
+
+class _QueryTimer:
+    """execute_wrapper counting queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestProfilingMiddleware:
+    """
+    Record wall time, query count and DB time per URL name and optionally
+    report them in a Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'REQUEST_PROFILING_SERVER_TIMING', False)
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        start = time.perf_counter()
+
+        with _timed_queries(timer):
+            response = self.get_response(request)
+
+        if response.streaming:
+            # The body and its queries are produced while the server sends
+            # it, after this returns: record when the stream is closed
+            response.streaming_content = self._profile_stream(
+                response.streaming_content, request, timer, start
+            )
+            return response
+
+        wall_ms, db_ms = self._record(request, timer, start)
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{timer.count} queries", '
+                f'app;dur={wall_ms - db_ms:.1f}, '
+                f'total;dur={wall_ms:.1f}'
+            )
+
+        return response
+
+    def _profile_stream(self, content, request, timer, start):
+        try:
+            with _timed_queries(timer):
+                yield from content
+        finally:
+            self._record(request, timer, start)
+
+    def _record(self, request, timer, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = timer.seconds * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            profiles.record(match.url_name or match.view_name, wall_ms, timer.count, db_ms)
+        return wall_ms, db_ms
+
+
+def _timed_queries(timer):
+    """Context manager sending every connection's queries through `timer`."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+    return stack
+
+
+def _distribution(values):
+    """p50/p95/p99/max of a sample, linear-interpolated like PERCENTILE_CONT."""
+    ordered = sorted(values)
+    stats = {name: round(_percentile(ordered, fraction), 2) for name, fraction in PROFILE_PERCENTILES.items()}
+    stats['max'] = round(ordered[-1], 2)
+    return stats
+
+
+def _percentile(ordered, fraction):
+    position = fraction * (len(ordered) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
@@ -0,0 +1,283 @@
+"""
+Daily ticket rollups (TicketDailyStat).
+
+Each ticket contributes one created_count to the row for (creation date,
+priority, status, assignee) and, once resolved, one resolved_count plus
+its resolution time to the row for its resolution date. Dates are local
+dates in settings.TIME_ZONE.
+
+rebuild_daily_stats() recomputes a date range from the tickets table
+(management command rollup_ticket_stats). Between rebuilds the ticket
+signals call apply_ticket_change(), which moves a ticket's contribution
+when its dates, priority, status or assignee change. QuerySet.update()
+bypasses model signals: apps.tickets.bulk announces its writes with
+tickets_bulk_updated, any other bulk writer must rebuild the affected days.
+"""
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import SystemMetric, TicketDailyStat
+
+
+ROLLUP_FIELDS = ('created_at', 'resolved_at', 'priority', 'status', 'assignee_id')
+
+
+# Returned by loaded_ticket_state() when the save cannot move the ticket
+UNCHANGED = object()
+
+
+def ticket_state(ticket, previous=None):
+    """
+    The values of `ticket` that determine its rollup rows. Deferred
+    fields are taken from `previous` instead of being loaded.
+    """
+    if previous is None:
+        return tuple(getattr(ticket, field) for field in ROLLUP_FIELDS)
+    return tuple(
+        ticket.__dict__.get(field, value) for field, value in zip(ROLLUP_FIELDS, previous)
+    )
+
+
+def loaded_ticket_state(ticket):
+    """
+    The rollup values `ticket` has in the database before the pending
+    save: UNCHANGED when none of them was modified, otherwise from its
+    loaded snapshot, or one query when it has none (or they were deferred).
+    """
+    changed = ticket.get_changed_fields()
+    if changed is not None:
+        if not set(ROLLUP_FIELDS) & set(changed):
+            return UNCHANGED
+        if all(ticket.was_loaded(field) for field in ROLLUP_FIELDS):
+            return tuple(ticket.get_loaded_value(field) for field in ROLLUP_FIELDS)
+
+    from apps.tickets.models import Ticket
+    row = Ticket.objects.filter(pk=ticket.pk).values_list(*ROLLUP_FIELDS).first()
+    return tuple(row) if row else None
+
+
+def _contributions(state):
+    """{(date, priority, status, assignee_id): [created, resolved, duration]}"""
+    contributions = {}
+    if state is None:
+        return contributions
+
+    created_at, resolved_at, priority, status, assignee_id = state
+    key = (timezone.localdate(created_at), priority, status, assignee_id)
+    contributions[key] = [1, 0, timedelta()]
+
+    if resolved_at is not None:
+        key = (timezone.localdate(resolved_at), priority, status, assignee_id)
+        row = contributions.setdefault(key, [0, 0, timedelta()])
+        row[1] += 1
+        row[2] += resolved_at - created_at
+
+    return contributions
+
+
+def apply_ticket_change(previous, current):
+    """
+    Move a ticket's contribution from state `previous` to `current`
+    (either may be None for inserts and deletes).
+    """
+    apply_ticket_changes([(previous, current)])
+
+
+def apply_ticket_changes(changes):
+    """
+    Apply many (previous, current) state pairs, merging their deltas so
+    each affected rollup row is written once.
+    """
+    deltas = defaultdict(lambda: [0, 0, timedelta()])
+    for previous, current in changes:
+        if previous == current:
+            continue
+        for sign, state in ((-1, previous), (1, current)):
+            for key, (created, resolved, duration) in _contributions(state).items():
+                delta = deltas[key]
+                delta[0] += sign * created
+                delta[1] += sign * resolved
+                delta[2] += sign * duration
+
+    for (date, priority, status, assignee_id), (created, resolved, duration) in deltas.items():
+        if not created and not resolved and not duration:
+            continue
+        # Adjust a single row (concurrent inserts may have left duplicates)
+        row_id = TicketDailyStat.objects.filter(
+            date=date, priority=priority, status=status, assignee_id=assignee_id
+        ).values('id')[:1]
+        rows = TicketDailyStat.objects.filter(id__in=row_id).update(
+            created_count=F('created_count') + created,
+            resolved_count=F('resolved_count') + resolved,
+            resolution_time_total=F('resolution_time_total') + duration,
+        )
+        if not rows:
+            TicketDailyStat.objects.create(
+                date=date,
+                priority=priority,
+                status=status,
+                assignee_id=assignee_id,
+                created_count=created,
+                resolved_count=resolved,
+                resolution_time_total=duration,
+            )
+
+
+def rebuild_daily_stats(start=None, end=None):
+    """
+    Recompute the rollup rows for local dates start..end (inclusive; None
+    means unbounded) with two grouped queries over tickets.
+
+    Returns:
+        dict: Summary of the run (also stored as a SystemMetric)
+    """
+    from apps.tickets.models import Ticket
+
+    began = time.perf_counter()
+    dimensions = ('day', 'priority', 'status', 'assignee_id')
+
+    created = Ticket.objects.order_by()
+    resolved = Ticket.objects.order_by().filter(resolved_at__isnull=False)
+    stats = TicketDailyStat.objects.all()
+    if start is not None:
+        created = created.filter(created_at__gte=_day_start(start))
+        resolved = resolved.filter(resolved_at__gte=_day_start(start))
+        stats = stats.filter(date__gte=start)
+    if end is not None:
+        created = created.filter(created_at__lt=_day_start(end + timedelta(days=1)))
+        resolved = resolved.filter(resolved_at__lt=_day_start(end + timedelta(days=1)))
+        stats = stats.filter(date__lte=end)
+
+    rows = defaultdict(lambda: [0, 0, timedelta()])
+    for row in (
+        created.annotate(day=TruncDate('created_at'))
+        .values(*dimensions)
+        .annotate(count=Count('id'))
+    ):
+        rows[tuple(row[field] for field in dimensions)][0] = row['count']
+
+    for row in (
+        resolved.annotate(day=TruncDate('resolved_at'))
+        .values(*dimensions)
+        .annotate(
+            count=Count('id'),
+            duration=Sum(ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())),
+        )
+    ):
+        totals = rows[tuple(row[field] for field in dimensions)]
+        totals[1] = row['count']
+        totals[2] = row['duration'] or timedelta()
+
+    with transaction.atomic():
+        stats.delete()
+        TicketDailyStat.objects.bulk_create(
+            [
+                TicketDailyStat(
+                    date=date,
+                    priority=priority,
+                    status=status,
+                    assignee_id=assignee_id,
+                    created_count=created_count,
+                    resolved_count=resolved_count,
+                    resolution_time_total=duration,
+                )
+                for (date, priority, status, assignee_id), (created_count, resolved_count, duration) in rows.items()
+            ],
+            batch_size=1000
+        )
+
+    summary = {
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+        'rows': len(rows),
+        'seconds': round(time.perf_counter() - began, 3),
+    }
+    SystemMetric.objects.create(metric_name='ticket_daily_stats_rollup', metric_value=summary)
+    return summary
+
+
+def _day_start(date):
+    """Aware datetime for local midnight at the start of `date`."""
+    return timezone.make_aware(datetime.combine(date, datetime.min.time()))
+
+
+GROUP_FIELDS = {
+    'priority': 'priority',
+    'status': 'status',
+    'assignee': 'assignee_id',
+}
+
+
+def daily_series(start, end, filters=None, group_by=None):
+    """
+    Per-day created/resolved counts and average resolution time (hours)
+    for local dates start..end, read from the rollup table only.
+
+    Args:
+        start (date): First day
+        end (date): Last day (inclusive)
+        filters (dict): Optional rollup field filters (priority, status, assignee_id)
+        group_by (str): Optional breakdown: priority, status or assignee
+
+    Returns:
+        dict: {'totals': {...}, 'series': [{'date', ..., 'groups'?}, ...]}
+    """
+    stats = TicketDailyStat.objects.filter(date__gte=start, date__lte=end, **(filters or {}))
+    fields = ['date'] + ([GROUP_FIELDS[group_by]] if group_by else [])
+    rows = (
+        stats.order_by()
+        .values(*fields)
+        .annotate(
+            created=Sum('created_count'),
+            resolved=Sum('resolved_count'),
+            duration=Sum('resolution_time_total'),
+        )
+    )
+
+    days = {}
+    current = start
+    while current <= end:
+        days[current] = {'created': 0, 'resolved': 0, 'duration': timedelta(), 'groups': []}
+        current += timedelta(days=1)
+
+    for row in rows:
+        day = days[row['date']]
+        day['created'] += row['created']
+        day['resolved'] += row['resolved']
+        day['duration'] += row['duration'] or timedelta()
+        if group_by:
+            day['groups'].append({
+                group_by: row[GROUP_FIELDS[group_by]],
+                **_measures(row['created'], row['resolved'], row['duration']),
+            })
+
+    series = []
+    for date, day in days.items():
+        point = {'date': date, **_measures(day['created'], day['resolved'], day['duration'])}
+        if group_by:
+            point['groups'] = day['groups']
+        series.append(point)
+
+    return {
+        'totals': _measures(
+            sum(day['created'] for day in days.values()),
+            sum(day['resolved'] for day in days.values()),
+            sum((day['duration'] for day in days.values()), timedelta()),
+        ),
+        'series': series,
+    }
+
+
+def _measures(created, resolved, duration):
+    hours = (duration or timedelta()).total_seconds() / 3600
+    return {
+        'created': created,
+        'resolved': resolved,
+        'averageResolutionTime': round(hours / resolved, 2) if resolved else 0.0,
+    }
@@ -32,6 +32,9 @@ class TicketPerformanceSerializer(serializers.Serializer):
     Serializer for ticket performance metrics.
     """
     averageResolutionTime = serializers.FloatField()  # in hours
+    medianResolutionTime = serializers.FloatField()  # in hours
+    p90ResolutionTime = serializers.FloatField()  # in hours
+    p99ResolutionTime = serializers.FloatField()  # in hours
     totalResolved = serializers.IntegerField()
     totalCreatedToday = serializers.IntegerField()
     totalCreatedThisWeek = serializers.IntegerField()
@@ -0,0 +1,66 @@
+"""
+Signal handlers for metrics app.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.comments.models import Comment
+from apps.tickets.models import Ticket
+from apps.tickets.signals import tickets_bulk_updated
+from apps.users.models import User
+from .cache import bump_generation
+from .rollups import (
+    ROLLUP_FIELDS,
+    UNCHANGED,
+    apply_ticket_change,
+    apply_ticket_changes,
+    loaded_ticket_state,
+    ticket_state
+)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_ticket_metrics(sender, **kwargs):
+    bump_generation('tickets')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_metrics(sender, **kwargs):
+    bump_generation('comments')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_metrics(sender, **kwargs):
+    bump_generation('users')
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_rollup_state(sender, instance, **kwargs):
+    instance._rollup_previous = None if instance.pk is None else loaded_ticket_state(instance)
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_rollups_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not UNCHANGED:
+        apply_ticket_change(previous, ticket_state(instance, previous))
+
+
+@receiver(post_delete, sender=Ticket)
+def update_ticket_rollups_on_delete(sender, instance, **kwargs):
+    apply_ticket_change(ticket_state(instance), None)
+
+
+@receiver(tickets_bulk_updated)
+def update_metrics_on_bulk_update(sender, changes, **kwargs):
+    bump_generation('tickets')
+    apply_ticket_changes([
+        (
+            tuple(previous[field] for field in ROLLUP_FIELDS),
+            tuple(current[field] for field in ROLLUP_FIELDS)
+        )
+        for ticket_id, previous, current in changes
+    ])
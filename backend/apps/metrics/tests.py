@@ -0,0 +1,163 @@
+"""
+Tests for the metrics app.
+"""
+from django.db.models import Max
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.comments.models import Comment
+from apps.metrics.cache import clear_metrics_cache, get_or_compute
+from apps.metrics.profiling import profiles
+from apps.tickets.models import Ticket
+from apps.tickets.signals import revoke_assignment
+from apps.users.models import User
+
+
+def create_user(username, role):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Passw0rd!',
+        first_name=username,
+        last_name='Test',
+        role=role
+    )
+
+
+@override_settings(METRICS_CACHE_MAX_STALENESS=0)
+class UsersActivityQueryCountTests(TestCase):
+    """The users activity report costs the same whatever the user count."""
+
+    # Total count and the annotated page
+    ACTIVITY_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def create_active_users(self, count, start=0):
+        for i in range(start, start + count):
+            user = create_user(f'user-{i}', 'user')
+            ticket = Ticket.objects.create(
+                title=f'Ticket de prueba {i}',
+                description='Descripción del ticket de prueba',
+                creator=user
+            )
+            Comment.objects.create(ticket=ticket, author=user, text='Comentario')
+
+    def assert_activity_queries(self, expected_rows):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertNumQueries(self.ACTIVITY_QUERIES):
+            response = client.get('/api/metrics/users/activity/', {'page_size': 100})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['users']), expected_rows)
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.create_active_users(1)
+        self.assert_activity_queries(2)
+
+        self.create_active_users(20, start=1)
+        self.assert_activity_queries(22)
+
+
+@override_settings(METRICS_CACHE_MAX_STALENESS=300)
+class DashboardCacheInvalidationTests(TestCase):
+    """Cached dashboard payloads are dropped when a ticket changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'sysAdmin')
+        cls.creator = create_user('creator', 'user')
+
+    def setUp(self):
+        clear_metrics_cache()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get_overview(self):
+        response = self.client.get('/api/metrics/tickets/overview/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['statusMetrics']
+
+    def test_ticket_save_and_delete_invalidate_overview(self):
+        ticket = Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=self.creator
+        )
+        self.assertEqual(self.get_overview()['open'], 1)
+        # Served from the cache while nothing changes
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_overview()['open'], 1)
+
+        ticket.status = 'closed'
+        ticket.save()
+        metrics = self.get_overview()
+        self.assertEqual((metrics['open'], metrics['closed']), (0, 1))
+
+        ticket.delete()
+        metrics = self.get_overview()
+        self.assertEqual((metrics['total'], metrics['closed']), (0, 0))
+
+    def latest_update(self, model, group):
+        return get_or_compute(
+            f'test-latest-{group}', (group,),
+            lambda: model.objects.aggregate(latest=Max('updated_at'))['latest']
+        )
+
+    def test_comment_touching_its_ticket_invalidates_ticket_metrics(self):
+        ticket = Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=self.creator
+        )
+        self.assertEqual(self.latest_update(Ticket, 'tickets'), ticket.updated_at)
+
+        # Bumps the ticket's updated_at with QuerySet.update()
+        Comment.objects.create(ticket=ticket, author=self.creator, text='Comentario')
+        ticket.refresh_from_db()
+        self.assertEqual(self.latest_update(Ticket, 'tickets'), ticket.updated_at)
+
+    def test_revoked_assignment_invalidates_comment_metrics(self):
+        ticket = Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=self.creator
+        )
+        comment = Comment.objects.create(ticket=ticket, author=self.creator, text='Comentario')
+        self.assertEqual(self.latest_update(Comment, 'comments'), comment.updated_at)
+
+        # Bumps the comments' updated_at with QuerySet.update()
+        revoke_assignment([(ticket.pk, None)])
+        comment.refresh_from_db()
+        self.assertEqual(self.latest_update(Comment, 'comments'), comment.updated_at)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True)
+class RequestProfilingTests(TestCase):
+    """Streaming responses are profiled including the queries of their body."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def setUp(self):
+        profiles.reset()
+        self.addCleanup(profiles.reset)
+
+    def endpoint(self, name):
+        return next(endpoint for endpoint in profiles.summary() if endpoint['name'] == name)
+
+    def test_streamed_export_is_recorded_when_closed(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/tickets/export/')
+        self.assertFalse(any(endpoint['name'] == 'tickets-export' for endpoint in profiles.summary()))
+
+        b''.join(response.streaming_content)
+        response.close()
+        export = self.endpoint('tickets-export')
+        self.assertEqual(export['requests'], 1)
+        # The export query runs while the body is iterated
+        self.assertGreaterEqual(export['queries']['max'], 1)
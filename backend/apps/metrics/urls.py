@@ -8,7 +8,10 @@ urlpatterns = [
     # Metrics endpoints
     path('metrics/tickets/overview/', views.tickets_overview_view, name='metrics-tickets-overview'),
     path('metrics/tickets/performance/', views.tickets_performance_view, name='metrics-tickets-performance'),
+    path('metrics/tickets/daily/', views.tickets_daily_view, name='metrics-tickets-daily'),
     path('metrics/users/activity/', views.users_activity_view, name='metrics-users-activity'),
     path('metrics/system/health/', views.system_health_view, name='metrics-system-health'),
+    path('metrics/system/endpoints/', views.system_endpoints_view, name='metrics-system-endpoints'),
+    path('metrics/system/cache/', views.system_cache_view, name='metrics-system-cache'),
 ]
 
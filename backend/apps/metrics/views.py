@@ -5,14 +5,23 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
 from django.db.models import Count, Avg, Q
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 
 from apps.users.models import User
 from apps.tickets.models import Ticket
-from apps.comments.models import Comment
 from apps.users.permissions import IsAdminUser, IsSupportOrAdmin
+from .aggregations import (
+    duration_stats,
+    ticket_counts,
+    user_activity_queryset,
+    user_counts
+)
+from .cache import cache_stats, clear_metrics_cache, get_or_compute
+from .profiling import profiles
+from .rollups import GROUP_FIELDS, daily_series
 from .serializers import (
     TicketMetricsSerializer,
     TicketPriorityMetricsSerializer,
@@ -22,6 +31,13 @@ from .serializers import (
 )
 
 
+USERS_ACTIVITY_PAGE_SIZE = 100
+USERS_ACTIVITY_MAX_PAGE_SIZE = 500
+
+TICKETS_DAILY_DEFAULT_DAYS = 30
+TICKETS_DAILY_MAX_DAYS = 366
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsSupportOrAdmin])
 def tickets_overview_view(request):
@@ -29,31 +45,24 @@ def tickets_overview_view(request):
     Get overview of tickets metrics.
     GET /api/metrics/tickets/overview/
     """
-    # Count tickets by status
-    total_tickets = Ticket.objects.count()
-    open_tickets = Ticket.objects.filter(status='open').count()
-    in_progress_tickets = Ticket.objects.filter(status='in_progress').count()
-    resolved_tickets = Ticket.objects.filter(status='resolved').count()
-    closed_tickets = Ticket.objects.filter(status='closed').count()
-    canceled_tickets = Ticket.objects.filter(status='canceled').count()
-    unassigned_tickets = Ticket.objects.filter(assignee__isnull=True).count()
-    
-    # Count by priority
+    # Count tickets by status and priority in a single pass (cached)
+    counts = get_or_compute('ticket-counts', ('tickets',), ticket_counts)
+    
     priority_metrics = {
-        'low': Ticket.objects.filter(priority='low').count(),
-        'medium': Ticket.objects.filter(priority='medium').count(),
-        'high': Ticket.objects.filter(priority='high').count(),
-        'urgent': Ticket.objects.filter(priority='urgent').count(),
+        'low': counts['priority']['low'],
+        'medium': counts['priority']['medium'],
+        'high': counts['priority']['high'],
+        'urgent': counts['priority']['urgent'],
     }
     
     metrics_data = {
-        'total': total_tickets,
-        'open': open_tickets,
-        'inProgress': in_progress_tickets,
-        'resolved': resolved_tickets,
-        'closed': closed_tickets,
-        'canceled': canceled_tickets,
-        'unassigned': unassigned_tickets
+        'total': counts['total'],
+        'open': counts['status']['open'],
+        'inProgress': counts['status']['in_progress'],
+        'resolved': counts['status']['resolved'],
+        'closed': counts['status']['closed'],
+        'canceled': counts['status']['canceled'],
+        'unassigned': counts['unassigned']
     }
     
     status_serializer = TicketMetricsSerializer(data=metrics_data)
@@ -70,49 +79,56 @@ def tickets_overview_view(request):
     }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated, IsSupportOrAdmin])
-def tickets_performance_view(request):
-    """
-    Get ticket performance metrics.
-    GET /api/metrics/tickets/performance/
-    """
-    # Calculate average resolution time
-    resolved_tickets = Ticket.objects.filter(
-        status='resolved',
-        resolved_at__isnull=False
+def _ticket_performance_stats():
+    """Resolution time statistics and tickets created per period."""
+    # Resolution time statistics computed in the database
+    resolution = duration_stats(
+        Ticket.objects.filter(status='resolved', resolved_at__isnull=False),
+        'created_at',
+        'resolved_at'
     )
     
-    total_resolved = resolved_tickets.count()
-    
-    avg_resolution_time = 0
-    if total_resolved > 0:
-        total_hours = 0
-        for ticket in resolved_tickets:
-            delta = ticket.resolved_at - ticket.created_at
-            total_hours += delta.total_seconds() / 3600
-        avg_resolution_time = total_hours / total_resolved
-    
     # Count tickets created in time periods
     now = timezone.now()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     week_start = now - timedelta(days=7)
     month_start = now - timedelta(days=30)
     
-    created_today = Ticket.objects.filter(created_at__gte=today_start).count()
-    created_this_week = Ticket.objects.filter(created_at__gte=week_start).count()
-    created_this_month = Ticket.objects.filter(created_at__gte=month_start).count()
+    period_counts = Ticket.objects.order_by().aggregate(
+        total=Count('id'),
+        today=Count('id', filter=Q(created_at__gte=today_start)),
+        week=Count('id', filter=Q(created_at__gte=week_start)),
+        month=Count('id', filter=Q(created_at__gte=month_start)),
+    )
+    
+    return resolution, period_counts
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsSupportOrAdmin])
+def tickets_performance_view(request):
+    """
+    Get ticket performance metrics.
+    GET /api/metrics/tickets/performance/
+    """
+    resolution, period_counts = get_or_compute(
+        'ticket-performance', ('tickets',), _ticket_performance_stats
+    )
+    total_resolved = resolution['count']
     
     # Calculate resolution rate
-    total_tickets = Ticket.objects.count()
+    total_tickets = period_counts['total']
     resolution_rate = (total_resolved / total_tickets * 100) if total_tickets > 0 else 0
     
     performance_data = {
-        'averageResolutionTime': round(avg_resolution_time, 2),
+        'averageResolutionTime': round(resolution['average'], 2),
+        'medianResolutionTime': round(resolution['median'], 2),
+        'p90ResolutionTime': round(resolution['p90'], 2),
+        'p99ResolutionTime': round(resolution['p99'], 2),
         'totalResolved': total_resolved,
-        'totalCreatedToday': created_today,
-        'totalCreatedThisWeek': created_this_week,
-        'totalCreatedThisMonth': created_this_month,
+        'totalCreatedToday': period_counts['today'],
+        'totalCreatedThisWeek': period_counts['week'],
+        'totalCreatedThisMonth': period_counts['month'],
         'resolutionRate': round(resolution_rate, 2)
     }
     
@@ -126,58 +142,137 @@ def tickets_performance_view(request):
     }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsSupportOrAdmin])
+def tickets_daily_view(request):
+    """
+    Get daily ticket time series from the rollup table.
+    GET /api/metrics/tickets/daily/
+    
+    Query params:
+    - from, to: date range (YYYY-MM-DD, default: last 30 days)
+    - priority, status, assignee: filters
+    - group_by: priority, status or assignee
+    """
+    params = request.query_params
+    
+    try:
+        end = date.fromisoformat(params['to']) if params.get('to') else timezone.localdate()
+        start = (
+            date.fromisoformat(params['from']) if params.get('from')
+            else end - timedelta(days=TICKETS_DAILY_DEFAULT_DAYS - 1)
+        )
+        assignee = int(params['assignee']) if params.get('assignee') else None
+    except ValueError:
+        return Response({
+            'error': 'Parámetros inválidos',
+            'details': 'Fechas en formato YYYY-MM-DD y assignee numérico'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if start > end or (end - start).days >= TICKETS_DAILY_MAX_DAYS:
+        return Response({
+            'error': 'Rango de fechas inválido',
+            'details': f'from debe ser anterior a to y el rango de hasta {TICKETS_DAILY_MAX_DAYS} días'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    group_by = params.get('group_by') or None
+    if group_by and group_by not in GROUP_FIELDS:
+        return Response({
+            'error': 'Agrupación inválida',
+            'details': f"group_by debe ser uno de: {', '.join(GROUP_FIELDS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    filters = {}
+    for field in ('priority', 'status'):
+        if params.get(field):
+            filters[field] = params[field]
+    if assignee is not None:
+        filters['assignee_id'] = assignee
+    
+    data = get_or_compute(
+        'tickets-daily',
+        ('tickets',),
+        lambda: daily_series(start, end, filters, group_by),
+        (start, end, sorted(filters.items()), group_by)
+    )
+    
+    return Response({
+        'from': start,
+        'to': end,
+        'groupBy': group_by,
+        **data
+    }, status=status.HTTP_200_OK)
+
+
+def _users_activity_page(users, page, page_size):
+    """Total users and one page of activity rows."""
+    total_users = users.count()
+    offset = (page - 1) * page_size
+    page_users = user_activity_queryset(users)[offset:offset + page_size]
+    
+    activity_data = [
+        {
+            'userId': user.id,
+            'userName': user.full_name,
+            'email': user.email,
+            'role': user.role,
+            'ticketsCreated': user.tickets_created,
+            'ticketsAssigned': user.tickets_assigned,
+            'ticketsResolved': user.tickets_resolved,
+            'commentsPosted': user.comments_posted,
+            'lastActivity': user.last_activity
+        }
+        for user in page_users
+    ]
+    
+    return total_users, activity_data
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def users_activity_view(request):
     """
     Get user activity metrics (admin only).
     GET /api/metrics/users/activity/
+    
+    Query params:
+    - role: filter by role
+    - page: page number
+    - page_size: items per page
     """
     users = User.objects.filter(is_active=True)
     
-    activity_data = []
-    
-    for user in users:
-        tickets_created = Ticket.objects.filter(creator=user).count()
-        tickets_assigned = Ticket.objects.filter(assignee=user).count()
-        tickets_resolved = Ticket.objects.filter(
-            assignee=user,
-            status='resolved'
-        ).count()
-        comments_posted = Comment.objects.filter(author=user).count()
-        
-        # Determine last activity
-        last_activity = user.last_login or user.created_at
-        
-        # Check for recent ticket or comment activity
-        last_ticket = Ticket.objects.filter(creator=user).order_by('-created_at').first()
-        last_comment = Comment.objects.filter(author=user).order_by('-created_at').first()
-        
-        if last_ticket and last_ticket.created_at > last_activity:
-            last_activity = last_ticket.created_at
-        if last_comment and last_comment.created_at > last_activity:
-            last_activity = last_comment.created_at
-        
-        activity_data.append({
-            'userId': user.id,
-            'userName': user.full_name,
-            'email': user.email,
-            'role': user.role,
-            'ticketsCreated': tickets_created,
-            'ticketsAssigned': tickets_assigned,
-            'ticketsResolved': tickets_resolved,
-            'commentsPosted': comments_posted,
-            'lastActivity': last_activity
-        })
+    # Optional role filter
+    role = request.query_params.get('role')
+    if role:
+        users = users.filter(role=role)
     
-    # Sort by last activity
-    activity_data.sort(key=lambda x: x['lastActivity'], reverse=True)
+    # Pagination (applied in SQL)
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(
+            max(int(request.query_params.get('page_size', USERS_ACTIVITY_PAGE_SIZE)), 1),
+            USERS_ACTIVITY_MAX_PAGE_SIZE
+        )
+    except ValueError:
+        return Response({
+            'error': 'Parámetros de paginación inválidos'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    total_users, activity_data = get_or_compute(
+        'users-activity',
+        ('tickets', 'comments', 'users'),
+        lambda: _users_activity_page(users, page, page_size),
+        (role or '', page, page_size)
+    )
     
     serializer = UserActivitySerializer(data=activity_data, many=True)
     
     if serializer.is_valid():
         return Response({
-            'count': len(activity_data),
+            'count': total_users,
+            'page': page,
+            'pageSize': page_size,
             'users': serializer.validated_data
         }, status=status.HTTP_200_OK)
     
@@ -193,26 +288,29 @@ def system_health_view(request):
     Get system health metrics.
     GET /api/metrics/system/health/
     """
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    total_tickets = Ticket.objects.count()
-    open_tickets = Ticket.objects.filter(status='open').count()
-    urgent_tickets = Ticket.objects.filter(priority='urgent').count()
-    unassigned_tickets = Ticket.objects.filter(assignee__isnull=True).count()
-    
-    # Calculate average response time (time to first assignment)
-    assigned_tickets = Ticket.objects.filter(assignee__isnull=False)
-    total_response_time = 0
-    count = 0
+    users = get_or_compute('user-counts', ('users',), user_counts)
+    counts = get_or_compute('ticket-counts', ('tickets',), ticket_counts)
     
-    for ticket in assigned_tickets:
-        # This is a simple approximation
-        # In a real system, you'd track assignment history
-        delta = ticket.updated_at - ticket.created_at
-        total_response_time += delta.total_seconds() / 3600
-        count += 1
+    total_users = users['total']
+    active_users = users['active']
+    total_tickets = counts['total']
+    open_tickets = counts['status']['open']
+    urgent_tickets = counts['priority']['urgent']
+    unassigned_tickets = counts['unassigned']
     
-    avg_response_time = (total_response_time / count) if count > 0 else 0
+    # Calculate average response time (time to first assignment)
+    # This is a simple approximation using updated_at
+    # In a real system, you'd track assignment history
+    avg_response_time = get_or_compute(
+        'response-time',
+        ('tickets',),
+        lambda: duration_stats(
+            Ticket.objects.filter(assignee__isnull=False),
+            'created_at',
+            'updated_at',
+            percentiles=False
+        )['average']
+    )
     
     # Determine system status
     system_status = 'healthy'
@@ -241,3 +339,44 @@ def system_health_view(request):
         'error': 'Error al obtener estado del sistema'
     }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def system_endpoints_view(request):
+    """
+    Get rolling latency and query statistics per endpoint.
+    GET /api/metrics/system/endpoints/
+    DELETE /api/metrics/system/endpoints/ (reset)
+    """
+    if request.method == 'DELETE':
+        profiles.reset()
+        return Response({
+            'msg': 'Estadísticas de endpoints reiniciadas'
+        }, status=status.HTTP_200_OK)
+    
+    return Response({
+        'enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+        'window': profiles.window,
+        'endpoints': profiles.summary()
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def system_cache_view(request):
+    """
+    Get metrics cache hit/miss counters.
+    GET /api/metrics/system/cache/
+    DELETE /api/metrics/system/cache/ (invalidate and reset)
+    """
+    if request.method == 'DELETE':
+        clear_metrics_cache()
+        return Response({
+            'msg': 'Caché de métricas reiniciada'
+        }, status=status.HTTP_200_OK)
+    
+    return Response({
+        'maxStaleness': settings.METRICS_CACHE_MAX_STALENESS,
+        'backend': settings.CACHES['default']['BACKEND'],
+        'metrics': cache_stats()
+    }, status=status.HTTP_200_OK)
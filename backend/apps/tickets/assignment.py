@@ -0,0 +1,209 @@
+"""
+Automatic ticket assignment.
+
+New tickets are assigned to an active support agent chosen by a pluggable
+strategy (settings.TICKET_ASSIGNMENT_STRATEGY). Strategies read per-agent
+open-ticket counters kept in the cache and adjusted incrementally by the
+ticket signals (apps/tickets/signals.py), so choosing an agent costs a
+couple of cache reads instead of a query over the support team and their
+tickets. Counters are rebuilt from the database with one grouped query
+when missing or expired (TICKET_ASSIGNMENT_CACHE_TTL), which also bounds
+drift when each worker has its own local-memory cache.
+"""
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+from django.utils.module_loading import import_string
+
+
+# Statuses that count towards an agent's load
+OPEN_STATUSES = ('open', 'in_progress')
+
+# Relative effort of a ticket by priority (priority_weighted strategy)
+PRIORITY_WEIGHTS = {
+    'low': 1,
+    'medium': 2,
+    'high': 3,
+    'urgent': 5,
+}
+
+CACHE_PREFIX = 'ticket-assignment'
+AGENTS_KEY = f'{CACHE_PREFIX}:agents'
+ROUND_ROBIN_KEY = f'{CACHE_PREFIX}:round-robin'
+
+
+def _count_key(agent_id):
+    return f'{CACHE_PREFIX}:count:{agent_id}'
+
+
+def _weight_key(agent_id):
+    return f'{CACHE_PREFIX}:weight:{agent_id}'
+
+
+class AgentLoads:
+    """
+    Cache-backed open-ticket counters per support agent.
+    """
+
+    def get(self):
+        """
+        Return [(agent_id, open_count, weighted_load), ...] for every active
+        support agent, rebuilding the counters from the database if needed.
+        """
+        agent_ids = cache.get(AGENTS_KEY)
+        if agent_ids is not None:
+            keys = [key for agent_id in agent_ids for key in (_count_key(agent_id), _weight_key(agent_id))]
+            values = cache.get_many(keys)
+            if len(values) == len(keys):
+                return [
+                    (agent_id, values[_count_key(agent_id)], values[_weight_key(agent_id)])
+                    for agent_id in agent_ids
+                ]
+
+        return self.rebuild()
+
+    def rebuild(self):
+        """Recompute every agent's counters (two queries)."""
+        from apps.users.models import User
+        from .models import Ticket
+
+        agent_ids = list(
+            User.objects.filter(role='support', is_active=True)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        weight = Case(
+            *[When(priority=priority, then=Value(value)) for priority, value in PRIORITY_WEIGHTS.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+        rows = (
+            Ticket.objects.filter(assignee_id__in=agent_ids, status__in=OPEN_STATUSES)
+            .order_by()
+            .values('assignee_id')
+            .annotate(count=Count('id'), weight=Sum(weight))
+        )
+        loads = {row['assignee_id']: (row['count'], row['weight']) for row in rows}
+
+        ttl = settings.TICKET_ASSIGNMENT_CACHE_TTL
+        values = {AGENTS_KEY: agent_ids}
+        for agent_id in agent_ids:
+            count, weight_sum = loads.get(agent_id, (0, 0))
+            values[_count_key(agent_id)] = count
+            values[_weight_key(agent_id)] = weight_sum
+        cache.set_many(values, ttl)
+
+        return [(agent_id, *loads.get(agent_id, (0, 0))) for agent_id in agent_ids]
+
+    def adjust(self, agent_id, priority, delta):
+        """Add `delta` open tickets of `priority` to an agent's counters."""
+        for key, amount in (
+            (_count_key(agent_id), delta),
+            (_weight_key(agent_id), delta * PRIORITY_WEIGHTS.get(priority, 0)),
+        ):
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                # Not cached (expired or unknown agent): next get() rebuilds
+                pass
+
+    def move(self, previous, current):
+        """
+        Apply a ticket change. `previous` and `current` are
+        (assignee_id, status, priority) tuples, or None.
+        """
+        if previous == current:
+            return
+        if previous and previous[0] and previous[1] in OPEN_STATUSES:
+            self.adjust(previous[0], previous[2], -1)
+        if current and current[0] and current[1] in OPEN_STATUSES:
+            self.adjust(current[0], current[2], 1)
+
+    def invalidate(self):
+        """Force a rebuild on the next read (e.g. after bulk updates)."""
+        cache.delete(AGENTS_KEY)
+
+
+agent_loads = AgentLoads()
+
+
+class AssignmentStrategy:
+    """
+    Base class for assignment strategies.
+    """
+
+    def choose(self, loads, priority):
+        """
+        Pick an agent id from `loads` ([(agent_id, count, weight), ...])
+        for a new ticket of `priority`, or None.
+        """
+        raise NotImplementedError
+
+
+class LeastOpenTicketsStrategy(AssignmentStrategy):
+    """Agent with the fewest open tickets."""
+
+    def choose(self, loads, priority):
+        return min(loads, key=lambda load: (load[1], load[2], load[0]))[0]
+
+
+class PriorityWeightedStrategy(AssignmentStrategy):
+    """Agent with the lowest open workload weighted by ticket priority."""
+
+    def choose(self, loads, priority):
+        return min(loads, key=lambda load: (load[2], load[1], load[0]))[0]
+
+
+class RoundRobinStrategy(AssignmentStrategy):
+    """Agents in turn, using a shared counter."""
+
+    def choose(self, loads, priority):
+        if cache.add(ROUND_ROBIN_KEY, 0, None):
+            turn = 0
+        else:
+            try:
+                turn = cache.incr(ROUND_ROBIN_KEY)
+            except ValueError:
+                turn = 0
+        return loads[turn % len(loads)][0]
+
+
+class RandomStrategy(AssignmentStrategy):
+    """Random agent (previous behaviour)."""
+
+    def choose(self, loads, priority):
+        return random.choice(loads)[0]
+
+
+STRATEGIES = {
+    'least_open': LeastOpenTicketsStrategy,
+    'priority_weighted': PriorityWeightedStrategy,
+    'round_robin': RoundRobinStrategy,
+    'random': RandomStrategy,
+}
+
+
+def get_strategy(name=None):
+    """Instantiate a strategy by registry name or dotted class path."""
+    name = name or settings.TICKET_ASSIGNMENT_STRATEGY
+    strategy_class = STRATEGIES.get(name) or import_string(name)
+    return strategy_class()
+
+
+def pick_assignee(priority, strategy=None):
+    """
+    Choose the support agent for a new ticket.
+
+    Args:
+        priority (str): Priority of the new ticket
+        strategy (str): Optional strategy name overriding the setting
+
+    Returns:
+        int: Agent user id, or None when there are no active agents
+    """
+    loads = agent_loads.get()
+    if not loads:
+        return None
+    return get_strategy(strategy).choose(loads, priority)
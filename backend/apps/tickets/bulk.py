@@ -0,0 +1,136 @@
+"""
+Bulk ticket operations.
+
+The tickets are read once, permissions and transitions are checked in
+memory for the whole set, and the accepted changes are written with one
+QuerySet.update() per distinct outcome inside a single transaction.
+
+update() sends no model signals, so the change set is announced with
+`tickets_bulk_updated` (apps/tickets/signals.py) for the listeners that
+keep derived data current (agent load counters, metrics cache, rollups).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Ticket
+from .signals import tickets_bulk_updated
+
+
+BULK_MAX_TICKETS = 100
+
+# Fields sent to tickets_bulk_updated listeners
+STATE_FIELDS = ('created_at', 'resolved_at', 'priority', 'status', 'assignee_id')
+
+# Per-id outcomes
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+FORBIDDEN = 'forbidden'
+INVALID = 'invalid'
+
+
+def _result(ticket_id, outcome, error=None):
+    result = {'id': ticket_id, 'result': outcome}
+    if error:
+        result['error'] = error
+    return result
+
+
+def _state(ticket):
+    return {field: getattr(ticket, field) for field in STATE_FIELDS}
+
+
+def _apply(ticket_ids, check, changes_for):
+    """
+    Shared driver: load the tickets, run `check(ticket)` (returns an
+    (outcome, error) tuple, or None when allowed) and group the accepted
+    ones by the field values `changes_for(ticket, now)` returns.
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    now = timezone.now()
+
+    with transaction.atomic():
+        tickets = Ticket.objects.select_for_update().only(
+            'created_at', 'resolved_at', 'priority', 'status', 'assignee'
+        ).in_bulk(ticket_ids)
+
+        results = []
+        groups = {}
+        changes = []
+        for ticket_id in ticket_ids:
+            ticket = tickets.get(ticket_id)
+            if ticket is None:
+                results.append(_result(ticket_id, NOT_FOUND))
+                continue
+
+            rejection = check(ticket)
+            if rejection:
+                results.append(_result(ticket_id, *rejection))
+                continue
+
+            values = changes_for(ticket, now)
+            if all(getattr(ticket, field) == value for field, value in values.items()):
+                results.append(_result(ticket_id, UNCHANGED))
+                continue
+
+            previous = _state(ticket)
+            for field, value in values.items():
+                setattr(ticket, field, value)
+            changes.append((ticket_id, previous, _state(ticket)))
+
+            groups.setdefault(tuple(sorted(values.items())), []).append(ticket_id)
+            results.append(_result(ticket_id, UPDATED))
+
+        for values, ids in groups.items():
+            Ticket.objects.filter(id__in=ids).update(updated_at=now, **dict(values))
+
+        if changes:
+            tickets_bulk_updated.send(sender=Ticket, changes=changes)
+
+    return results
+
+
+def _can_change_status(user, ticket):
+    # Support can only update their assigned tickets
+    return user.role != 'support' or ticket.assignee_id == user.id
+
+
+def bulk_set_status(user, ticket_ids, new_status):
+    """
+    Set `new_status` on every ticket the user may change, following the
+    same transition rules as TicketStatusUpdateSerializer.
+
+    Returns:
+        list: [{'id', 'result', 'error'?}, ...] in request order
+    """
+    def check(ticket):
+        if not _can_change_status(user, ticket):
+            return FORBIDDEN, 'Solo puedes actualizar el estado de tus tickets asignados'
+        if ticket.status == 'closed' and new_status != 'closed':
+            return INVALID, 'No se puede reabrir un ticket cerrado.'
+        if new_status == 'resolved' and not ticket.assignee_id:
+            return INVALID, 'El ticket debe estar asignado antes de marcarse como resuelto.'
+        return None
+
+    def changes_for(ticket, now):
+        values = {'status': new_status}
+        if new_status == 'resolved' and ticket.status != 'resolved' and not ticket.resolved_at:
+            values['resolved_at'] = now
+        return values
+
+    return _apply(ticket_ids, check, changes_for)
+
+
+def bulk_assign(ticket_ids, assignee_id):
+    """
+    Assign every ticket to `assignee_id` (None unassigns). The assignee
+    is validated by the caller (TicketAssignSerializer rules).
+
+    Returns:
+        list: [{'id', 'result', 'error'?}, ...] in request order
+    """
+    return _apply(
+        ticket_ids,
+        lambda ticket: None,
+        lambda ticket, now: {'assignee_id': assignee_id}
+    )
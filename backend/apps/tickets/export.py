@@ -0,0 +1,149 @@
+"""
+Streaming ticket export (GET /api/tickets/export/).
+
+Rows are read with QuerySet.iterator(), which on PostgreSQL uses a
+server-side cursor, so only one chunk of EXPORT_CHUNK_SIZE rows is held
+in memory at a time. The query selects plain values (no model instances)
+with the creator and assignee joined and the comment/attachment counts
+of TicketQuerySet.for_list(): one query for the whole export.
+
+The encoders turn every chunk into a single string, so the response is
+written in a few large blocks instead of one tiny write per row. CSV
+cells that a spreadsheet would evaluate as a formula are prefixed with
+a quote.
+"""
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Values read per ticket (names are joined into the export columns)
+EXPORT_FIELDS = (
+    'id',
+    'title',
+    'status',
+    'priority',
+    'creator__first_name',
+    'creator__last_name',
+    'creator__email',
+    'assignee__first_name',
+    'assignee__last_name',
+    'assignee__email',
+    'created_at',
+    'resolved_at',
+    'comments_count',
+    'attachments_count',
+)
+
+EXPORT_COLUMNS = (
+    'id',
+    'title',
+    'status',
+    'priority',
+    'creatorName',
+    'creatorEmail',
+    'assigneeName',
+    'assigneeEmail',
+    'createdAt',
+    'resolvedAt',
+    'resolutionHours',
+    'commentsCount',
+    'attachmentsCount',
+)
+
+# Leading characters that make spreadsheets read a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple per ticket of `queryset` (annotated by
+    TicketQuerySet.for_list()), in EXPORT_COLUMNS order, reading
+    `chunk_size` rows at a time.
+    """
+    rows = queryset.values_list(*EXPORT_FIELDS)
+
+    for (
+        ticket_id, title, status, priority,
+        creator_first, creator_last, creator_email,
+        assignee_first, assignee_last, assignee_email,
+        created_at, resolved_at, comments_count, attachments_count,
+    ) in rows.iterator(chunk_size=chunk_size):
+        resolution_hours = None
+        if resolved_at is not None:
+            resolution_hours = round((resolved_at - created_at).total_seconds() / 3600, 2)
+
+        yield (
+            ticket_id,
+            title,
+            status,
+            priority,
+            f'{creator_first} {creator_last}',
+            creator_email,
+            f'{assignee_first} {assignee_last}' if assignee_email is not None else None,
+            assignee_email,
+            created_at.isoformat(),
+            resolved_at.isoformat() if resolved_at else None,
+            resolution_hours,
+            comments_count,
+            attachments_count,
+        )
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_safe(value):
+    """Quote text cells a spreadsheet would run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode `rows` as CSV (header first), one string per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in _chunks(rows, chunk_size):
+        writer.writerows([_csv_safe(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode `rows` as newline-delimited JSON objects, one string per chunk."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(
+            encoder.encode(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+            for row in chunk
+        )
+
+
+ENCODERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
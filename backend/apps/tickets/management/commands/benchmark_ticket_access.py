@@ -0,0 +1,115 @@
+"""
+Compare ticket access checks: load-then-compare vs. the visible_to scope.
+
+The load-then-compare check is the one the ticket, comment and
+attachment views used to repeat: fetch the ticket by id, then compare
+`ticket.assignee` / `ticket.creator` with the user, which loads those
+users lazily. `Ticket.objects.visible_to(user)` answers in the WHERE
+clause of the single lookup.
+
+Usage:
+    python manage.py benchmark_ticket_access
+    python manage.py benchmark_ticket_access --tickets 100000 --lookups 2000
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.tickets.models import Ticket
+from apps.tickets.management.synthetic import create_synthetic_users, seed_tickets
+
+
+def legacy_can_access(user, ticket_id):
+    """Access check as the views did it before visible_to."""
+    try:
+        ticket = Ticket.objects.get(id=ticket_id)
+    except Ticket.DoesNotExist:
+        return False
+
+    if user.role == 'sysAdmin':
+        return True
+    if user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
+        return True
+    return ticket.creator == user
+
+
+def scoped_can_access(user, ticket_id):
+    """Access check through the visible_to scope."""
+    try:
+        Ticket.objects.visible_to(user).get(id=ticket_id)
+    except Ticket.DoesNotExist:
+        return False
+    return True
+
+
+CHECKS = [
+    ('cargar y comparar', legacy_can_access),
+    ('visible_to', scoped_can_access),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara consultas y latencia del control de acceso a tickets '
+        '(cargar y comparar vs visible_to) por rol sobre datos sintéticos. '
+        'Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tickets',
+            type=int,
+            default=20000,
+            help='Tickets sintéticos a generar.'
+        )
+        parser.add_argument(
+            '--lookups',
+            type=int,
+            default=500,
+            help='Comprobaciones de acceso por rol y método.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Base de datos: {connection.vendor}')
+
+        with transaction.atomic():
+            creators = create_synthetic_users('access-bench-user', 'user', 50)
+            agents = create_synthetic_users('access-bench-agent', 'support', 20)
+            admin = create_synthetic_users('access-bench-admin', 'sysAdmin', 1)[0]
+            self.stdout.write(f'Generando {options["tickets"]} tickets...')
+            seed_tickets(options['tickets'], creators, [None] + agents)
+
+            ids = list(Ticket.objects.values_list('id', flat=True))
+            sample = random.choices(ids, k=options['lookups'])
+            users = [
+                ('user', creators[0]),
+                ('support', agents[0]),
+                ('sysAdmin', admin),
+            ]
+
+            self.stdout.write(
+                f'{"rol":<10} {"método":<18} {"consultas/req":>13} {"µs/req":>9} {"visibles":>9}'
+            )
+            for role, user in users:
+                for label, check in CHECKS:
+                    self._measure(role, label, check, user, sample)
+
+            # Never keep synthetic data
+            transaction.set_rollback(True)
+
+    def _measure(self, role, label, check, user, sample):
+        # Warm up the connection and statement caches
+        check(user, sample[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            visible = sum(1 for ticket_id in sample if check(user, ticket_id))
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{role:<10} {label:<18} {len(queries) / len(sample):>13.2f} '
+            f'{elapsed / len(sample) * 1e6:>9.0f} {visible:>9}'
+        )
@@ -0,0 +1,125 @@
+"""
+Measure memory use of the streaming ticket export.
+
+Streams the export of a synthetic tickets table and samples the process
+RSS while doing so: memory must stay flat however many rows are exported.
+
+Usage:
+    python manage.py benchmark_ticket_export
+    python manage.py benchmark_ticket_export --rows 1000000 --output ndjson
+"""
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.tickets.export import ENCODERS, EXPORT_CHUNK_SIZE, export_rows
+from apps.tickets.management.synthetic import create_synthetic_users, seed_tickets
+from apps.tickets.models import Ticket
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        # ru_maxrss is in KB on Linux, bytes on macOS; only used off Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la memoria (RSS) durante la exportación en streaming de tickets '
+        'sobre una tabla sintética. Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000000,
+            help='Tickets sintéticos a exportar.'
+        )
+        parser.add_argument(
+            '--output',
+            choices=sorted(ENCODERS),
+            default='csv',
+            help='Formato de exportación.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Filas leídas por bloque del cursor.'
+        )
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=10,
+            help='Mediciones de RSS durante la exportación.'
+        )
+        parser.add_argument(
+            '--max-growth-mb',
+            type=float,
+            default=25.0,
+            help='Crecimiento máximo de RSS permitido tras el primer bloque.'
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        chunk_size = options['chunk_size']
+        self.stdout.write(f'Base de datos: {connection.vendor}')
+
+        with transaction.atomic():
+            creators = create_synthetic_users('export-bench-user', 'user', 50)
+            agents = [None] + create_synthetic_users('export-bench-agent', 'support', 20)
+            self.stdout.write(f'Generando {rows} tickets...')
+            seed_tickets(rows, creators, agents)
+
+            queryset = Ticket.objects.for_list().order_by('-created_at')
+            stream = ENCODERS[options['output']](export_rows(queryset, chunk_size), chunk_size)
+
+            every = max(rows // options['samples'], chunk_size)
+            started = time.perf_counter()
+            exported = 0
+            size = 0
+            baseline = None
+            peak = 0.0
+
+            for block in stream:
+                size += len(block)
+                # Blocks carry chunk_size rows (CSV's first one adds the header)
+                exported = min(exported + chunk_size, rows)
+                rss = current_rss_mb()
+                peak = max(peak, rss)
+                if baseline is None:
+                    baseline = rss
+                    self._report(exported, rss, baseline, started)
+                elif exported % every < chunk_size or exported == rows:
+                    self._report(exported, rss, baseline, started)
+
+            # Never keep synthetic data
+            transaction.set_rollback(True)
+
+        elapsed = time.perf_counter() - started
+        growth = peak - (baseline or peak)
+        self.stdout.write(
+            f'{exported} filas, {size / 1024 / 1024:.1f} MB en {elapsed:.1f} s '
+            f'({exported / elapsed:,.0f} filas/s); RSS máximo {peak:.1f} MB '
+            f'(+{growth:.1f} MB tras el primer bloque)'
+        )
+
+        if growth > options['max_growth_mb']:
+            raise CommandError(
+                f'El RSS creció {growth:.1f} MB (máximo {options["max_growth_mb"]} MB)'
+            )
+        self.stdout.write(self.style.SUCCESS('Memoria estable durante la exportación'))
+
+    def _report(self, exported, rss, baseline, started):
+        self.stdout.write(
+            f'{exported:>10} filas  RSS {rss:8.1f} MB  ({rss - baseline:+6.1f} MB)  '
+            f'{time.perf_counter() - started:7.1f} s'
+        )
@@ -0,0 +1,105 @@
+"""
+Compare ticket search latency: full-text index vs. icontains.
+
+Usage:
+    python manage.py benchmark_ticket_search
+    python manage.py benchmark_ticket_search --sizes 100000 1000000 --repeat 10
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.tickets.models import Ticket
+from apps.tickets.search import icontains_search, search_tickets
+from apps.tickets.management.synthetic import create_synthetic_users, seed_tickets
+
+
+SEARCH_TERMS = [
+    'impresora',
+    'servidor caído',
+    'contraseña bloqueada',
+    'vpn',
+    'sincronización calendario',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia de búsqueda de tickets (índice full-text vs icontains) '
+        'sobre tablas sintéticas de distintos tamaños. Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100000, 1000000],
+            help='Tamaños de la tabla tickets a medir.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Repeticiones por término de búsqueda.'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=20,
+            help='Tamaño de página de la consulta de listado.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Base de datos: {connection.vendor}')
+
+        with transaction.atomic():
+            creators = create_synthetic_users('search-bench-user', 'user', 50)
+            agents = [None] + create_synthetic_users('search-bench-agent', 'support', 20)
+            seeded = 0
+
+            for size in sorted(options['sizes']):
+                self.stdout.write(f'Generando tickets hasta {size}...')
+                seed_tickets(size - seeded, creators, agents, start=seeded)
+                seeded = size
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+                for label, search in (
+                    ('full-text', self._full_text_page),
+                    ('icontains', self._icontains_page),
+                ):
+                    timings = []
+                    for term in SEARCH_TERMS:
+                        for _ in range(options['repeat']):
+                            started = time.perf_counter()
+                            search(term, options['page_size'])
+                            timings.append((time.perf_counter() - started) * 1000)
+                    self._report(size, label, timings)
+
+            # Never keep synthetic data
+            transaction.set_rollback(True)
+
+    def _full_text_page(self, term, page_size):
+        """Run the listing queries list_tickets_view issues for ?search=."""
+        queryset = search_tickets(Ticket.objects.for_list(), term).order_by(
+            '-search_rank', '-created_at'
+        )
+        queryset.count()
+        list(queryset[:page_size])
+
+    def _icontains_page(self, term, page_size):
+        """Same listing queries with the previous icontains filter."""
+        queryset = icontains_search(Ticket.objects.for_list(), term).order_by('-created_at')
+        queryset.count()
+        list(queryset[:page_size])
+
+    def _report(self, size, label, timings):
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{size:>10} tickets  {label:<10} '
+            f'mediana {statistics.median(timings):8.1f} ms  p95 {p95:8.1f} ms'
+        )
@@ -0,0 +1,169 @@
+"""
+Run EXPLAIN on every ticket listing query and fail on sequential scans.
+
+Usage:
+    python manage.py explain_ticket_queries
+    python manage.py explain_ticket_queries --rows 100000
+    python manage.py explain_ticket_queries --rows 0   # use existing data
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.users.models import User
+from apps.tickets.models import Ticket
+from apps.tickets import views
+from apps.tickets.management.synthetic import create_synthetic_users, seed_tickets
+
+
+# (label, view, path, query params, role of the requesting user)
+LISTING_SCENARIOS = [
+    ('list admin', views.list_tickets_view, '/api/tickets/', {}, 'sysAdmin'),
+    ('list admin status', views.list_tickets_view, '/api/tickets/', {'status': 'open'}, 'sysAdmin'),
+    ('list admin priority', views.list_tickets_view, '/api/tickets/', {'priority': 'urgent'}, 'sysAdmin'),
+    ('list support', views.list_tickets_view, '/api/tickets/', {}, 'support'),
+    ('list support status', views.list_tickets_view, '/api/tickets/', {'status': 'in_progress'}, 'support'),
+    ('list user', views.list_tickets_view, '/api/tickets/', {}, 'user'),
+    ('list user status', views.list_tickets_view, '/api/tickets/', {'status': 'open'}, 'user'),
+    ('my tickets', views.my_tickets_view, '/api/tickets/my-tickets/', {}, 'user'),
+    ('my tickets status', views.my_tickets_view, '/api/tickets/my-tickets/', {'status': 'resolved'}, 'user'),
+    ('assigned', views.assigned_tickets_view, '/api/tickets/assigned/', {}, 'support'),
+    ('assigned status', views.assigned_tickets_view, '/api/tickets/assigned/', {'status': 'open'}, 'support'),
+    ('unassigned', views.unassigned_tickets_view, '/api/tickets/unassigned/', {}, 'support'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta EXPLAIN sobre las consultas de listado de tickets y falla '
+        'si alguna hace un sequential scan sobre la tabla tickets.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=50000,
+            help='Tickets sintéticos a generar antes de ejecutar EXPLAIN '
+                 '(se revierten al terminar). 0 usa los datos existentes.'
+        )
+        parser.add_argument(
+            '--table',
+            default=Ticket._meta.db_table,
+            help='Tabla sobre la que no se permiten sequential scans.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'Base de datos no soportada: {connection.vendor}')
+
+        with transaction.atomic():
+            users = self._get_users(options['rows'])
+            if options['rows']:
+                self._seed_tickets(options['rows'], users)
+            self._analyze()
+
+            failures = []
+            for label, view, path, params, role in LISTING_SCENARIOS:
+                for sql, sql_params in self._capture_queries(view, path, params, users[role]):
+                    full_scans = self._full_scans(sql, sql_params, options['table'])
+                    if not full_scans:
+                        self.stdout.write(f'  ok    {label}: {sql[:90]}...')
+                    elif ' WHERE ' not in sql:
+                        # Unfiltered reads (e.g. the admin COUNT(*)) cannot avoid the scan
+                        self.stdout.write(f'  info  {label}: lectura completa sin filtro')
+                    else:
+                        failures.append((label, sql, full_scans))
+                        self.stdout.write(self.style.ERROR(f'  SCAN  {label}: {sql}'))
+
+            # Never keep synthetic data or statistics
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} consulta(s) de listado hacen sequential scan '
+                f'sobre {options["table"]}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Todas las consultas de listado usan índices'))
+
+    def _get_users(self, rows):
+        """Return one requesting user per role, creating them for synthetic runs."""
+        users = {}
+        for role in ('sysAdmin', 'support', 'user'):
+            if rows:
+                users[role] = User.objects.create_user(
+                    username=f'explain-{role}',
+                    email=f'explain-{role}@example.com',
+                    first_name='Explain',
+                    last_name=role,
+                    role=role
+                )
+            else:
+                users[role] = User.objects.filter(role=role, is_active=True).first()
+                if users[role] is None:
+                    raise CommandError(f'No hay usuarios activos con rol {role}')
+        return users
+
+    def _seed_tickets(self, rows, users):
+        """Insert synthetic tickets spread over many creators and agents."""
+        creators = [users['user']] + create_synthetic_users('explain-creator', 'user', 50)
+        agents = [users['support'], None] + create_synthetic_users('explain-agent', 'support', 20)
+        seed_tickets(rows, creators, agents)
+        self.stdout.write(f'{rows} tickets sintéticos generados')
+
+    def _analyze(self):
+        """Refresh planner statistics so EXPLAIN reflects the table size."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _capture_queries(self, view, path, params, user):
+        """Call a listing view and return the SQL statements it executed."""
+        captured = []
+
+        def capture(execute, sql, sql_params, many, context):
+            captured.append((sql, sql_params))
+            return execute(sql, sql_params, many, context)
+
+        host = next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost'
+        )
+        request = APIRequestFactory().get(path, params, HTTP_HOST=host)
+        force_authenticate(request, user=user)
+        with connection.execute_wrapper(capture):
+            response = view(request)
+        if response.status_code != 200:
+            raise CommandError(f'{path} respondió {response.status_code}')
+
+        return [
+            (sql, sql_params) for sql, sql_params in captured
+            if sql.lstrip().upper().startswith('SELECT')
+        ]
+
+    def _full_scans(self, sql, params, table):
+        """Return the plan lines that read `table` without an index."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0][0]['Plan']
+                return [
+                    f"Seq Scan on {node['Relation Name']}"
+                    for node in _walk_plan(plan)
+                    if node.get('Node Type') == 'Seq Scan'
+                    and node.get('Relation Name') == table
+                ]
+
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [
+                row[3] for row in cursor.fetchall()
+                if row[3].startswith(f'SCAN {table}') and 'INDEX' not in row[3]
+            ]
+
+
+def _walk_plan(node):
+    """Yield every node of a PostgreSQL JSON plan."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk_plan(child)
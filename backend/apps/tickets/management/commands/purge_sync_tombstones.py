@@ -0,0 +1,38 @@
+"""
+Delete sync tombstones older than the retention period.
+
+Usage:
+    python manage.py purge_sync_tombstones
+    python manage.py purge_sync_tombstones --days 7
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tickets.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Elimina los registros de eliminación usados por la sincronización '
+        'más antiguos que SYNC_TOMBSTONE_RETENTION_DAYS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Conservar solo los últimos N días (por defecto SYNC_TOMBSTONE_RETENTION_DAYS).'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is not None and days > settings.SYNC_TOMBSTONE_RETENTION_DAYS:
+            raise CommandError(
+                '--days no puede superar SYNC_TOMBSTONE_RETENTION_DAYS '
+                f'({settings.SYNC_TOMBSTONE_RETENTION_DAYS})'
+            )
+
+        deleted = purge_tombstones(days)
+        self.stdout.write(self.style.SUCCESS(
+            f'Registros de eliminación borrados: {deleted}'
+        ))
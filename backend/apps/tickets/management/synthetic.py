@@ -0,0 +1,81 @@
+"""
+Synthetic data helpers shared by the ticket management commands.
+"""
+import random
+
+from django.utils import timezone
+
+from apps.users.models import User
+from apps.tickets.models import Ticket
+
+
+# Domain vocabulary for synthetic ticket text (Spanish, like real tickets)
+WORDS = [
+    'impresora', 'servidor', 'correo', 'contraseña', 'acceso', 'red', 'wifi',
+    'pantalla', 'teclado', 'error', 'sistema', 'factura', 'usuario', 'cuenta',
+    'bloqueada', 'lento', 'caído', 'instalación', 'licencia', 'backup',
+    'aplicación', 'móvil', 'notificación', 'reporte', 'base', 'datos', 'vpn',
+    'permiso', 'carpeta', 'compartida', 'actualización', 'sincronización',
+    'certificado', 'teléfono', 'proyector', 'reunión', 'calendario', 'archivo',
+]
+
+# Filler vocabulary: pseudo-words drawn with a Zipf-like distribution so
+# that, as in real text, most terms are rare and a few are very common
+FILLER_WORDS = [
+    f'{syllable_a}{syllable_b}{syllable_c}'
+    for syllable_a in ('ca', 'pe', 'ri', 'do', 'lu', 'ma', 'se', 'ti', 'no', 'ra')
+    for syllable_b in ('la', 'mo', 'ne', 'si', 'tu', 'ga', 're', 'vo', 'di', 'pa')
+    for syllable_c in ('ro', 'na', 'le', 'to', 'sa', 'mi', 'co', 'de', 'ba', 'fe')
+]
+FILLER_WEIGHTS = [1 / rank for rank in range(1, len(FILLER_WORDS) + 1)]
+
+
+def synthetic_text(words):
+    """Random text of `words` words, with roughly one domain term in ten."""
+    filler = random.choices(FILLER_WORDS, weights=FILLER_WEIGHTS, k=words)
+    return ' '.join(
+        random.choice(WORDS) if random.random() < 0.1 else word
+        for word in filler
+    )
+
+
+def create_synthetic_users(prefix, role, count):
+    """Create `count` users named `<prefix>-<n>` with the given role."""
+    return [
+        User.objects.create_user(
+            username=f'{prefix}-{i}',
+            email=f'{prefix}-{i}@example.com',
+            first_name='Synthetic',
+            last_name=role,
+            role=role
+        )
+        for i in range(count)
+    ]
+
+
+def seed_tickets(rows, creators, assignees, start=0, batch_size=1000):
+    """
+    Bulk insert `rows` synthetic tickets with random status, priority,
+    creator, assignee (None in `assignees` means unassigned) and text.
+    `start` offsets titles and creation times so repeated calls extend
+    the same timeline.
+    """
+    statuses = [choice[0] for choice in Ticket.STATUS_CHOICES]
+    priorities = [choice[0] for choice in Ticket.PRIORITY_CHOICES]
+    now = timezone.now()
+
+    Ticket.objects.bulk_create(
+        (
+            Ticket(
+                title=f'{synthetic_text(5)} #{i}',
+                description=synthetic_text(40),
+                status=random.choice(statuses),
+                priority=random.choice(priorities),
+                creator=random.choice(creators),
+                assignee=random.choice(assignees),
+                created_at=now - timezone.timedelta(minutes=i)
+            )
+            for i in range(start, start + rows)
+        ),
+        batch_size=batch_size
+    )
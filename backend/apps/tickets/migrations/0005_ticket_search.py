@@ -0,0 +1,24 @@
+# Full-text search index for tickets (see apps/tickets/search.py)
+
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from apps.tickets.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from apps.tickets.search import uninstall_search_index
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0004_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
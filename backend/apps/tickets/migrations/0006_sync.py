@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_ticket_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('ticket', 'Ticket'), ('comment', 'Comentario'), ('attachment', 'Archivo Adjunto')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('ticket_id', models.BigIntegerField()),
+                ('creator_id', models.BigIntegerField(null=True)),
+                ('assignee_id', models.BigIntegerField(null=True)),
+                ('is_private', models.BooleanField(default=False)),
+                ('revoked', models.BooleanField(default=False)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Registro de Eliminación',
+                'verbose_name_plural': 'Registros de Eliminación',
+                'db_table': 'sync_tombstones',
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['updated_at'], name='tickets_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['creator', 'updated_at'], name='tickets_creator_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assignee', 'updated_at'], name='tickets_assignee_updated_idx'),
+        ),
+    ]
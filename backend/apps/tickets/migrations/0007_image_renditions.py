@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='image_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def install_search_index(apps, schema_editor):
+    # SQLite rebuilds the tickets table to alter its columns, which drops
+    # the full-text triggers of 0005_ticket_search
+    from apps.tickets.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tickets', '0007_image_renditions'),
+    ]
+
+    operations = [
+        # Undoing the AlterFields rebuilds the table again
+        migrations.RunPython(migrations.RunPython.noop, install_search_index),
+        # New composites first, so lookups by creator/assignee stay indexed
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['creator', '-created_at'], name='tickets_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['assignee', '-created_at'], name='tickets_assignee_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='assignee',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_tickets', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='creator',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='created_tickets', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(install_search_index, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,68 @@
 Ticket models for the helpdesk application.
 """
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from apps.common.models import FieldTrackerMixin, ImageRenditionsMixin
 from apps.users.models import User
 
 
-class Ticket(models.Model):
+def _ticket_count_subquery(model):
+    """Correlated COUNT(*) of `model` rows pointing at the outer ticket."""
+    counts = model.objects.filter(
+        ticket=OuterRef('pk')
+    ).order_by().values('ticket').annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def ticket_visibility(user, prefix=''):
+    """
+    Q restricting `prefix`-related tickets to those `user` can see, or
+    None for no restriction: sysAdmin sees every ticket, support the ones
+    assigned to them or unassigned, everyone else the ones they created.
+    
+    Compares the foreign key columns only, so it needs no join and is
+    served by the creator/assignee indexes.
+    """
+    if user.role == 'sysAdmin':
+        return None
+    if user.role == 'support':
+        return Q(**{f'{prefix}assignee_id': user.id}) | Q(**{f'{prefix}assignee__isnull': True})
+    return Q(**{f'{prefix}creator_id': user.id})
+
+
+class TicketQuerySet(models.QuerySet):
+    """
+    Custom queryset for tickets.
+    """
+    def visible_to(self, user):
+        """
+        Tickets `user` can see. Views look tickets up through this scope,
+        so a ticket outside it is a 404 decided by the WHERE clause,
+        without loading the ticket or its users first.
+        """
+        scope = ticket_visibility(user)
+        if scope is None:
+            return self
+        return self.filter(scope)
+    
+    def for_list(self):
+        """
+        Load everything TicketListSerializer needs in one query: creator
+        and assignee are joined and comment/attachment counts are
+        annotated as subqueries, so the cost does not grow with page size.
+        """
+        from apps.comments.models import Comment
+        from apps.attachments.models import Attachment
+        
+        return self.select_related('creator', 'assignee').annotate(
+            comments_count=_ticket_count_subquery(Comment),
+            attachments_count=_ticket_count_subquery(Attachment),
+        )
+
+
+class Ticket(ImageRenditionsMixin, FieldTrackerMixin, models.Model):
     """
     Ticket model for support requests.
     """
@@ -25,6 +82,8 @@ class Ticket(models.Model):
         ('urgent', 'Urgente'),
     ]
     
+    rendition_fields = ('image',)
+    
     title = models.CharField(max_length=200)
     description = models.TextField()
     status = models.CharField(
@@ -37,17 +96,21 @@ class Ticket(models.Model):
         choices=PRIORITY_CHOICES,
         default='medium'
     )
+    # No single-column FK indexes: the composite indexes in Meta lead
+    # with these columns and serve the same lookups
     creator = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='created_tickets'
+        related_name='created_tickets',
+        db_index=False
     )
     assignee = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='assigned_tickets'
+        related_name='assigned_tickets',
+        db_index=False
     )
     image = models.ImageField(
         upload_to='ticket_images/',
@@ -55,29 +118,83 @@ class Ticket(models.Model):
         blank=True,
         help_text='Imagen adjunta al ticket'
     )
+    # WebP renditions of `image`, generated after upload (apps/common/images.py)
+    image_thumb = models.ImageField(null=True, blank=True, editable=False)
+    image_medium = models.ImageField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     
+    objects = TicketQuerySet.as_manager()
+    
     class Meta:
         db_table = 'tickets'
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
         ordering = ['-created_at']
+        indexes = [
+            # Listing access paths (see apps/tickets/views.py); every
+            # listing is ordered by -created_at
+            models.Index(
+                fields=['creator', '-created_at'],
+                name='tickets_creator_created_idx'
+            ),
+            models.Index(
+                fields=['assignee', '-created_at'],
+                name='tickets_assignee_created_idx'
+            ),
+            models.Index(
+                fields=['creator', 'status', '-created_at'],
+                name='tickets_creator_status_idx'
+            ),
+            models.Index(
+                fields=['assignee', 'status', '-created_at'],
+                name='tickets_assignee_status_idx'
+            ),
+            models.Index(
+                fields=['-created_at'],
+                name='tickets_unassigned_idx',
+                condition=models.Q(assignee__isnull=True)
+            ),
+            models.Index(
+                fields=['status', '-created_at'],
+                name='tickets_status_created_idx'
+            ),
+            models.Index(
+                fields=['priority', '-created_at'],
+                name='tickets_priority_created_idx'
+            ),
+            models.Index(
+                fields=['-created_at'],
+                name='tickets_created_at_idx'
+            ),
+            # Delta sync scans (see apps/tickets/sync.py), one per role scope
+            models.Index(
+                fields=['updated_at'],
+                name='tickets_updated_at_idx'
+            ),
+            models.Index(
+                fields=['creator', 'updated_at'],
+                name='tickets_creator_updated_idx'
+            ),
+            models.Index(
+                fields=['assignee', 'updated_at'],
+                name='tickets_assignee_updated_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"#{self.id} - {self.title}"
     
     def save(self, *args, **kwargs):
         # Set resolved_at when status changes to resolved
-        if self.pk:
-            old_ticket = Ticket.objects.get(pk=self.pk)
-            if (old_ticket.status != 'resolved' and 
-                self.status == 'resolved' and 
-                not self.resolved_at):
+        # (a deferred status was not modified, so it needs no check)
+        if 'status' in self.__dict__ and self.status == 'resolved' and not self.resolved_at:
+            if self._state.adding or self.has_changed('status'):
                 self.resolved_at = timezone.now()
-        elif self.status == 'resolved' and not self.resolved_at:
-            self.resolved_at = timezone.now()
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'resolved_at'}
         
         super().save(*args, **kwargs)
     
@@ -88,3 +205,37 @@ class Ticket(models.Model):
     @property
     def display_priority(self):
         return dict(self.PRIORITY_CHOICES).get(self.priority, self.priority)
+
+
+class SyncTombstone(models.Model):
+    """
+    Record of a ticket, comment or attachment that left the sync scope:
+    deleted, or (revoked) a ticket reassigned away from the agents that
+    could see it.
+    
+    The ticket's creator and assignee are copied at removal time so the
+    record can be scoped by role after the ticket itself is gone.
+    """
+    KIND_CHOICES = [
+        ('ticket', 'Ticket'),
+        ('comment', 'Comentario'),
+        ('attachment', 'Archivo Adjunto'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    ticket_id = models.BigIntegerField()
+    creator_id = models.BigIntegerField(null=True)
+    assignee_id = models.BigIntegerField(null=True)
+    is_private = models.BooleanField(default=False)
+    revoked = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        db_table = 'sync_tombstones'
+        verbose_name = 'Registro de Eliminación'
+        verbose_name_plural = 'Registros de Eliminación'
+        ordering = ['deleted_at']
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} ({self.deleted_at})"
@@ -0,0 +1,172 @@
+"""
+Full-text search for tickets.
+
+PostgreSQL: generated `search_vector` tsvector column (Spanish dictionary,
+title weighted above description) with a GIN index.
+SQLite: FTS5 external-content table `tickets_fts` kept in sync by triggers.
+Other backends fall back to the previous icontains search.
+
+The column/table and triggers live in the database only (they are created
+by migration 0005_ticket_search), so every insert or update keeps the index
+current without an extra query from Django.
+"""
+import logging
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'spanish'
+SQLITE_FTS_TABLE = 'tickets_fts'
+
+# Cache of aliases whose SQLite build has the FTS table available
+_sqlite_fts_available = {}
+
+
+def install_search_index(connection):
+    """
+    Create the full-text index objects for `connection`.
+    Safe to run again (e.g. after SQLite rebuilds the tickets table).
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"""
+                ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')
+                ) STORED
+            """)
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS tickets_search_vector_idx '
+                'ON tickets USING gin (search_vector)'
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+                        title, description,
+                        content='tickets', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+            except OperationalError:
+                logger.warning('SQLite sin FTS5: la búsqueda usará icontains')
+                return
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON tickets BEGIN
+                    INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON tickets BEGIN
+                    INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au
+                AFTER UPDATE OF title, description ON tickets BEGIN
+                    INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END
+            """)
+            # Default ranking: bm25 with title weighted above description
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rank) "
+                f"VALUES ('rank', 'bm25(10.0, 1.0)')"
+            )
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+            )
+    _sqlite_fts_available.pop(connection.alias, None)
+
+
+def uninstall_search_index(connection):
+    """Drop the full-text index objects for `connection`."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS tickets_search_vector_idx')
+            cursor.execute('ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector')
+        elif connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}')
+    _sqlite_fts_available.pop(connection.alias, None)
+
+
+def search_tickets(queryset, query):
+    """
+    Filter `queryset` to tickets matching `query` and annotate `search_rank`
+    (higher is more relevant).
+
+    Args:
+        queryset (QuerySet): Ticket queryset
+        query (str): User search text
+
+    Returns:
+        QuerySet: Filtered queryset annotated with search_rank
+    """
+    connection = connections[queryset.db]
+
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f'"tickets"."search_vector" @@ {tsquery}', (query,), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'ts_rank("tickets"."search_vector", {tsquery})', (query,), output_field=FloatField()
+            )
+        )
+
+    if connection.vendor == 'sqlite' and _has_sqlite_fts(connection):
+        match = _fts5_match_expression(query)
+        if match:
+            # Join the FTS table once (FTS5 drives the plan through MATCH);
+            # `rank` is FTS5's bm25 score, lower-is-better
+            return queryset.extra(
+                tables=[SQLITE_FTS_TABLE],
+                where=[
+                    f'{SQLITE_FTS_TABLE}.rowid = "tickets"."id"',
+                    f'{SQLITE_FTS_TABLE} MATCH %s',
+                ],
+                params=[match],
+                select={'search_rank': f'-{SQLITE_FTS_TABLE}.rank'},
+            )
+
+    return icontains_search(queryset, query)
+
+
+def icontains_search(queryset, query):
+    """Unindexed substring search (fallback and benchmark baseline)."""
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(description__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def _fts5_match_expression(query):
+    """
+    Turn free text into a safe FTS5 expression: every word is quoted
+    (no operator injection) and prefix-matched, all words required.
+    """
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _has_sqlite_fts(connection):
+    """Whether the FTS5 table exists on this SQLite database (cached)."""
+    if connection.alias not in _sqlite_fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [SQLITE_FTS_TABLE]
+            )
+            _sqlite_fts_available[connection.alias] = cursor.fetchone() is not None
+    return _sqlite_fts_available[connection.alias]
@@ -2,6 +2,8 @@
 Serializers for tickets app.
 """
 from rest_framework import serializers
+from apps.common.images import rendition_url
+from .bulk import BULK_MAX_TICKETS
 from .models import Ticket
 from apps.users.serializers import UserSerializer
 
@@ -16,6 +18,7 @@ class TicketListSerializer(serializers.ModelSerializer):
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     resolvedAt = serializers.DateTimeField(source='resolved_at', read_only=True)
     imageUrl = serializers.SerializerMethodField()
+    imageThumbUrl = serializers.SerializerMethodField()
     
     creator = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
@@ -40,7 +43,8 @@ class TicketListSerializer(serializers.ModelSerializer):
             'resolvedAt',
             'commentsCount',
             'attachmentsCount',
-            'imageUrl'
+            'imageUrl',
+            'imageThumbUrl'
         ]
     
     def get_imageUrl(self, obj):
@@ -57,12 +61,21 @@ class TicketListSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_imageThumbUrl(self, obj):
+        """Get URL of the image thumbnail (null until it is generated)."""
+        return rendition_url(obj, 'image', 'thumb', self.context.get('request'))
+
     def get_commentsCount(self, obj):
         """Get count of comments for this ticket."""
+        # Annotated by Ticket.objects.for_list(); fall back to a query otherwise
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
     def get_attachmentsCount(self, obj):
         """Get count of attachments for this ticket."""
+        if hasattr(obj, 'attachments_count'):
+            return obj.attachments_count
         return obj.attachments.count()
 
 
@@ -76,6 +89,8 @@ class TicketDetailSerializer(serializers.ModelSerializer):
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     resolvedAt = serializers.DateTimeField(source='resolved_at', read_only=True)
     imageUrl = serializers.SerializerMethodField()
+    imageThumbUrl = serializers.SerializerMethodField()
+    imageMediumUrl = serializers.SerializerMethodField()
     
     creator = UserSerializer(read_only=True)
     assignee = UserSerializer(read_only=True)
@@ -95,7 +110,9 @@ class TicketDetailSerializer(serializers.ModelSerializer):
             'createdAt',
             'updatedAt',
             'resolvedAt',
-            'imageUrl'
+            'imageUrl',
+            'imageThumbUrl',
+            'imageMediumUrl'
         ]
     
     def get_imageUrl(self, obj):
@@ -112,6 +129,14 @@ class TicketDetailSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_imageThumbUrl(self, obj):
+        """Get URL of the image thumbnail (null until it is generated)."""
+        return rendition_url(obj, 'image', 'thumb', self.context.get('request'))
+
+    def get_imageMediumUrl(self, obj):
+        """Get URL of the medium-size image (null until it is generated)."""
+        return rendition_url(obj, 'image', 'medium', self.context.get('request'))
+
 
 class TicketCreateSerializer(serializers.ModelSerializer):
     """
@@ -290,3 +315,30 @@ class TicketAssignSerializer(serializers.Serializer):
                 )
         return value
 
+
+class TicketBulkSerializer(serializers.Serializer):
+    """
+    Base serializer for bulk ticket operations.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=BULK_MAX_TICKETS
+    )
+
+
+class TicketBulkStatusSerializer(TicketBulkSerializer):
+    """
+    Serializer for bulk status updates.
+    """
+    status = serializers.ChoiceField(
+        choices=Ticket.STATUS_CHOICES,
+        required=True
+    )
+
+
+class TicketBulkAssignSerializer(TicketBulkSerializer, TicketAssignSerializer):
+    """
+    Serializer for bulk assignment (same assignee rules as TicketAssignSerializer).
+    """
+    pass
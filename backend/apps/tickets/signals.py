@@ -0,0 +1,180 @@
+"""
+Signal handlers for tickets app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from apps.attachments.models import Attachment
+from apps.comments.models import Comment
+from apps.metrics.cache import bump_generation
+from apps.users.models import User
+from .assignment import agent_loads
+from .models import SyncTombstone, Ticket
+
+
+# Sent by apps.tickets.bulk after QuerySet.update() writes (which send no
+# model signals) with changes=[(ticket_id, previous, current), ...], where
+# previous/current map created_at, resolved_at, priority, status and
+# assignee_id to their values
+tickets_bulk_updated = Signal()
+
+# Ticket fields that affect the agent load counters
+LOAD_FIELDS = ('assignee_id', 'status', 'priority')
+
+
+@receiver(post_save, sender=Ticket)
+def update_agent_loads_on_save(sender, instance, created, **kwargs):
+    """Keep the per-agent open-ticket counters in step with the ticket."""
+    if created:
+        agent_loads.move(None, tuple(getattr(instance, field) for field in LOAD_FIELDS))
+        return
+    
+    changed = instance.get_changed_fields()
+    if changed is not None and not set(LOAD_FIELDS) & set(changed):
+        return
+    
+    if changed is None or not all(instance.was_loaded(field) for field in LOAD_FIELDS):
+        # Previous values unknown (not loaded from the database, or deferred)
+        agent_loads.invalidate()
+        return
+    
+    previous = tuple(instance.get_loaded_value(field) for field in LOAD_FIELDS)
+    current = tuple(getattr(instance, field) for field in LOAD_FIELDS)
+    agent_loads.move(previous, current)
+
+
+@receiver(post_delete, sender=Ticket)
+def update_agent_loads_on_delete(sender, instance, **kwargs):
+    """Release the deleted ticket from its agent's counters."""
+    agent_loads.move((instance.assignee_id, instance.status, instance.priority), None)
+
+
+@receiver(post_save, sender=User)
+def refresh_support_roster_on_save(sender, instance, created, **kwargs):
+    """Rebuild the agent roster when someone joins or leaves support."""
+    if created:
+        if instance.role == 'support':
+            agent_loads.invalidate()
+        return
+    
+    changed = instance.get_changed_fields()
+    if changed is None or {'role', 'is_active'} & set(changed):
+        agent_loads.invalidate()
+
+
+@receiver(post_delete, sender=User)
+def refresh_support_roster_on_delete(sender, instance, **kwargs):
+    """Drop deleted agents from the roster."""
+    if instance.role == 'support':
+        agent_loads.invalidate()
+
+
+@receiver(tickets_bulk_updated)
+def update_agent_loads_on_bulk_update(sender, changes, **kwargs):
+    """Apply bulk ticket changes to the agent load counters."""
+    for ticket_id, previous, current in changes:
+        agent_loads.move(
+            tuple(previous[field] for field in LOAD_FIELDS),
+            tuple(current[field] for field in LOAD_FIELDS)
+        )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+def touch_ticket_on_activity(sender, instance, **kwargs):
+    """
+    Bump the ticket's updated_at when its comments or attachments change,
+    so ticket ETags and list validators (comment/attachment counts) change too.
+    """
+    Ticket.objects.filter(pk=instance.ticket_id).update(updated_at=timezone.now())
+    # update() sends no post_save: invalidate the ticket metrics here
+    bump_generation('tickets')
+
+
+@receiver(post_delete, sender=Ticket)
+def record_ticket_tombstone(sender, instance, **kwargs):
+    """Tell syncing clients the ticket is gone."""
+    SyncTombstone.objects.create(
+        kind='ticket',
+        object_id=instance.pk,
+        ticket_id=instance.pk,
+        creator_id=instance.creator_id,
+        assignee_id=instance.assignee_id,
+    )
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Attachment)
+def record_activity_tombstone(sender, instance, **kwargs):
+    """Tell syncing clients the comment or attachment is gone."""
+    ticket = Ticket.objects.filter(pk=instance.ticket_id).values('creator_id', 'assignee_id').first()
+    if ticket is None:
+        return
+    
+    SyncTombstone.objects.create(
+        kind='comment' if sender is Comment else 'attachment',
+        object_id=instance.pk,
+        ticket_id=instance.ticket_id,
+        is_private=instance.is_private,
+        **ticket
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def record_reassignment_on_save(sender, instance, created, **kwargs):
+    """Revoke the ticket from the agents that lose it when reassigned."""
+    if created:
+        return
+    
+    changed = instance.get_changed_fields()
+    if changed is not None and 'assignee_id' not in changed:
+        return
+    
+    if changed is not None and instance.was_loaded('assignee'):
+        previous = instance.get_loaded_value('assignee')
+    else:
+        # Previous assignee unknown: revoke from every agent, those who
+        # can still see the ticket ignore it (apps/tickets/sync.py)
+        previous = None
+    
+    revoke_assignment([(instance.pk, previous)])
+
+
+@receiver(tickets_bulk_updated)
+def record_reassignment_on_bulk_update(sender, changes, **kwargs):
+    """Revoke bulk-reassigned tickets from the agents that lose them."""
+    revoke_assignment([
+        (ticket_id, previous['assignee_id'])
+        for ticket_id, previous, current in changes
+        if previous['assignee_id'] != current['assignee_id']
+    ])
+
+
+def revoke_assignment(tickets):
+    """
+    Record a revoked tombstone per (ticket_id, previous assignee_id)
+    and bump the updated_at of the tickets' comments and
+    attachments, so the agents that gain the tickets download them.
+    """
+    if not tickets:
+        return
+    
+    SyncTombstone.objects.bulk_create([
+        SyncTombstone(
+            kind='ticket',
+            object_id=ticket_id,
+            ticket_id=ticket_id,
+            assignee_id=assignee_id,
+            revoked=True,
+        )
+        for ticket_id, assignee_id in tickets
+    ])
+    
+    ticket_ids = [ticket_id for ticket_id, assignee_id in tickets]
+    now = timezone.now()
+    Comment.objects.filter(ticket_id__in=ticket_ids).update(updated_at=now)
+    Attachment.objects.filter(ticket_id__in=ticket_ids).update(updated_at=now)
+    bump_generation('comments')
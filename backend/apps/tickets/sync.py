@@ -0,0 +1,194 @@
+"""
+Delta sync for offline-first clients (GET /api/tickets/sync/).
+
+A sync token encodes the point in time up to which the client is current.
+Changes since then are read with range scans on the updated_at indexes
+of tickets, comments and attachments, restricted to the same role scope
+as list_tickets_view. Deletes (and tickets reassigned away from an agent)
+are read from SyncTombstone, written by the signal handlers in
+apps/tickets/signals.py.
+
+The token holds a (timestamp, pk) position per kind (tickets, comments,
+attachments, deletions); each kind resumes after its own position with a
+keyset condition, as KeysetPagination does, so any number of rows sharing
+one timestamp is paged through. A kind that returned everything resumes
+SYNC_OVERLAP before the request started, so rows committed by
+transactions still running during the scan are returned on the next
+sync; clients upsert by id, so repeated rows are harmless. Each kind
+returns at most SYNC_MAX_CHANGES rows: when any kind is cut short its
+position is the last row returned and `hasMore` is true.
+
+Tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS are purged
+(management command purge_sync_tombstones); older tokens are rejected
+and the client must sync again from scratch.
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.attachments.models import Attachment
+from apps.comments.models import Comment
+from .models import SyncTombstone, Ticket
+
+
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class InvalidSyncToken(ValueError):
+    """The sync token could not be decoded."""
+
+
+class ExpiredSyncToken(ValueError):
+    """The sync token predates the tombstone retention period."""
+
+
+SYNC_KINDS = ('tickets', 'comments', 'attachments', 'deleted')
+
+
+def encode_token(positions):
+    """Encode a {kind: (moment, pk)} mapping as an opaque URL-safe token."""
+    payload = json.dumps({
+        kind: [moment.isoformat(), pk] for kind, (moment, pk) in positions.items()
+    }).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_token(token):
+    """
+    Decode a sync token into {kind: (moment, pk)}; None (or empty) means
+    a full sync. Tokens issued before per-kind positions hold a single
+    moment, which applies to every kind.
+
+    Raises:
+        InvalidSyncToken: The token is malformed
+        ExpiredSyncToken: Its tombstones may have been purged
+    """
+    if not token:
+        return None
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(payload, list):
+            moment, = payload
+            payload = {kind: [moment, 0] for kind in SYNC_KINDS}
+        positions = {}
+        for kind in SYNC_KINDS:
+            moment, pk = payload[kind]
+            positions[kind] = parse_datetime(moment), pk
+    except (TypeError, ValueError, KeyError, binascii.Error):
+        raise InvalidSyncToken(token)
+
+    for moment, pk in positions.values():
+        if moment is None or timezone.is_naive(moment) or type(pk) is not int or pk < 0:
+            raise InvalidSyncToken(token)
+
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if min(moment for moment, pk in positions.values()) < timezone.now() - retention:
+        raise ExpiredSyncToken(token)
+
+    return positions
+
+
+def tombstone_scope(user):
+    """Q restricting tombstones to the records `user` could see."""
+    if user.role == 'sysAdmin':
+        return Q(revoked=False)
+    if user.role == 'support':
+        # A revoked ticket the agent can still see (e.g. now assigned
+        # to them) was not lost
+        visible = Ticket.objects.visible_to(user).values('id')
+        return (
+            (Q(assignee_id=user.id) | Q(assignee_id__isnull=True))
+            & ~Q(revoked=True, ticket_id__in=visible)
+        )
+    return Q(creator_id=user.id, revoked=False, is_private=False)
+
+
+def _changes(queryset, field, position, limit):
+    """
+    Rows of `queryset` after the (moment, pk) `position`, oldest first,
+    plus overflow flag.
+    """
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{field}__gt': moment}) |
+            Q(**{field: moment, 'pk__gt': pk})
+        )
+    rows = list(queryset.order_by(field, 'pk')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def collect_changes(user, since, limit=None):
+    """
+    Everything in `user`'s scope that changed since the positions in
+    `since` (None for a full sync).
+
+    Returns:
+        dict: {'tickets', 'comments', 'attachments': [instances],
+               'deleted': {'tickets', 'comments', 'attachments': [ids]},
+               'nextToken', 'hasMore'}
+    """
+    limit = limit or settings.SYNC_MAX_CHANGES
+    started = timezone.now()
+    since = since or {}
+
+    tickets = Ticket.objects.for_list().visible_to(user)
+    comments = Comment.objects.visible_to(user).select_related('author')
+    attachments = Attachment.objects.visible_to(user).select_related('uploaded_by')
+
+    results = {
+        'tickets': _changes(tickets, 'updated_at', since.get('tickets'), limit),
+        'comments': _changes(comments, 'updated_at', since.get('comments'), limit),
+        'attachments': _changes(attachments, 'updated_at', since.get('attachments'), limit),
+    }
+
+    # A full sync has nothing to delete
+    tombstones = ([], False)
+    if since:
+        tombstones = _changes(
+            SyncTombstone.objects.filter(tombstone_scope(user)).only('kind', 'object_id', 'deleted_at'),
+            'deleted_at',
+            since['deleted'],
+            limit
+        )
+
+    # Kinds cut short resume after their last row, the rest from just
+    # before this request
+    resume = (started - SYNC_OVERLAP, 0)
+    positions = {
+        kind: (rows[-1].updated_at, rows[-1].pk) if more else resume
+        for kind, (rows, more) in results.items()
+    }
+    rows, more = tombstones
+    positions['deleted'] = (rows[-1].deleted_at, rows[-1].pk) if more else resume
+    has_more = any(more for rows, more in results.values()) or tombstones[1]
+
+    deleted = {'tickets': [], 'comments': [], 'attachments': []}
+    for tombstone in tombstones[0]:
+        deleted[f'{tombstone.kind}s'].append(tombstone.object_id)
+
+    return {
+        'tickets': results['tickets'][0],
+        'comments': results['comments'][0],
+        'attachments': results['attachments'][0],
+        'deleted': deleted,
+        'nextToken': encode_token(positions),
+        'hasMore': has_more,
+    }
+
+
+def purge_tombstones(days=None):
+    """Delete tombstones older than the retention period; returns the count."""
+    days = settings.SYNC_TOMBSTONE_RETENTION_DAYS if days is None else days
+    deleted, _ = SyncTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
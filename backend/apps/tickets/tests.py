@@ -0,0 +1,299 @@
+"""
+Tests for the tickets app.
+"""
+import base64
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.attachments.models import Attachment
+from apps.comments.models import Comment
+from apps.tickets.models import Ticket
+from apps.tickets.search import search_tickets
+from apps.users.models import User
+
+
+def create_user(username, role):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Passw0rd!',
+        first_name=username,
+        last_name='Test',
+        role=role
+    )
+
+
+class TicketListQueryCountTests(TestCase):
+    """The ticket list costs the same number of queries whatever its size."""
+
+    # Page-number mode: ETag aggregate (also the page count), page rows
+    LIST_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+        cls.agent = create_user('agent', 'support')
+        cls.admin = create_user('admin', 'sysAdmin')
+        cls.others = [create_user(f'other-{i}', 'user') for i in range(5)]
+
+    def create_tickets(self, count):
+        for i in range(count):
+            # Distinct creators and assignees, with comments and
+            # attachments, so any per-row lookup would show up
+            ticket = Ticket.objects.create(
+                title=f'Ticket de prueba {i}',
+                description='Descripción del ticket de prueba',
+                creator=self.creator,
+                assignee=self.agent if i % 2 else None
+            )
+            for other in self.others[:i % len(self.others)]:
+                Comment.objects.create(ticket=ticket, author=other, text='Comentario')
+            # bulk_create: no file is written to storage
+            Attachment.objects.bulk_create([Attachment(
+                ticket=ticket,
+                uploaded_by=self.creator,
+                file='uploads/attachments/test.txt',
+                original_filename='test.txt',
+                file_size=4,
+                mime_type='text/plain'
+            )])
+
+    def assert_list_queries(self, user, expected_rows):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = client.get('/api/tickets/', {'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), expected_rows)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.create_tickets(1)
+        one = {self.creator: 1, self.agent: 1, self.admin: 1}
+        for user, rows in one.items():
+            with self.subTest(role=user.role, tickets=1):
+                self.assert_list_queries(user, rows)
+
+        self.create_tickets(29)
+        many = {self.creator: 30, self.agent: 30, self.admin: 30}
+        for user, rows in many.items():
+            with self.subTest(role=user.role, tickets=30):
+                self.assert_list_queries(user, rows)
+
+
+class TicketListCursorTests(TestCase):
+    """Keyset pages of the ticket list; malformed cursors are not found."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def encode(self, payload):
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def assert_rejected(self, payload):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/tickets/', {'cursor': self.encode(payload)})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['details']['detail'], 'Cursor inválido')
+
+    def test_cursor_id_outside_column_range(self):
+        created_at = timezone.now().isoformat()
+        for pk in (2 ** 63, -2 ** 63 - 1, 10 ** 30):
+            with self.subTest(pk=pk):
+                self.assert_rejected(json.dumps([created_at, pk]))
+
+    def test_cursor_id_not_an_integer(self):
+        created_at = json.dumps(timezone.now().isoformat())
+        for pk in ('1e400', 'Infinity', '-Infinity', 'NaN', '1.5', '"5"', 'true'):
+            with self.subTest(pk=pk):
+                self.assert_rejected(f'[{created_at}, {pk}]')
+
+    def test_cursor_naive_datetime(self):
+        self.assert_rejected(json.dumps(['2026-10-18T12:00:00', 1]))
+
+    def create_tickets(self, count):
+        return [
+            Ticket.objects.create(
+                title=f'Ticket de prueba {i}',
+                description='Descripción del ticket de prueba',
+                creator=self.admin
+            )
+            for i in range(count)
+        ]
+
+    def get_page(self, cursor):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/tickets/', {'cursor': cursor, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_two_element_cursor_still_decodes(self):
+        # Cursors issued before they carried a direction
+        tickets = self.create_tickets(5)
+        cursor = self.encode(json.dumps([tickets[3].created_at.isoformat(), tickets[3].pk]))
+        page = self.get_page(cursor)
+        self.assertEqual([ticket['id'] for ticket in page['results']], [tickets[2].pk, tickets[1].pk])
+
+    def test_previous_cursor_returns_the_page_before(self):
+        self.create_tickets(5)
+        first = self.get_page('')
+        self.assertIsNone(first['previousCursor'])
+
+        second = self.get_page(first['nextCursor'])
+        back = self.get_page(second['previousCursor'])
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previousCursor'])
+        self.assertIsNotNone(back['nextCursor'])
+
+
+class TicketSearchIndexTests(TestCase):
+    """The full-text index follows tickets written after migrating."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+
+    def test_search_finds_created_and_edited_tickets(self):
+        ticket = Ticket.objects.create(
+            title='Impresora atascada',
+            description='La impresora de la planta baja no imprime',
+            creator=self.creator
+        )
+        self.assertEqual(list(search_tickets(Ticket.objects.all(), 'impresora')), [ticket])
+
+        ticket.title = 'Monitor sin señal'
+        ticket.description = 'El monitor del puesto 4 no enciende'
+        ticket.save()
+        self.assertEqual(list(search_tickets(Ticket.objects.all(), 'impresora')), [])
+        self.assertEqual(list(search_tickets(Ticket.objects.all(), 'monitor')), [ticket])
+
+
+@override_settings(SYNC_MAX_CHANGES=3)
+class TicketSyncTests(TestCase):
+    """Delta sync pages through rows that share one timestamp."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def sync_all(self, since=None):
+        """Follow nextToken until hasMore is false; returns (ticket ids, comment ids, token)."""
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        tickets, comments = [], []
+        for _ in range(20):
+            params = {'since': since} if since else {}
+            response = client.get('/api/tickets/sync/', params)
+            self.assertEqual(response.status_code, 200)
+            tickets += [ticket['id'] for ticket in response.data['tickets']]
+            comments += [comment['id'] for comment in response.data['comments']]
+            since = response.data['nextToken']
+            if not response.data['hasMore']:
+                return tickets, comments, since
+        self.fail('La sincronización no termina')
+
+    def test_more_rows_than_limit_share_one_timestamp(self):
+        _, _, token = self.sync_all()
+        tickets = [
+            Ticket.objects.create(
+                title=f'Ticket de prueba {i}',
+                description='Descripción del ticket de prueba',
+                creator=self.creator
+            )
+            for i in range(8)
+        ]
+        comments = [
+            Comment.objects.create(ticket=tickets[0], author=self.creator, text=f'Comentario {i}')
+            for i in range(7)
+        ]
+        # As a bulk update or a revoked assignment stamps them
+        now = timezone.now()
+        Ticket.objects.update(updated_at=now)
+        Comment.objects.update(updated_at=now)
+
+        synced_tickets, synced_comments, _ = self.sync_all(token)
+        self.assertEqual(set(synced_tickets), {ticket.id for ticket in tickets})
+        self.assertEqual(set(synced_comments), {comment.id for comment in comments})
+
+    def test_single_moment_token_still_accepted(self):
+        moment = (timezone.now() - timedelta(minutes=1)).isoformat()
+        token = base64.urlsafe_b64encode(json.dumps([moment]).encode()).decode().rstrip('=')
+        ticket = Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=self.creator
+        )
+        synced_tickets, _, _ = self.sync_all(token)
+        self.assertEqual(synced_tickets, [ticket.id])
+
+
+class TicketFieldTrackerTests(TestCase):
+    """save() writes every column modified since it was last stored."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+
+    def create_ticket(self):
+        return Ticket.objects.create(
+            title='Ticket de prueba',
+            description='Descripción del ticket de prueba',
+            creator=self.creator
+        )
+
+    def test_fields_left_out_of_update_fields_are_saved_later(self):
+        ticket = Ticket.objects.get(pk=self.create_ticket().pk)
+        ticket.title = 'Título cambiado'
+        ticket.status = 'closed'
+        ticket.save(update_fields=['status'])
+
+        stored = Ticket.objects.get(pk=ticket.pk)
+        self.assertEqual((stored.title, stored.status), ('Ticket de prueba', 'closed'))
+        self.assertEqual(ticket.get_changed_fields(), ['title'])
+
+        ticket.save()
+        stored = Ticket.objects.get(pk=ticket.pk)
+        self.assertEqual((stored.title, stored.status), ('Título cambiado', 'closed'))
+        self.assertEqual(ticket.get_changed_fields(), [])
+
+    def test_instance_without_snapshot_saves_every_field_later(self):
+        ticket = self.create_ticket()
+        unloaded = Ticket(pk=ticket.pk, title='Título cambiado', description=ticket.description,
+                          creator=self.creator, created_at=ticket.created_at, status='closed')
+        unloaded.save(update_fields=['status'])
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).title, 'Ticket de prueba')
+
+        unloaded.save()
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).title, 'Título cambiado')
+
+
+class TicketExportTests(TestCase):
+    """The CSV export is safe to open in a spreadsheet."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator', 'user')
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def test_formula_cells_are_quoted(self):
+        for title in ('=HYPERLINK("http://example.com")', '+1+1', '-2+3', '@SUM(A1)', 'Impresora'):
+            Ticket.objects.create(title=title, description='Descripción del ticket', creator=self.creator)
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/tickets/export/', {'output': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+        self.assertEqual(
+            sorted(row['title'] for row in rows),
+            sorted(["'=HYPERLINK(\"http://example.com\")", "'+1+1", "'-2+3", "'@SUM(A1)", 'Impresora'])
+        )
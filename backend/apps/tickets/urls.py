@@ -14,6 +14,17 @@ urlpatterns = [
     path('tickets/assigned/', views.assigned_tickets_view, name='tickets-assigned'),
     path('tickets/unassigned/', views.unassigned_tickets_view, name='tickets-unassigned'),
     
+    # Export (admin)
+    path('tickets/export/', views.export_tickets_view, name='tickets-export'),
+    
+    # Delta sync (offline clients)
+    path('tickets/sync/', views.sync_tickets_view, name='tickets-sync'),
+    
+    # Bulk operations
+    path('tickets/bulk/status/', views.bulk_update_status_view, name='tickets-bulk-status'),
+    path('tickets/bulk/close/', views.bulk_close_view, name='tickets-bulk-close'),
+    path('tickets/bulk/assign/', views.bulk_assign_view, name='tickets-bulk-assign'),
+    
     # Ticket detail and updates
     path('tickets/<int:ticket_id>/', views.get_ticket_detail_view, name='ticket-detail'),
     path('tickets/<int:ticket_id>/update/', views.update_ticket_view, name='ticket-update'),
@@ -6,18 +6,39 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, Max, Sum
 
+from .assignment import pick_assignee
+from .bulk import UPDATED, bulk_assign, bulk_set_status
+from .export import ENCODERS, EXPORT_FORMATS, export_rows
 from .models import Ticket
+from .search import search_tickets
+from .sync import ExpiredSyncToken, InvalidSyncToken, collect_changes, decode_token
 from .serializers import (
     TicketListSerializer,
     TicketDetailSerializer,
     TicketCreateSerializer,
     TicketUpdateSerializer,
     TicketStatusUpdateSerializer,
-    TicketAssignSerializer
+    TicketAssignSerializer,
+    TicketBulkAssignSerializer,
+    TicketBulkSerializer,
+    TicketBulkStatusSerializer
 )
+from apps.attachments.serializers import AttachmentSerializer
+from apps.comments.serializers import CommentSerializer
+from apps.common.conditional import (
+    conditional_response,
+    if_match_failed,
+    make_etag,
+    set_validators
+)
+from apps.common.pagination import KeysetPagination
 from apps.users.permissions import IsAdminUser, IsSupportOrAdmin
 
 
@@ -26,41 +47,92 @@ class TicketPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    # Rows in the paginated queryset, when the caller already counted them
+    count = None
 
+    def django_paginator_class(self, queryset, page_size):
+        paginator = Paginator(queryset, page_size)
+        if self.count is not None:
+            # Paginator.count is a cached property: this skips its COUNT(*)
+            paginator.count = self.count
+        return paginator
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def list_tickets_view(request):
+
+class TicketCursorPagination(KeysetPagination):
+    """Keyset pagination for ticket feeds (mobile infinite scroll)."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def get_ticket_paginator(request):
     """
-    List tickets based on user role.
-    GET /api/tickets/
-    
-    Query params:
-    - status: filter by status
-    - priority: filter by priority
-    - page: page number
-    - page_size: items per page
-    - search: search in title and description
+    Use keyset pagination when the client sends ?cursor=,
+    page-number pagination otherwise (older clients).
     """
-    user = request.user
-    
-    # Filter based on user role
-    if user.role == 'sysAdmin':
-        # Admin can see all tickets
-        queryset = Ticket.objects.all()
-    elif user.role == 'support':
-        # Support can see assigned tickets and unassigned tickets
-        queryset = Ticket.objects.filter(
-            Q(assignee=user) | Q(assignee__isnull=True)
-        )
+    if TicketCursorPagination.cursor_query_param in request.query_params:
+        return TicketCursorPagination()
+    return TicketPagination()
+
+
+def ticket_etag(ticket):
+    """ETag of a ticket, derived from its last update."""
+    return make_etag('ticket', ticket.pk, ticket.updated_at.isoformat())
+
+
+def ticket_list_response(request, queryset):
+    """
+    Paginate and serialize a ticket list, or answer 304 Not Modified.
+    
+    The validators come from one aggregate: latest updated_at, row count
+    and id sum (which change when rows are edited, removed or replaced),
+    keyed by user and query string. Keyset pages aggregate just the
+    requested page; page-number responses include the total count, so
+    they aggregate the whole filtered queryset and the paginator reuses
+    that count instead of running its own.
+    """
+    paginator = get_ticket_paginator(request)
+    if isinstance(paginator, KeysetPagination):
+        scope = paginator.get_page_queryset(queryset, request).values('id', 'updated_at')
     else:
-        # Regular users can only see their own tickets
-        queryset = Ticket.objects.filter(creator=user)
+        scope = queryset.order_by()
     
-    # Apply filters
-    status_filter = request.query_params.get('status')
-    priority_filter = request.query_params.get('priority')
-    search = request.query_params.get('search')
+    state = scope.aggregate(
+        last_modified=Max('updated_at'),
+        total=Count('id'),
+        ids=Sum('id')
+    )
+    etag = make_etag(
+        'tickets',
+        request.user.pk,
+        request.get_full_path(),
+        state['total'],
+        state['ids'],
+        state['last_modified'].isoformat() if state['last_modified'] else ''
+    )
+    
+    not_modified = conditional_response(request, etag, state['last_modified'])
+    if not_modified is not None:
+        return not_modified
+    
+    if not isinstance(paginator, KeysetPagination):
+        paginator.count = state['total']
+    paginated_queryset = paginator.paginate_queryset(queryset, request)
+    
+    serializer = TicketListSerializer(paginated_queryset, many=True)
+    
+    response = paginator.get_paginated_response(serializer.data)
+    return set_validators(response, etag, state['last_modified'])
+
+
+def filter_ticket_list(queryset, params):
+    """
+    Apply the status/priority/search filters and ordering shared by the
+    ticket list and the export.
+    """
+    status_filter = params.get('status')
+    priority_filter = params.get('priority')
+    search = params.get('search')
     
     if status_filter:
         queryset = queryset.filter(status=status_filter)
@@ -69,21 +141,37 @@ def list_tickets_view(request):
         queryset = queryset.filter(priority=priority_filter)
     
     if search:
-        queryset = queryset.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search)
-        )
+        # Full-text search, most relevant first
+        return search_tickets(queryset, search).order_by('-search_rank', '-created_at')
     
     # Order by most recent
-    queryset = queryset.order_by('-created_at')
+    return queryset.order_by('-created_at')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_tickets_view(request):
+    """
+    List tickets based on user role.
+    GET /api/tickets/
     
-    # Pagination
-    paginator = TicketPagination()
-    paginated_queryset = paginator.paginate_queryset(queryset, request)
+    Query params:
+    - status: filter by status
+    - priority: filter by priority
+    - page: page number
+    - page_size: items per page
+    - cursor: keyset pagination cursor (empty for the first page)
+    - search: search in title and description
+    """
+    # Admins see all tickets, support assigned and unassigned ones,
+    # everyone else their own
+    queryset = Ticket.objects.for_list().visible_to(request.user)
     
-    serializer = TicketListSerializer(paginated_queryset, many=True)
+    # Apply filters
+    queryset = filter_ticket_list(queryset, request.query_params)
     
-    return paginator.get_paginated_response(serializer.data)
+    # Pagination (304 when the client copy is current)
+    return ticket_list_response(request, queryset)
 
 
 @api_view(['POST'])
@@ -99,15 +187,9 @@ def create_ticket_view(request):
     )
     
     if serializer.is_valid():
-        ticket = serializer.save()
-        
-        # Auto-asignar a un usuario de soporte aleatorio
-        from apps.users.models import User
-        import random
-        soportes = User.objects.filter(role='support', is_active=True)
-        if soportes.exists():
-            ticket.assignee = random.choice(soportes)
-            ticket.save()
+        # Auto-asignar a un usuario de soporte en el mismo INSERT
+        assignee_id = pick_assignee(serializer.validated_data['priority'])
+        ticket = serializer.save(assignee_id=assignee_id)
         
         # Return detailed ticket data
         ticket_data = TicketDetailSerializer(ticket).data
@@ -130,53 +212,55 @@ def get_ticket_detail_view(request, ticket_id):
     Get ticket details.
     GET /api/tickets/{id}/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    user = request.user
+    # Tickets the user cannot see are not found
+    ticket = get_object_or_404(
+        Ticket.objects.visible_to(request.user).select_related('creator', 'assignee'),
+        id=ticket_id
+    )
     
-    # Check permissions
-    if user.role not in ['sysAdmin', 'support']:
-        # Regular users can only see their own tickets
-        if ticket.creator != user:
-            return Response({
-                'error': 'No tienes permiso para ver este ticket'
-            }, status=status.HTTP_403_FORBIDDEN)
-    elif user.role == 'support':
-        # Support can only see assigned tickets or unassigned tickets
-        if ticket.assignee and ticket.assignee != user:
-            return Response({
-                'error': 'No tienes permiso para ver este ticket'
-            }, status=status.HTTP_403_FORBIDDEN)
+    # 304 without serializing when the client copy is current
+    etag = ticket_etag(ticket)
+    not_modified = conditional_response(request, etag, ticket.updated_at)
+    if not_modified is not None:
+        return not_modified
     
     serializer = TicketDetailSerializer(ticket)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    response = Response(serializer.data, status=status.HTTP_200_OK)
+    return set_validators(response, etag, ticket.updated_at)
 
 
 @api_view(['PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
+@transaction.atomic
 def update_ticket_view(request, ticket_id):
     """
     Update ticket.
     PUT/PATCH /api/tickets/{id}/
+    
+    Honors If-Match (ticket ETag) to reject updates based on stale data.
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
     user = request.user
+    ticket = get_object_or_404(
+        Ticket.objects.visible_to(user)
+        .select_related('creator', 'assignee')
+        .select_for_update(of=('self',)),
+        id=ticket_id
+    )
     
-    # Check permissions
-    can_update = False
-    
-    if user.role == 'sysAdmin':
-        can_update = True
-    elif user.role == 'support' and (ticket.assignee == user or not ticket.assignee):
-        can_update = True
-    elif ticket.creator == user and ticket.status == 'open':
-        # Creator can only update open tickets (limited fields)
-        can_update = True
-    
-    if not can_update:
+    # Creators can only update open tickets (limited fields)
+    if user.role not in ['support', 'sysAdmin'] and ticket.status != 'open':
         return Response({
             'error': 'No tienes permiso para actualizar este ticket'
         }, status=status.HTTP_403_FORBIDDEN)
     
+    # Optimistic concurrency: the client edited an older version
+    if if_match_failed(request, ticket_etag(ticket)):
+        response = Response({
+            'error': 'El ticket fue modificado por otro usuario',
+            'details': 'Vuelve a cargar el ticket y reintenta la actualización'
+        }, status=status.HTTP_412_PRECONDITION_FAILED)
+        return set_validators(response, ticket_etag(ticket), ticket.updated_at)
+    
     serializer = TicketUpdateSerializer(
         ticket,
         data=request.data,
@@ -201,10 +285,11 @@ def update_ticket_view(request, ticket_id):
         # Return updated ticket
         ticket_data = TicketDetailSerializer(ticket).data
         
-        return Response({
+        response = Response({
             'msg': 'Ticket actualizado exitosamente',
             'ticket': ticket_data
         }, status=status.HTTP_200_OK)
+        return set_validators(response, ticket_etag(ticket), ticket.updated_at)
     
     return Response({
         'error': 'Error al actualizar ticket',
@@ -219,11 +304,14 @@ def update_ticket_status_view(request, ticket_id):
     Update only ticket status (support/admin only).
     PATCH /api/tickets/{id}/status/
     """
-    ticket = get_object_or_404(Ticket, id=ticket_id)
     user = request.user
+    ticket = get_object_or_404(
+        Ticket.objects.visible_to(user).select_related('creator', 'assignee'),
+        id=ticket_id
+    )
     
     # Support can only update their assigned tickets
-    if user.role == 'support' and ticket.assignee != user:
+    if user.role == 'support' and ticket.assignee_id != user.id:
         return Response({
             'error': 'Solo puedes actualizar el estado de tus tickets asignados'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -276,6 +364,110 @@ def assign_ticket_view(request, ticket_id):
     }, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _bulk_response(results):
+    """Compact response for bulk operations."""
+    updated = sum(1 for result in results if result['result'] == UPDATED)
+    
+    return Response({
+        'msg': f'{updated} de {len(results)} tickets actualizados',
+        'updated': updated,
+        'results': results
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsSupportOrAdmin])
+def bulk_update_status_view(request):
+    """
+    Update the status of several tickets (support/admin only).
+    POST /api/tickets/bulk/status/
+    """
+    serializer = TicketBulkStatusSerializer(data=request.data)
+    
+    if serializer.is_valid():
+        results = bulk_set_status(
+            request.user,
+            serializer.validated_data['ids'],
+            serializer.validated_data['status']
+        )
+        return _bulk_response(results)
+    
+    return Response({
+        'error': 'Error al actualizar estados',
+        'details': serializer.errors
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsSupportOrAdmin])
+def bulk_close_view(request):
+    """
+    Close several tickets (support/admin only).
+    POST /api/tickets/bulk/close/
+    """
+    serializer = TicketBulkSerializer(data=request.data)
+    
+    if serializer.is_valid():
+        results = bulk_set_status(request.user, serializer.validated_data['ids'], 'closed')
+        return _bulk_response(results)
+    
+    return Response({
+        'error': 'Error al cerrar tickets',
+        'details': serializer.errors
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsSupportOrAdmin])
+def bulk_assign_view(request):
+    """
+    Assign several tickets to one user (support/admin only).
+    POST /api/tickets/bulk/assign/
+    """
+    serializer = TicketBulkAssignSerializer(data=request.data)
+    
+    if serializer.is_valid():
+        results = bulk_assign(
+            serializer.validated_data['ids'],
+            serializer.validated_data['assigneeId']
+        )
+        return _bulk_response(results)
+    
+    return Response({
+        'error': 'Error al asignar tickets',
+        'details': serializer.errors
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def export_tickets_view(request):
+    """
+    Stream every ticket as CSV or NDJSON (admin only).
+    GET /api/tickets/export/
+    
+    Query params:
+    - output: csv (default) or ndjson
+    - status, priority, search: same filters as the ticket list
+    """
+    output = request.query_params.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        return Response({
+            'error': 'Formato de exportación inválido',
+            'details': f"Valores permitidos: {', '.join(EXPORT_FORMATS)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    queryset = filter_ticket_list(Ticket.objects.for_list(), request.query_params)
+    
+    response = StreamingHttpResponse(
+        ENCODERS[output](export_rows(queryset)),
+        content_type=EXPORT_FORMATS[output]
+    )
+    filename = f"tickets-{timezone.localtime():%Y%m%d-%H%M}.{output}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def delete_ticket_view(request, ticket_id):
@@ -300,20 +492,15 @@ def my_tickets_view(request):
     GET /api/tickets/my-tickets/
     """
     user = request.user
-    queryset = Ticket.objects.filter(creator=user).order_by('-created_at')
+    queryset = Ticket.objects.for_list().filter(creator=user).order_by('-created_at')
     
     # Apply filters
     status_filter = request.query_params.get('status')
     if status_filter:
         queryset = queryset.filter(status=status_filter)
     
-    # Pagination
-    paginator = TicketPagination()
-    paginated_queryset = paginator.paginate_queryset(queryset, request)
-    
-    serializer = TicketListSerializer(paginated_queryset, many=True)
-    
-    return paginator.get_paginated_response(serializer.data)
+    # Pagination (304 when the client copy is current)
+    return ticket_list_response(request, queryset)
 
 
 @api_view(['GET'])
@@ -324,20 +511,15 @@ def assigned_tickets_view(request):
     GET /api/tickets/assigned/
     """
     user = request.user
-    queryset = Ticket.objects.filter(assignee=user).order_by('-created_at')
+    queryset = Ticket.objects.for_list().filter(assignee=user).order_by('-created_at')
     
     # Apply filters
     status_filter = request.query_params.get('status')
     if status_filter:
         queryset = queryset.filter(status=status_filter)
     
-    # Pagination
-    paginator = TicketPagination()
-    paginated_queryset = paginator.paginate_queryset(queryset, request)
-    
-    serializer = TicketListSerializer(paginated_queryset, many=True)
-    
-    return paginator.get_paginated_response(serializer.data)
+    # Pagination (304 when the client copy is current)
+    return ticket_list_response(request, queryset)
 
 
 @api_view(['GET'])
@@ -347,13 +529,47 @@ def unassigned_tickets_view(request):
     Get unassigned tickets (support/admin).
     GET /api/tickets/unassigned/
     """
-    queryset = Ticket.objects.filter(assignee__isnull=True).order_by('-created_at')
+    queryset = Ticket.objects.for_list().filter(assignee__isnull=True).order_by('-created_at')
     
-    # Pagination
-    paginator = TicketPagination()
-    paginated_queryset = paginator.paginate_queryset(queryset, request)
+    # Pagination (304 when the client copy is current)
+    return ticket_list_response(request, queryset)
+
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_tickets_view(request):
+    """
+    Delta sync for offline clients: tickets, comments and attachments
+    created, updated or deleted since the token, scoped like the list.
+    GET /api/tickets/sync/?since=<token>
     
-    serializer = TicketListSerializer(paginated_queryset, many=True)
+    Query params:
+    - since: nextToken of the previous sync (omit for a full sync)
+    """
+    try:
+        since = decode_token(request.query_params.get('since'))
+    except InvalidSyncToken:
+        return Response({
+            'error': 'Token de sincronización inválido'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except ExpiredSyncToken:
+        return Response({
+            'error': 'Token de sincronización expirado',
+            'details': 'Sincroniza de nuevo sin el parámetro since'
+        }, status=status.HTTP_410_GONE)
     
-    return paginator.get_paginated_response(serializer.data)
-
+    changes = collect_changes(request.user, since)
+    
+    return Response({
+        'tickets': TicketListSerializer(changes['tickets'], many=True).data,
+        'comments': CommentSerializer(changes['comments'], many=True).data,
+        'attachments': AttachmentSerializer(
+            changes['attachments'],
+            many=True,
+            context={'request': request}
+        ).data,
+        'deleted': changes['deleted'],
+        'nextToken': changes['nextToken'],
+        'hasMore': changes['hasMore'],
+    }, status=status.HTTP_200_OK)
@@ -8,3 +8,6 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = 'Usuarios'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,132 @@
+"""
+Cache of the authenticated user for JWT requests.
+
+Every API request authenticates its access token by loading the User row.
+CachedJWTAuthentication (apps/authentication/backends.py) reads it from
+here instead: a per-process LRU of at most AUTH_USER_CACHE_MAX_ENTRIES
+rows, each kept AUTH_USER_CACHE_TTL seconds, and optionally a copy in the
+shared Django cache (AUTH_USER_CACHE_SHARED) so a worker that never saw
+the user does not query either.
+
+Entries are stamped with the user's version, kept in the Django cache.
+User.save() and deletions bump the version (again when the transaction
+commits, so a request that read the old row meanwhile cannot cache it
+under the new version), which makes deactivations, role changes and
+password changes visible on the next request. Only the version lookup
+stays on the request path. It must be shared by every worker, so the
+cache is only enabled with REDIS_URL: with the per-process LocMem cache
+other workers would keep serving the old row (AUTH_USER_CACHE_TTL is 0).
+
+Cached rows are stored as raw column values and every request gets a
+fresh User instance, so views may modify request.user freely.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+CACHE_PREFIX = 'auth-user'
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _version_key(user_id):
+    return f'{CACHE_PREFIX}:version:{user_id}'
+
+
+def _entry_key(user_id):
+    return f'{CACHE_PREFIX}:row:{user_id}'
+
+
+def _bump(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # Evicted: restart from a value no previous version used
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached copy of the user, now and after commit."""
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def _current_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _get_local(user_id, version):
+    with _local_lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return None
+        entry_version, expires_at, values = entry
+        if entry_version != version or expires_at <= time.monotonic():
+            del _local[user_id]
+            return None
+        _local.move_to_end(user_id)
+        return values
+
+
+def _set_local(user_id, version, values):
+    with _local_lock:
+        _local[user_id] = (version, time.monotonic() + settings.AUTH_USER_CACHE_TTL, values)
+        _local.move_to_end(user_id)
+        while len(_local) > settings.AUTH_USER_CACHE_MAX_ENTRIES:
+            _local.popitem(last=False)
+
+
+def clear_local_cache():
+    """Empty this process' cache (the shared entries expire by themselves)."""
+    with _local_lock:
+        _local.clear()
+
+
+def get_cached_user(model, user_id):
+    """
+    The user with primary key `user_id`, from the cache when its version
+    is current, otherwise from the database.
+
+    Raises:
+        model.DoesNotExist: No such user
+    """
+    ttl = settings.AUTH_USER_CACHE_TTL
+    if not ttl:
+        return model.objects.get(pk=user_id)
+
+    attnames = _attnames(model)
+    version = _current_version(user_id)
+    values = _get_local(user_id, version)
+
+    if values is None and settings.AUTH_USER_CACHE_SHARED:
+        entry = cache.get(_entry_key(user_id))
+        if entry is not None and entry[0] == version:
+            values = entry[1]
+            _set_local(user_id, version, values)
+
+    if values is None:
+        # The version was read first: a change saved meanwhile bumps it
+        # and this copy is never served
+        values = model.objects.filter(pk=user_id).values_list(*attnames).first()
+        if values is None:
+            raise model.DoesNotExist
+        _set_local(user_id, version, values)
+        if settings.AUTH_USER_CACHE_SHARED:
+            cache.set(_entry_key(user_id), (version, values), ttl)
+
+    return model.from_db(DEFAULT_DB_ALIAS, attnames, values)
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_medium',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=''),
+        ),
+    ]
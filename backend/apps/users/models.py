@@ -5,8 +5,12 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
 
+from apps.common.models import FieldTrackerMixin, ImageRenditionsMixin
 
-class User(AbstractUser):
+from .cache import bump_user_version
+
+
+class User(ImageRenditionsMixin, FieldTrackerMixin, AbstractUser):
     """
     Custom User model extending Django's AbstractUser.
     """
@@ -30,10 +34,15 @@ class User(AbstractUser):
         null=True,
         blank=True
     )
+    # WebP renditions of `profile_picture`, generated after upload (apps/common/images.py)
+    profile_picture_thumb = models.ImageField(null=True, blank=True, editable=False)
+    profile_picture_medium = models.ImageField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     last_login = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
     
+    rendition_fields = ('profile_picture',)
+    
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     
@@ -58,3 +67,5 @@ class User(AbstractUser):
         if self.email:
             self.email = self.email.lower()
         super().save(*args, **kwargs)
+        # Activation, role and password changes apply on the next request
+        bump_user_version(self.pk)
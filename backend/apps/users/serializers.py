@@ -2,6 +2,7 @@
 Serializers for users app.
 """
 from rest_framework import serializers
+from apps.common.images import rendition_url
 from .models import User
 
 
@@ -14,6 +15,7 @@ class UserSerializer(serializers.ModelSerializer):
     fullName = serializers.CharField(source='full_name', read_only=True)
     displayRole = serializers.CharField(source='display_role', read_only=True)
     profilePicture = serializers.ImageField(source='profile_picture', read_only=True)
+    imageThumbUrl = serializers.SerializerMethodField()
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     lastLogin = serializers.DateTimeField(source='last_login', read_only=True)
     isActive = serializers.BooleanField(source='is_active', read_only=True)
@@ -32,6 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
             'role',
             'displayRole',
             'profilePicture',
+            'imageThumbUrl',
             'createdAt',
             'lastLogin',
             'isActive',
@@ -40,6 +43,10 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'username', 'email', 'createdAt']
 
+    def get_imageThumbUrl(self, obj):
+        """Get URL of the profile picture thumbnail (null until it is generated)."""
+        return rendition_url(obj, 'profile_picture', 'thumb', self.context.get('request'))
+
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,14 @@
+"""
+Signal handlers for the users app.
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .cache import bump_user_version
+from .models import User
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    """Stop authenticating tokens of a deleted user from the cache."""
+    bump_user_version(instance.pk)
@@ -0,0 +1,74 @@
+"""
+Tests for the users app.
+"""
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.authentication.tokens import RefreshToken
+from apps.users.cache import clear_local_cache
+from apps.users.models import User
+
+
+def create_user(username, role):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='Passw0rd!',
+        first_name=username,
+        last_name='Test',
+        role=role
+    )
+
+
+@override_settings(
+    AUTH_USER_CACHE_TTL=300,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth-user-cache-tests',
+    }}
+)
+class CachedUserAuthenticationTests(TestCase):
+    """JWT requests read the user from the cache until it changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user', 'user')
+        cls.admin = create_user('admin', 'sysAdmin')
+
+    def setUp(self):
+        clear_local_cache()
+        self.addCleanup(clear_local_cache)
+        self.client = self.client_for(self.user)
+        self.admin_client = self.client_for(self.admin)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def test_second_request_does_not_query_the_user(self):
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivation_applies_on_next_request(self):
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+
+        response = self.admin_client.patch(
+            f'/api/users/{self.user.id}/activation/', {'isActive': False}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 401)
+
+    def test_role_change_applies_on_next_request(self):
+        self.assertEqual(self.client.get('/api/metrics/tickets/overview/').status_code, 403)
+
+        response = self.admin_client.patch(
+            f'/api/users/{self.user.id}/role/', {'role': 'support'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/metrics/tickets/overview/').status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/me/').data['role'], 'support')
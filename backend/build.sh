@@ -9,6 +9,21 @@ pip install -r requirements.txt
 # Ejecutar migraciones
 python manage.py migrate
 
+# Reconciliar estadísticas diarias de tickets
+python manage.py rollup_ticket_stats
+
+# Purgar registros de eliminación de la sincronización
+python manage.py purge_sync_tombstones
+
+# Eliminar refresh tokens revocados ya expirados
+python manage.py purge_expired_tokens
+
+# Eliminar subidas por fragmentos expiradas
+python manage.py purge_upload_sessions
+
+# Generar miniaturas de imágenes pendientes
+python manage.py generate_image_renditions
+
 # Recolectar archivos estáticos
 python manage.py collectstatic --noinput
 
@@ -4,6 +4,8 @@ Django settings for helpdesk project.
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from datetime import timedelta
 import dj_database_url
 
@@ -46,6 +48,7 @@ DJANGO_APPS = [
 THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'cloudinary_storage',
     'cloudinary',
@@ -66,6 +69,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'apps.metrics.profiling.RequestProfilingMiddleware',  # Solo activo con REQUEST_PROFILING_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos en producción
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -115,6 +119,68 @@ else:
         }
     }
 
+# Cache
+# Con REDIS_URL usa Redis compartido entre workers (requiere el paquete `redis`),
+# sino memoria local por proceso
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'helpdesk',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Segundos máximos que una métrica puede servirse desde caché (0 = sin caché)
+METRICS_CACHE_MAX_STALENESS = int(os.environ.get('METRICS_CACHE_MAX_STALENESS', 60))
+
+# Caché del usuario autenticado en peticiones JWT (0 = consultar siempre la base de datos).
+# Solo con Redis: la versión que invalida la caché debe ser común a todos los
+# workers, o una desactivación hecha en uno no se vería en los demás
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 300)) if REDIS_URL else 0
+# Usuarios en la caché de cada proceso
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_USER_CACHE_MAX_ENTRIES', 2000))
+# Guardar también las filas en la caché compartida (útil con Redis y varios workers)
+AUTH_USER_CACHE_SHARED = os.environ.get('AUTH_USER_CACHE_SHARED', 'False') == 'True'
+
+# Algoritmo de contraseñas: pbkdf2, argon2 (requiere argon2-cffi) o bcrypt (requiere bcrypt).
+# Las contraseñas guardadas con otro algoritmo o coste se re-cifran al iniciar sesión
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'apps.authentication.hashers.PBKDF2PasswordHasher',
+    'argon2': 'apps.authentication.hashers.Argon2PasswordHasher',
+    'bcrypt': 'apps.authentication.hashers.BCryptSHA256PasswordHasher',
+}
+# El preferido cifra las contraseñas nuevas; el resto solo verifica las existentes
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+# Coste de cada algoritmo (por defecto los valores de Django 4.2)
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 600000))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8))
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+
+# Segundos que se acumulan las actualizaciones de last_login antes de escribirlas
+# en lote (0 = escribir durante el login)
+LAST_LOGIN_FLUSH_SECONDS = float(os.environ.get('LAST_LOGIN_FLUSH_SECONDS', 5))
+# Usuarios pendientes que fuerzan una escritura antes de tiempo
+LAST_LOGIN_FLUSH_BATCH_SIZE = int(os.environ.get('LAST_LOGIN_FLUSH_BATCH_SIZE', 500))
+# En los tests se escribe durante el login: el hilo de escritura usa su propia
+# conexión y no vería la transacción de cada test
+if sys.argv[1:2] == ['test']:
+    LAST_LOGIN_FLUSH_SECONDS = 0
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -173,7 +239,7 @@ AUTH_USER_MODEL = 'users.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.backends.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -219,6 +285,65 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Segundos entre sincronizaciones de la caché en memoria de refresh tokens revocados
+# (apps/authentication/blacklist.py); la rotación no depende de ella
+JWT_BLACKLIST_SYNC_SECONDS = int(os.environ.get('JWT_BLACKLIST_SYNC_SECONDS', 30))
+
+# Ticket auto-assignment
+# Estrategias: least_open, priority_weighted, round_robin, random
+# (o la ruta de una subclase de apps.tickets.assignment.AssignmentStrategy)
+TICKET_ASSIGNMENT_STRATEGY = os.environ.get('TICKET_ASSIGNMENT_STRATEGY', 'least_open')
+# Segundos que se conservan los contadores de carga antes de recalcularlos
+TICKET_ASSIGNMENT_CACHE_TTL = int(os.environ.get('TICKET_ASSIGNMENT_CACHE_TTL', 300))
+
+# Request profiling (GET /api/metrics/system/endpoints/)
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'False') == 'True'
+# Muestras por endpoint usadas para p50/p95/p99
+REQUEST_PROFILING_WINDOW = int(os.environ.get('REQUEST_PROFILING_WINDOW', 1000))
+# Añadir la cabecera Server-Timing a las respuestas
+REQUEST_PROFILING_SERVER_TIMING = os.environ.get('REQUEST_PROFILING_SERVER_TIMING', 'False') == 'True'
+
+# Delta sync (GET /api/tickets/sync/)
+# Máximo de cambios por tipo en cada respuesta
+SYNC_MAX_CHANGES = int(os.environ.get('SYNC_MAX_CHANGES', 500))
+# Días que se conservan los registros de eliminación (tokens más antiguos caducan)
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+# Image renditions (apps/common/images.py)
+# Generar las miniaturas WebP en hilos de fondo (False: durante la petición)
+IMAGE_RENDITIONS_ASYNC = os.environ.get('IMAGE_RENDITIONS_ASYNC', 'True') == 'True'
+# Hilos que procesan imágenes por proceso
+IMAGE_RENDITION_WORKERS = int(os.environ.get('IMAGE_RENDITION_WORKERS', 2))
+# Calidad WebP (0-100)
+IMAGE_RENDITION_QUALITY = int(os.environ.get('IMAGE_RENDITION_QUALITY', 80))
+
+# Attachment downloads (GET /api/tickets/{id}/attachments/{aid}/download/)
+# Delegar el envío al servidor web: 'x-accel-redirect' (nginx) o 'x-sendfile' (Apache)
+ATTACHMENT_DOWNLOAD_OFFLOAD = os.environ.get('ATTACHMENT_DOWNLOAD_OFFLOAD') or None
+# Prefijo de la location `internal` de nginx que apunta a MEDIA_ROOT
+ATTACHMENT_DOWNLOAD_ACCEL_PREFIX = os.environ.get('ATTACHMENT_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+# Segundos que el cliente puede reutilizar una descarga sin revalidar
+ATTACHMENT_DOWNLOAD_MAX_AGE = int(os.environ.get('ATTACHMENT_DOWNLOAD_MAX_AGE', 86400))
+
+# Attachment deduplication (apps/attachments/blobs.py)
+# Los manejadores calculan el SHA-256 de cada archivo mientras se recibe
+FILE_UPLOAD_HANDLERS = [
+    'apps.attachments.blobs.HashingMemoryFileUploadHandler',
+    'apps.attachments.blobs.HashingTemporaryFileUploadHandler',
+]
+
+# Resumable uploads (POST /api/tickets/{id}/attachments/uploads/)
+# Directorio de archivos parciales (compartido entre workers)
+ATTACHMENT_UPLOAD_TEMP_DIR = os.environ.get(
+    'ATTACHMENT_UPLOAD_TEMP_DIR',
+    os.path.join(tempfile.gettempdir(), 'helpdesk-uploads')
+)
+# Tamaño máximo del archivo y de cada fragmento (bytes)
+ATTACHMENT_UPLOAD_MAX_SIZE = int(os.environ.get('ATTACHMENT_UPLOAD_MAX_SIZE', 100 * 1024 * 1024))
+ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE = int(os.environ.get('ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE', 5 * 1024 * 1024))
+# Horas sin actividad tras las que una subida expira
+ATTACHMENT_UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('ATTACHMENT_UPLOAD_SESSION_TTL_HOURS', 24))
+
 # CORS Settings
 # Permitir todas las peticiones en desarrollo y producción (para apps móviles)
 # Las apps móviles pueden hacer requests desde cualquier lugar